@@ -0,0 +1,107 @@
+"""
+Co OPERATION: MultiTurn - Asset index
+Used by the level editor to resolve the art paths in definitions without touching the disk
+
+Definitions name textures and models relative to Art/2D, Art/3D or the
+StreamingAssets folder itself, with either path separator and not always
+in the file's case (the game runs on Windows). Probing the disk for each
+candidate location costs several stat calls per lookup. Instead the
+StreamingAssets folder is walked once and every file is indexed under a
+normalized key (forward slashes, lower case), so a lookup is a dict hit.
+Lookups that find nothing are kept as negative entries, which doubles as
+the list of referenced assets that don't exist.
+"""
+
+import os
+import posixpath
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# available_assets kind -> (folder under StreamingAssets, file extensions)
+ASSET_FOLDERS = {
+    '3d': (('Art', '3D'), ('.glb', '.gltf')),
+    '2d': (('Art', '2D'), ('.png', '.jpg', '.jpeg')),
+    'sounds': (('Sounds',), ('.mp3', '.ogg', '.wav')),
+}
+
+
+def normalize_asset_path(path: str) -> str:
+    """Index key of a relative path: forward slashes, lower case, no ./ or ../ detours"""
+    key = posixpath.normpath(path.strip().replace('\\', '/')).lower()
+    return key.lstrip('/') if key != '.' else ''
+
+
+def referenced_art(object_definitions: Dict, grid_objects: Dict) -> Dict[Tuple[str, str], List[str]]:
+    """Art paths used by definitions and inline gridObjects entries.
+
+    Returns {(art type '2D' or '3D', path as written): [definition names or
+    'gridObjects[code]']}: art2d texture/textures and art3d model.
+    """
+    found = {}
+
+    def collect(obj, owner):
+        if not isinstance(obj, dict):
+            return
+        for art in obj.get('art2d') or ():
+            if isinstance(art, dict):
+                paths = [art['texture']] if art.get('texture') else list(art.get('textures') or ())
+                for path in paths:
+                    if isinstance(path, str):
+                        found.setdefault(('2D', path), []).append(owner)
+        for art in obj.get('art3d') or ():
+            if isinstance(art, dict) and isinstance(art.get('model'), str):
+                found.setdefault(('3D', art['model']), []).append(owner)
+
+    for name, definition in object_definitions.items():
+        collect(definition, name)
+    for code, objects in grid_objects.items():
+        for obj in objects or ():
+            collect(obj, f"gridObjects[{code}]")
+    return found
+
+
+class AssetIndex:
+    """Every file under a StreamingAssets folder, by normalized relative path"""
+
+    def __init__(self, root: str, files: Dict[str, str]):
+        self.root = root
+        self.files = files  # normalized relative path -> full path
+        self._lookups: Dict[Tuple[str, str], Optional[str]] = {}  # (art type, key) -> full path or None
+
+    @classmethod
+    def scan(cls, root: str) -> 'AssetIndex':
+        """Walk root once and index every file in it"""
+        files = {}
+        for folder, dirs, names in os.walk(root):
+            for name in names:
+                full_path = os.path.join(folder, name)
+                files[normalize_asset_path(os.path.relpath(full_path, root))] = full_path
+        return cls(root, files)
+
+    def __len__(self):
+        return len(self.files)
+
+    def resolve(self, path: str, art_type: str = '2D') -> Optional[str]:
+        """Full path of an art reference, or None.
+
+        Looks in Art/<art_type> first, then relative to StreamingAssets
+        (where 'Art/3D/Bed.glb' style references resolve).
+        """
+        key = normalize_asset_path(path)
+        lookup = (art_type.upper(), key)
+        if lookup in self._lookups:
+            return self._lookups[lookup]
+        full_path = self.files.get(f"art/{art_type.lower()}/{key}") or self.files.get(key)
+        self._lookups[lookup] = full_path  # None is a negative entry
+        return full_path
+
+    def relative_files(self, folder: Iterable[str], extensions: Iterable[str]) -> List[str]:
+        """Paths (relative to folder, as on disk) of the files with the extensions under folder"""
+        prefix = normalize_asset_path('/'.join(folder)) + '/'
+        extensions = tuple(extensions)
+        return sorted(os.path.relpath(full_path, os.path.join(self.root, *folder))
+                      for key, full_path in self.files.items()
+                      if key.startswith(prefix) and key.endswith(extensions))
+
+    def missing(self, references: Iterable[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """The (art type, path) references that don't resolve to a file"""
+        return sorted(ref for ref in references if self.resolve(ref[1], ref[0]) is None)
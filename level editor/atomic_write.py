@@ -0,0 +1,98 @@
+"""
+Co OPERATION: MultiTurn - Atomic file writer
+Shared by the level editor (write_yaml) and the batch scripts in scripts/
+
+Output is serialized to memory first and compared with the file on disk:
+an identical file is left alone (no mtime change, nothing for the game or
+git to pick up), otherwise the bytes go to a temp file in the same folder
+that is then renamed over the target with os.replace, so a crash mid-write
+can never leave a truncated level behind.
+"""
+
+import hashlib
+import os
+import tempfile
+from typing import Dict
+
+_write_stats = {'written': 0, 'skipped': 0}
+
+# The umask can only be read by setting it, and it is process-wide: read it
+# here, at import, before worker threads create files and folders
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def get_write_stats() -> Dict[str, int]:
+    """Return how many files were written and how many were skipped as unchanged"""
+    return dict(_write_stats)
+
+
+def reset_write_stats():
+    for counter in _write_stats:
+        _write_stats[counter] = 0
+
+
+def _file_hash(filepath: str, size: int):
+    """sha256 of a file, or None if it doesn't exist or has a different size"""
+    try:
+        if os.path.getsize(filepath) != size:
+            return None
+        digest = hashlib.sha256()
+        with open(filepath, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    except OSError:
+        return None
+
+
+def write_bytes_atomic(filepath: str, data: bytes) -> bool:
+    """Write data to filepath unless the file already holds exactly these bytes.
+
+    Returns True if the file was written, False if it was skipped.
+    """
+    if _file_hash(filepath, len(data)) == hashlib.sha256(data).hexdigest():
+        _write_stats['skipped'] += 1
+        return False
+
+    folder = os.path.dirname(os.path.abspath(filepath))
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=f".{os.path.basename(filepath)}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file private (0600) - keep the original's permissions,
+        # or give a new file what open(path, 'w') would (0666 less the umask)
+        try:
+            mode = os.stat(filepath).st_mode & 0o7777
+        except OSError:
+            mode = 0o666 & ~_UMASK
+        try:
+            os.chmod(tmp_path, mode)
+        except OSError:
+            pass
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    _write_stats['written'] += 1
+    return True
+
+
+def write_text_atomic(filepath: str, text: str, encoding: str = 'utf-8', newline: str = '') -> bool:
+    """Encode text and write it with write_bytes_atomic.
+
+    newline works like open(): '' writes the text's line endings unchanged,
+    None translates '\\n' to os.linesep (what open(path, 'w') does).
+    Returns True if the file was written, False if it was skipped.
+    """
+    if newline is None:
+        newline = os.linesep
+    if newline and newline != '\n':
+        text = text.replace('\n', newline)
+    return write_bytes_atomic(filepath, text.encode(encoding))
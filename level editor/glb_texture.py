@@ -0,0 +1,152 @@
+"""
+Co OPERATION: MultiTurn - GLB albedo texture reader
+Used by the level editor (through texture_loader) to show art3d models on grid cells
+
+A GLB file is a 12-byte header followed by a JSON chunk (the glTF document)
+and a BIN chunk holding the buffer that embedded images point into. Only
+the albedo image is needed, so instead of loading the whole model and
+writing every image to disk, the reader memory-maps the file, parses the
+JSON chunk and slices the one image's bytes out of the BIN chunk:
+
+    materials[0].pbrMetallicRoughness.baseColorTexture -> textures -> images -> bufferViews
+
+falling back to the first image when the material chain is missing (the
+same choice the pygltflib-based extractor made). Images given by a data:
+URI or a file next to the model are supported too, as are .gltf files.
+"""
+
+import base64
+import io
+import json
+import mmap
+import os
+import struct
+from typing import Optional
+
+GLB_MAGIC = b'glTF'
+CHUNK_JSON = 0x4E4F534A
+CHUNK_BIN = 0x004E4942
+
+
+class GLBError(ValueError):
+    """The file is not a GLB/glTF file this reader understands"""
+
+
+def albedo_image_index(document: dict) -> Optional[int]:
+    """Index into images of the first material's base color texture (first image as fallback)"""
+    images = document.get('images') or []
+    materials = document.get('materials') or []
+    if materials:
+        pbr = materials[0].get('pbrMetallicRoughness') or {}
+        texture_info = pbr.get('baseColorTexture')
+        textures = document.get('textures') or []
+        if texture_info and 0 <= texture_info.get('index', -1) < len(textures):
+            texture = textures[texture_info['index']]
+            source = texture.get('source')
+            if source is None:
+                # Compressed-texture extensions (EXT_texture_webp, ...) name the image themselves
+                source = next((ext['source'] for ext in (texture.get('extensions') or {}).values()
+                               if isinstance(ext, dict) and 'source' in ext), None)
+            if source is not None and 0 <= source < len(images):
+                return source
+    return 0 if images else None
+
+
+def _split_glb(data) -> tuple:
+    """(glTF document, (start, end) of the BIN chunk or None) of a GLB file's bytes.
+
+    data is only sliced (bytes copies), never viewed, so nothing holds on to
+    a memory map after this returns or raises.
+    """
+    magic, version, length = struct.unpack_from('<4sII', data, 0)
+    if magic != GLB_MAGIC:
+        raise GLBError("not a GLB file")
+    if version != 2:
+        raise GLBError(f"GLB version {version} (only 2 is supported)")
+    length = min(length, len(data))
+    document = None
+    binary = None
+    offset = 12
+    while offset + 8 <= length:
+        chunk_length, chunk_type = struct.unpack_from('<II', data, offset)
+        start = offset + 8
+        end = min(start + chunk_length, length)
+        if chunk_type == CHUNK_JSON and document is None:
+            document = json.loads(data[start:end])
+        elif chunk_type == CHUNK_BIN and binary is None:
+            binary = (start, end)
+        offset += 8 + chunk_length
+    if document is None:
+        raise GLBError("GLB has no JSON chunk")
+    return document, binary
+
+
+def _uri_bytes(uri: str, base_folder: str) -> bytes:
+    if uri.startswith('data:'):
+        return base64.b64decode(uri.split(',', 1)[1])
+    with open(os.path.join(base_folder, uri), 'rb') as f:
+        return f.read()
+
+
+def _image_bytes(document: dict, data, binary, index: int, base_folder: str) -> bytes:
+    """Encoded (PNG/JPEG/...) bytes of images[index]; binary is the (start, end) of the BIN chunk in data"""
+    image = document['images'][index]
+    if image.get('uri'):
+        return _uri_bytes(image['uri'], base_folder)
+    buffer_view = document['bufferViews'][image['bufferView']]
+    start = buffer_view.get('byteOffset', 0)
+    end = start + buffer_view['byteLength']
+    buffer_index = buffer_view.get('buffer', 0)
+    buffer = document['buffers'][buffer_index]
+    if buffer.get('uri'):
+        # .gltf (or GLB with an external buffer)
+        return _uri_bytes(buffer['uri'], base_folder)[start:end]
+    if buffer_index != 0 or binary is None:
+        raise GLBError("image buffer is not the GLB BIN chunk")
+    if binary[0] + end > binary[1]:
+        raise GLBError("image runs past the end of the BIN chunk")
+    return data[binary[0] + start:binary[0] + end]
+
+
+def read_albedo_bytes(path: str) -> Optional[bytes]:
+    """Encoded bytes of a model's albedo image, or None if it has no images.
+
+    Only the JSON chunk and the image's own byte range are read.
+    """
+    base_folder = os.path.dirname(path)
+    with open(path, 'rb') as f:
+        if f.read(4) != GLB_MAGIC:
+            # Plain .gltf: the document is the whole file
+            f.seek(0)
+            document = json.load(f)
+            index = albedo_image_index(document)
+            return None if index is None else _image_bytes(document, None, None, index, base_folder)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            document, binary = _split_glb(data)
+            index = albedo_image_index(document)
+            return None if index is None else _image_bytes(document, data, binary, index, base_folder)
+
+
+def has_albedo_image(path: str) -> bool:
+    """Whether a model has an image to show, reading only the GLB header and JSON chunk"""
+    with open(path, 'rb') as f:
+        header = f.read(20)
+        if header[:4] != GLB_MAGIC:
+            f.seek(0)
+            return albedo_image_index(json.load(f)) is not None
+        _, version, _, json_length, json_type = struct.unpack('<4sIIII', header)
+        if version != 2 or json_type != CHUNK_JSON:
+            raise GLBError("not a GLB 2.0 file with a JSON chunk")
+        return albedo_image_index(json.loads(f.read(json_length))) is not None
+
+
+def open_albedo_image(path: str) -> Optional['Image.Image']:
+    """A model's albedo texture as a loaded PIL image, or None if it has no images"""
+    from PIL import Image
+
+    encoded = read_albedo_bytes(path)
+    if encoded is None:
+        return None
+    image = Image.open(io.BytesIO(encoded))
+    image.load()
+    return image
@@ -0,0 +1,107 @@
+"""
+Co OPERATION: MultiTurn - Image cache
+Used by the level editor for decoded textures and the images drawn on the grid
+
+One LRU cache for everything image-shaped (texture pyramids, resized
+PhotoImages, mip stand-ins), bounded by an estimate of the memory the
+pixels take (width * height * 4 bytes) rather than by entry count, so a
+session of zooming and scrolling through big levels can't grow without
+limit. Evicting an entry only drops the cache's reference: an image that
+is still on the canvas stays alive through the canvas item that shows it
+and is freed once that item shows something else.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+DEFAULT_BUDGET_BYTES = 64 * 1024 * 1024  # ~340 128x128 texture pyramids
+
+
+def image_bytes(image) -> int:
+    """Approximate memory of a PIL image or Tk PhotoImage (RGBA, 4 bytes a pixel)"""
+    width = image.width() if callable(image.width) else image.width
+    height = image.height() if callable(image.height) else image.height
+    return width * height * 4
+
+
+class ImageCache:
+    """LRU cache with a byte budget.
+
+    get() marks an entry as recently used; put() evicts least recently used
+    entries until the new one fits. An entry bigger than the whole budget is
+    not cached at all.
+    """
+
+    def __init__(self, budget_bytes: int = DEFAULT_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self._entries: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any, nbytes: Optional[int] = None):
+        """Add an entry (nbytes defaults to image_bytes(value))"""
+        if nbytes is None:
+            nbytes = image_bytes(value)
+        self.discard(key)
+        if nbytes > self.budget_bytes:
+            return
+        self._entries[key] = value
+        self._sizes[key] = nbytes
+        self.total_bytes += nbytes
+        self._trim(self.budget_bytes)
+
+    def discard(self, key: Hashable):
+        if key in self._entries:
+            del self._entries[key]
+            self.total_bytes -= self._sizes.pop(key)
+
+    def clear(self):
+        self._entries.clear()
+        self._sizes.clear()
+        self.total_bytes = 0
+
+    def set_budget(self, budget_bytes: int):
+        self.budget_bytes = budget_bytes
+        self._trim(budget_bytes)
+
+    def _trim(self, budget_bytes: int):
+        while self.total_bytes > budget_bytes and self._entries:
+            key, _ = self._entries.popitem(last=False)
+            self.total_bytes -= self._sizes.pop(key)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'entries': len(self._entries),
+            'bytes': self.total_bytes,
+            'budget_bytes': self.budget_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+    def format_stats(self) -> str:
+        """One-line summary for the status bar"""
+        lookups = self.hits + self.misses
+        hit_rate = f"{self.hits * 100 / lookups:.0f}%" if lookups else "-"
+        return (f"Image cache: {len(self._entries)} images, "
+                f"{self.total_bytes / 1048576:.1f}/{self.budget_bytes / 1048576:.0f} MB, "
+                f"{self.hits} hits / {self.misses} misses ({hit_rate}), {self.evictions} evictions")
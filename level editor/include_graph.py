@@ -0,0 +1,279 @@
+"""
+Co OPERATION: MultiTurn - Include graph resolver
+Resolves the include directives of level files as one dependency graph
+
+A package is a DAG of YAML files: package.yaml lists every level file, each
+level includes LevelsShared.yaml, which includes CoOpAnimationDefinitions.yaml
+and BuyableItems.yaml, and the LevelResults* files include LevelResultsShared*.
+Resolving the levels one by one re-walks (and re-merges) the shared files for
+every reference. IncludeGraph instead discovers the whole graph first, parses
+each unique file exactly once in a thread pool, and merges bottom-up with the
+merged result of every node memoized. Cycles are reported with the full path.
+"""
+
+import os
+import pickle
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from yaml_loader import load_yaml_file
+
+# Parsing is mostly CPU bound (and holds the GIL), so a few threads are enough
+# to overlap file reads, cache lookups and unpickling
+MAX_PARSE_WORKERS = min(8, (os.cpu_count() or 2) + 2)
+
+
+class IncludeNode:
+    """One file in the include graph"""
+    __slots__ = ('path', 'data', 'error', 'includes', 'include_names', 'missing')
+
+    def __init__(self, path: str):
+        self.path = path  # Absolute path
+        self.data = None  # Parsed data (None if the file could not be loaded)
+        self.error = None
+        self.includes = []  # Absolute paths of the included files that exist, in include order
+        self.include_names = None  # The 'include' value as written in the file
+        self.missing = []  # Include entries that don't exist on disk
+
+    def __repr__(self):
+        return f"IncludeNode({os.path.basename(self.path)!r}, includes={len(self.includes)})"
+
+
+def _include_list(data) -> Optional[List]:
+    """The include directive of a parsed file as a list (None if it has none)"""
+    if not isinstance(data, dict) or 'include' not in data:
+        return None
+    includes = data['include']
+    return includes if isinstance(includes, list) else [includes]
+
+
+class IncludeGraph:
+    """Dependency graph of YAML files linked by include directives.
+
+    Typical use:
+        graph = IncludeGraph()
+        graph.add_package("levels/FinalPackage/package.yaml")
+        merged, warnings, errors = graph.resolve("levels/FinalPackage/Levels/Level_1_players_2.yaml")
+
+    Included files always use the persistent parse cache (they are shared
+    definitions); root files use it only when added with persistent=True.
+    """
+
+    def __init__(self, max_workers: int = MAX_PARSE_WORKERS):
+        self.max_workers = max_workers
+        self.nodes: Dict[str, IncludeNode] = {}
+        self.roots: List[str] = []
+        self.package_warnings: List[str] = []  # Level files listed in package.yaml that don't exist
+        self._persistent_roots = set()
+        self._merged: Dict[str, Tuple[Dict, List[str], List[str]]] = {}
+        self.parse_count = 0
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def add(self, filepaths: Iterable[str], persistent: bool = False) -> List[str]:
+        """Add root files and load them plus everything they include.
+
+        Returns the absolute paths of the roots.
+        """
+        roots = []
+        for filepath in filepaths:
+            path = os.path.abspath(filepath)
+            roots.append(path)
+            if path not in self.roots:
+                self.roots.append(path)
+            if persistent:
+                self._persistent_roots.add(path)
+        self._load(roots)
+        return roots
+
+    def add_package(self, package_filepath: str) -> List[str]:
+        """Add package.yaml and every level file it lists.
+
+        Level fileNames are looked up in the package's Levels/ folder (and next
+        to package.yaml as a fallback). Returns the absolute paths of the level files.
+        """
+        package_path, = self.add([package_filepath])
+        package = self.nodes[package_path].data
+
+        package_dir = os.path.dirname(package_path)
+        level_files = []
+        for level in (package or {}).get('levels') or []:
+            for level_file in (level or {}).get('levelFiles') or []:
+                file_name = (level_file or {}).get('fileName')
+                if not file_name:
+                    continue
+                if not file_name.endswith('.yaml'):
+                    file_name += '.yaml'
+                for folder in (os.path.join(package_dir, 'Levels'), package_dir):
+                    candidate = os.path.join(folder, file_name)
+                    if os.path.exists(candidate):
+                        if candidate not in level_files:
+                            level_files.append(candidate)
+                        break
+                else:
+                    self.package_warnings.append(
+                        f"Level file not found: {file_name} (listed in {os.path.basename(package_path)})")
+
+        return self.add(level_files)
+
+    def _load(self, paths: List[str]):
+        """Parse every unseen file reachable from paths, each exactly once"""
+        pending = [path for path in paths if path not in self.nodes]
+        if not pending:
+            return
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {}
+
+            def submit(path):
+                node = IncludeNode(path)
+                self.nodes[path] = node
+                persistent = path not in self.roots or path in self._persistent_roots
+                futures[pool.submit(load_yaml_file, path, True, persistent)] = node
+
+            for path in pending:
+                if path not in self.nodes:
+                    submit(path)
+
+            # New includes are queued as soon as their parent is parsed, so
+            # independent branches of the graph parse side by side
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    node = futures.pop(future)
+                    node.data, node.error = future.result()
+                    self.parse_count += 1
+                    for include_path in self._link(node):
+                        if include_path not in self.nodes:
+                            submit(include_path)
+
+        self._merged.clear()
+
+    def _link(self, node: IncludeNode) -> List[str]:
+        """Fill in node.includes/missing from its parsed data"""
+        node.include_names = _include_list(node.data)
+        base_dir = os.path.dirname(node.path)
+        for include_file in node.include_names or []:
+            include_path = os.path.abspath(os.path.join(base_dir, str(include_file)))
+            if not os.path.exists(include_path):
+                node.missing.append(include_file)
+            elif include_path not in node.includes:
+                node.includes.append(include_path)
+        return node.includes
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def dependents(self, filepath: str) -> List[str]:
+        """Files that include the given file directly"""
+        path = os.path.abspath(filepath)
+        return [node.path for node in self.nodes.values() if path in node.includes]
+
+    def find_cycles(self) -> List[List[str]]:
+        """Every include cycle as a list of paths, first file repeated at the end"""
+        cycles = []
+        state = {}  # path -> 1 while on the DFS stack, 2 when finished
+
+        for start in self.nodes:
+            if start in state:
+                continue
+            # Iterative DFS so deep include chains can't hit the recursion limit
+            stack = [(start, iter(self.nodes[start].includes))]
+            trail = [start]
+            state[start] = 1
+            while stack:
+                path, children = stack[-1]
+                child = next(children, None)
+                if child is None:
+                    state[path] = 2
+                    stack.pop()
+                    trail.pop()
+                elif state.get(child) == 1:
+                    cycles.append(trail[trail.index(child):] + [child])
+                elif child not in state:
+                    state[child] = 1
+                    trail.append(child)
+                    stack.append((child, iter(self.nodes[child].includes)))
+        return cycles
+
+    # ------------------------------------------------------------------
+    # Merging
+    # ------------------------------------------------------------------
+
+    def resolve(self, filepath: str, copy: bool = True) -> Tuple[Dict, List[str], List[str]]:
+        """Merge a file with everything it includes, like resolve_includes().
+
+        Merged results are memoized per node, so shared files are merged once
+        per graph. With copy=True (default) the caller gets a private copy it
+        may mutate; copy=False returns the memoized tree itself (read only).
+        Returns: (merged_data, warnings, errors)
+        """
+        path = os.path.abspath(filepath)
+        if path not in self.nodes:
+            self.add([path])
+
+        merged, warnings, errors = self._resolve(path, [])
+        if copy:
+            merged = pickle.loads(pickle.dumps(merged, protocol=pickle.HIGHEST_PROTOCOL))
+        return merged, list(warnings), list(errors)
+
+    def _resolve(self, path: str, trail: List[str]) -> Tuple[Dict, List[str], List[str]]:
+        if path in self._merged:
+            return self._merged[path]
+
+        node = self.nodes[path]
+        if node.error:
+            return {}, [], [f"Error loading {path}: {node.error}"]
+
+        data = node.data
+        warnings = [f"Include file not found: {name}" for name in node.missing]
+        errors = []
+
+        if node.include_names is None:
+            result = (data, warnings, errors)
+            self._merged[path] = result
+            return result
+
+        trail = trail + [path]
+        merged_includes = {}
+        for include_path in node.includes:
+            if include_path in trail:
+                cycle = trail[trail.index(include_path):] + [include_path]
+                warnings.append(f"Circular include detected: {' -> '.join(cycle)}")
+                continue
+
+            included_data, inc_warnings, inc_errors = self._resolve(include_path, trail)
+            warnings.extend(inc_warnings)
+            errors.extend(inc_errors)
+
+            # Merge included data (but don't overwrite main file's keys or earlier includes)
+            for key, value in (included_data or {}).items():
+                if key != 'include' and key not in merged_includes:
+                    merged_includes[key] = value
+
+        # Included data first, then main data on top
+        merged_data = merged_includes
+        merged_data.update(data)
+
+        # Store original includes for preservation
+        merged_data['_original_includes'] = node.include_names
+
+        result = (merged_data, warnings, errors)
+        # Results that depend on a cycle being cut depend on where the walk
+        # entered the cycle, so only memoize clean ones
+        if not any(w.startswith("Circular include detected") for w in warnings):
+            self._merged[path] = result
+        return result
+
+
+def resolve_package(package_filepath: str, max_workers: int = MAX_PARSE_WORKERS) -> Tuple[IncludeGraph, Dict[str, Tuple[Dict, List[str], List[str]]]]:
+    """Load a whole package and resolve every level file it lists.
+
+    Returns: (graph, {level_path: (merged_data, warnings, errors)})
+    """
+    graph = IncludeGraph(max_workers=max_workers)
+    level_paths = graph.add_package(package_filepath)
+    return graph, {path: graph.resolve(path) for path in level_paths}
@@ -7,12 +7,13 @@ Integrated with game's Steam folder structure
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, colorchooser
-import yaml
 import os
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple, Set
 import re
 import copy
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
 
 # PIL/Pillow for image handling
 try:
@@ -21,194 +22,22 @@ try:
 except ImportError:
     PIL_AVAILABLE = False
 
-# pygltflib for GLB texture extraction (optional dependency)
-# Allows extracting albedo textures from .glb 3D models for grid display
-try:
-    from pygltflib import GLTF2
-    from pygltflib.utils import ImageFormat
-    PYGLTFLIB_AVAILABLE = True
-except ImportError:
-    PYGLTFLIB_AVAILABLE = False
-
-
-# ============================================
-# Custom YAML Handling for Game Format
-# ============================================
-
-# Force YAML to output strings as literal block scalars (| style)
-# This matches the game's expected YAML format for grid data
-class LiteralString(str):
-    """Helper class to force YAML to output a string as literal block scalar"""
-    pass
-
-
-def literal_string_representer(dumper, data):
-    """Custom representer to output strings as literal block scalars"""
-    return dumper.represent_scalar('tag:yaml.org,2002:str', data, style='|')
-
-
-yaml.add_representer(LiteralString, literal_string_representer)
-
-
-class TaggedObject(dict):
-    """Dict subclass that remembers its YAML tag"""
-    def __init__(self, *args, **kwargs):
-        tag = kwargs.pop('_tag', None)
-        super().__init__(*args, **kwargs)
-        self._tag = tag
-
-
-def tagged_object_representer(dumper, data):
-    """Represent TaggedObject with its original tag"""
-    tag = getattr(data, '_tag', None)
-    if tag:
-        return dumper.represent_mapping(f'!{tag}', dict(data))
-    return dumper.represent_mapping('tag:yaml.org,2002:map', dict(data))
-
-
-yaml.add_representer(TaggedObject, tagged_object_representer)
-
-
-# Custom YAML tag constructors (matching game documentation)
-def animation_constructor(loader, node):
-    """Constructor for !Animation tag"""
-    if isinstance(node, yaml.MappingNode):
-        data = loader.construct_mapping(node)
-        return TaggedObject(data, _tag='Animation')
-    return loader.construct_scalar(node)
-
-
-def glb_animation_constructor(loader, node):
-    """Constructor for !GLBAnimation tag"""
-    data = loader.construct_mapping(node)
-    return TaggedObject(data, _tag='GLBAnimation')
 
-
-def spine_animation_constructor(loader, node):
-    """Constructor for !SpineAnimation tag"""
-    data = loader.construct_mapping(node)
-    return TaggedObject(data, _tag='SpineAnimation')
-
-
-def mesh_deform_animation_constructor(loader, node):
-    """Constructor for !MeshDeformAnimation tag (correct spelling)"""
-    data = loader.construct_mapping(node)
-    return TaggedObject(data, _tag='MeshDeformAnimation')
-
-
-def tween_animation_constructor(loader, node):
-    """Constructor for !TweenAnimation tag"""
-    data = loader.construct_mapping(node)
-    return TaggedObject(data, _tag='TweenAnimation')
-
-
-def unity_animator_constructor(loader, node):
-    """Constructor for !UnityAnimator tag"""
-    data = loader.construct_mapping(node)
-    return TaggedObject(data, _tag='UnityAnimator')
-
-
-# Register all custom tag constructors with both SafeLoader and Loader
-for _loader in (yaml.SafeLoader, yaml.Loader):
-    yaml.add_constructor('!Animation', animation_constructor, Loader=_loader)
-    yaml.add_constructor('!GLBAnimation', glb_animation_constructor, Loader=_loader)
-    yaml.add_constructor('!SpineAnimation', spine_animation_constructor, Loader=_loader)
-    yaml.add_constructor('!MeshDeformAnimation', mesh_deform_animation_constructor, Loader=_loader)
-    yaml.add_constructor('!TweenAnimation', tween_animation_constructor, Loader=_loader)
-    yaml.add_constructor('!UnityAnimator', unity_animator_constructor, Loader=_loader)
-    
-    # Generic multi-constructor to handle ANY other custom tags
-    def generic_tag_handler(loader, suffix, node):
-        """Handle any custom tag with '!' prefix"""
-        if isinstance(node, yaml.MappingNode):
-            data = loader.construct_mapping(node)
-            return TaggedObject(data, _tag=suffix)
-        elif isinstance(node, yaml.SequenceNode):
-            data = loader.construct_sequence(node)
-            return TaggedObject({'_data': data, '_tag': suffix})
-        else:
-            data = loader.construct_scalar(node)
-            return TaggedObject({'_value': data, '_tag': suffix})
-    
-    yaml.add_multi_constructor('!', generic_tag_handler, Loader=_loader)
-
-
-# ============================================
-# YAML Include Resolution
-# ============================================
-
-def load_yaml_file(filepath: str) -> Tuple[Dict, str]:
-    """Load a single YAML file and return parsed data plus any errors"""
-    try:
-        with open(filepath, 'r') as f:
-            data = yaml.safe_load(f)
-        return data if data else {}, None
-    except Exception as e:
-        return None, str(e)
-
-
-def resolve_includes(main_filepath: str, loaded_files: Set[str] = None) -> Tuple[Dict, List[str], List[str]]:
-    """
-    Recursively resolve YAML include directives.
-    Returns: (merged_data, warnings, errors)
-    """
-    if loaded_files is None:
-        loaded_files = set()
-    
-    main_path = os.path.abspath(main_filepath)
-    if main_path in loaded_files:
-        return {}, ['Circular include detected: {main_filepath}'], []
-    loaded_files.add(main_path)
-    
-    data, error = load_yaml_file(main_filepath)
-    if error:
-        return {}, [], [f"Error loading {main_filepath}: {error}"]
-    
-    warnings = []
-    errors = []
-    
-    # Get the base directory for resolving relative includes
-    base_dir = os.path.dirname(main_path)
-    
-    # Process includes
-    if 'include' in data:
-        includes = data['include']
-        if not isinstance(includes, list):
-            includes = [includes]
-        
-        # Store includes for later (we'll preserve them in the data)
-        # But merge the included data now
-        merged_includes = {}
-        
-        for include_file in includes:
-            include_path = os.path.join(base_dir, include_file)
-            if not os.path.exists(include_path):
-                warnings.append(f"Include file not found: {include_file}")
-                continue
-            
-            included_data, inc_warnings, inc_errors = resolve_includes(include_path, loaded_files)
-            warnings.extend(inc_warnings)
-            errors.extend(inc_errors)
-            
-            if included_data:
-                # Merge included data (but don't overwrite main file's keys)
-                for key, value in included_data.items():
-                    if key == 'include':
-                        # Don't merge includes recursively at this level
-                        continue
-                    if key not in merged_includes:
-                        merged_includes[key] = value
-        
-        # Now merge: included data first, then main data on top
-        merged_data = merged_includes.copy()
-        merged_data.update(data)
-        
-        # Store original includes for preservation
-        merged_data['_original_includes'] = includes
-        
-        return merged_data, warnings, errors
-    
-    return data, warnings, errors
+# Shared YAML loader layer (libyaml-backed when available, custom game tags)
+from yaml_loader import (load_yaml_file, safe_load_yaml,
+                         dump_yaml, get_parse_cache_stats)
+from include_graph import IncludeGraph
+from asset_index import ASSET_FOLDERS, AssetIndex, referenced_art
+from glb_texture import has_albedo_image
+from image_cache import ImageCache, image_bytes
+from level_state import LevelDocument, PersistentMap
+from level_sections import LevelView, parse_section_entries, read_level_sections
+from atomic_write import write_text_atomic
+from level_grid import (ANCHORS, Grid, GridLayout, format_grid_block, line_cells,
+                        parse_grid_block, parse_grid_text)
+from texture_loader import MODEL_EXTENSIONS, TextureLoader, build_texture_pyramid, prepare_model_tiles
+from thumbnail_store import ThumbnailStore
+from undo_log import MISSING, UndoLog
 
 
 # ============================================
@@ -370,7 +199,7 @@ class GridObjectDialog:
             try:
                 text = text_widget.get('1.0', tk.END).strip()
                 # Parse as YAML
-                parsed = yaml.safe_load(text)
+                parsed = safe_load_yaml(text)
                 if isinstance(parsed, dict):
                     current = self.grid_objects.get(self.cell_code, [])
                     current.append(parsed)
@@ -429,12 +258,12 @@ class GridObjectDialog:
             
             text_widget = tk.Text(text_frame, height=8, width=50)
             text_widget.pack(fill=tk.BOTH, expand=True)
-            text_widget.insert('1.0', yaml.dump(obj, default_flow_style=False))
+            text_widget.insert('1.0', dump_yaml(obj, default_flow_style=False))
             
             def save():
                 try:
                     text = text_widget.get('1.0', tk.END).strip()
-                    parsed = yaml.safe_load(text)
+                    parsed = safe_load_yaml(text)
                     if isinstance(parsed, dict):
                         current[idx] = parsed
                         self.grid_objects[self.cell_code] = current
@@ -557,12 +386,14 @@ class LevelEditor:
         self.root.geometry("1300x850")
         
         # Data
-        self.grid_data = []  # 2D list of cell codes
+        self.grid_data = Grid()  # Cell codes (level_grid.Grid, indexed as grid_data[row, col])
+        self.grid_layout = GridLayout()  # How the grid block was written (section breaks, column gutters)
         self.grid_objects = {}  # code -> list of objects
         self.object_definitions = {}  # code -> definition
         self.current_file = None
         self.streaming_assets_path = None
         self.available_assets = {'3d': [], '2d': [], 'sounds': []}
+        self.asset_index = None  # AssetIndex of streaming_assets_path, used by resolve_art_path
         
         # Shared definitions file path
         self.shared_defs_path = tk.StringVar()  # Path to shared YAML file
@@ -571,6 +402,9 @@ class LevelEditor:
         # Full YAML data preservation
         self.full_yaml_data = {}  # Store full YAML to preserve all sections
         self.loaded_includes = []  # Track loaded include files
+        self.level_view = None  # Original text of the loaded file, split into sections (see write_yaml)
+        self.saved_level = {}  # Section values as of the last load/save, to find what changed
+        self.document = LevelDocument()  # Immutable snapshot of the level, kept current by every edit
         
         # Grid state
         self.grid_rows = 15
@@ -580,9 +414,37 @@ class LevelEditor:
         
         # Image display support
         self.cell_images = {}  # (row, col) -> canvas image id
-        self.image_cache = {}  # (filepath, size) -> PhotoImage
-        self._image_refs = []  # Prevent garbage collection
-        self.extracted_textures = {}  # glb_path -> extracted_png_path
+        
+        # Virtualized canvas: only cells in (or near) the visible area have
+        # canvas items; items of cells scrolled out of view are hidden and reused
+        self.cell_rects = {}  # (row, col) -> canvas rectangle id, visible cells only
+        self._free_rects = []  # Hidden rectangle items ready for reuse
+        self._free_images = []  # Hidden image items ready for reuse
+        self._viewport = None  # (first_row, last_row, first_col, last_col) with items
+        self._viewport_after_id = None
+        # One LRU cache with a memory budget for texture pyramids, resized images and mip stand-ins:
+        # ('pyramid', filepath), ('photo', filepath, size), ('mip', filepath, mip size)
+        self.image_cache = ImageCache(self.IMAGE_CACHE_BUDGET)
+        self.cell_image_paths = {}  # (row, col) -> filepath shown by the cell's image item
+        self.cell_photos = {}  # (row, col) -> PhotoImage shown by the cell's image item (keeps it alive)
+        self._zoom_after_id = None  # Pending sharp resample after zooming
+        self.extracted_textures = {}  # glb_path -> glb_path if it has an albedo image to show, else None
+        # code -> full texture path (or None) as resolved by _cell_texture_path; an entry
+        # is dropped when the code's gridObjects entry or a definition it uses changes
+        self.code_textures = {}
+        
+        # Background texture loading (see Background Texture Loading below)
+        self.texture_loader = TextureLoader()
+        self.thumbnail_store = ThumbnailStore()  # Decoded tiles kept on disk between sessions
+        # Warm-up: decode every model's texture into the thumbnail store when the Mod folder is set
+        self.prepare_model_textures = tk.BooleanVar(value=True)
+        self._warmup_futures = {}  # Future -> glb_path
+        self._warmup_total = 0
+        self._warmup_after_id = None
+        self._texture_waiters = {}  # filepath -> cells waiting for its pyramid
+        self._cell_waits = {}  # (row, col) -> filepath the cell is waiting for
+        self._glb_waiters = {}  # glb_path -> grid codes waiting for extract_glb_texture
+        self._texture_poll_after_id = None
         
         # Pan state for middle-click panning
         self.pan_start = None  # (x, y) canvas coordinates
@@ -590,15 +452,24 @@ class LevelEditor:
         # Selection highlight
         self.selection_id = None  # Canvas item id for selection rectangle
         
+        # Dirty-cell redraw: cells to repaint on the next idle flush
+        self._dirty_cells = set()
+        self._redraw_after_id = None
+        
+        # View -> Highlight Cells With Selected Code
+        self.highlight_code = None  # Code whose cells are outlined (None = off)
+        self.highlight_ids = {}  # (row, col) -> canvas outline id
+        
         # Painting state (RPG Maker-style)
         self.paint_code = None  # Last applied grid code for painting
         self.painting = False  # Whether right-click painting is active
         self.erasing = False  # Whether Ctrl+Right-click eraser mode is active
+        self._stroke_last = None  # (row, col) of the stroke's previous motion sample
+        self._stroke_status = None  # Status bar text waiting for the next stroke frame
+        self._stroke_after_id = None
         
-        # Undo/Redo system
-        self.undo_stack = []  # History of previous states
-        self.redo_stack = []  # States that were undone
-        self.max_undo_history = 50  # Maximum undo history size
+        # Undo/Redo system: a log of the changes each action made, capped by memory
+        self.undo_log = UndoLog(self.UNDO_HISTORY_BUDGET)
         
         # Camera settings (from YAML cameraSettings)
         self.camera_settings = {}  # Stores cameraSettings dict
@@ -638,6 +509,8 @@ class LevelEditor:
         file_menu.add_command(label="Save YAML As...", command=self.save_yaml_as)
         file_menu.add_separator()
         file_menu.add_command(label="Set Mod Folder...", command=self.set_mod_folder)
+        file_menu.add_checkbutton(label="Prepare Model Textures When Mod Folder Is Set",
+                                  variable=self.prepare_model_textures)
         file_menu.add_separator()
         file_menu.add_command(label="Exit", command=self.root.quit)
         
@@ -659,6 +532,12 @@ class LevelEditor:
         menubar.add_cascade(label="View", menu=view_menu)
         view_menu.add_command(label="Zoom In", command=self.zoom_in)
         view_menu.add_command(label="Zoom Out", command=self.zoom_out)
+        view_menu.add_separator()
+        view_menu.add_command(label="Highlight Cells With Selected Code", command=self.highlight_code_cells)
+        view_menu.add_command(label="Clear Highlight", command=self.clear_code_highlight)
+        view_menu.add_separator()
+        view_menu.add_command(label="Image Cache Stats", command=self.show_image_cache_stats)
+        view_menu.add_command(label="Missing Assets...", command=self.show_missing_assets)
         
     def setup_ui(self):
         # Main container with panes
@@ -707,9 +586,11 @@ class LevelEditor:
         self.v_scrollbar = ttk.Scrollbar(canvas_frame, orient=tk.VERTICAL)
         self.v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
+        # The scroll commands also fire on panning (scan_dragto), zooming and
+        # window resizes, which is when the virtualized cells need updating
         self.grid_canvas = tk.Canvas(canvas_frame, 
-                                     xscrollcommand=self.h_scrollbar.set,
-                                     yscrollcommand=self.v_scrollbar.set,
+                                     xscrollcommand=self._on_canvas_xscroll,
+                                     yscrollcommand=self._on_canvas_yscroll,
                                      bg='white', highlightthickness=0)
         self.grid_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
@@ -719,6 +600,7 @@ class LevelEditor:
         self.grid_canvas.bind("<Button-1>", self.on_grid_click)
         self.grid_canvas.bind("<Motion>", self.on_grid_hover)
         self.grid_canvas.bind("<Leave>", self.on_grid_leave)
+        self.grid_canvas.bind("<Configure>", lambda e: self._schedule_viewport_update())
         
         # Scroll wheel zoom
         self.grid_canvas.bind("<MouseWheel>", self.on_mouse_wheel)
@@ -780,103 +662,211 @@ class LevelEditor:
         self.defs_text.pack(fill=tk.BOTH, expand=True)
         self.update_defs_display()
         
-        # Status bar
-        self.status_bar = ttk.Label(self.root, text="Ready", relief=tk.SUNKEN, anchor=tk.W)
-        self.status_bar.pack(fill=tk.X, side=tk.BOTTOM)
+        # Status bar, with the undo history's memory use on the right
+        status_frame = ttk.Frame(self.root)
+        status_frame.pack(fill=tk.X, side=tk.BOTTOM)
+        self.history_status = ttk.Label(status_frame, text="", relief=tk.SUNKEN, anchor=tk.E)
+        self.history_status.pack(side=tk.RIGHT)
+        self.status_bar = ttk.Label(status_frame, text="Ready", relief=tk.SUNKEN, anchor=tk.W)
+        self.status_bar.pack(fill=tk.X, side=tk.LEFT, expand=True)
         
     def setup_grid(self):
+        """Reset the canvas for the current grid size and cell size.
+        
+        Only the cells in view get canvas items (see Virtualized Canvas below),
+        so this costs the same for a 12x15 and a 34x34 grid.
+        """
         self.grid_canvas.delete("all")
         self.cell_rects = {}
+        self.cell_images = {}
+        self.cell_image_paths = {}
+        self.cell_photos = {}
+        for cell in list(self._cell_waits):
+            self._stop_waiting(cell)
+        self.highlight_ids = {}
+        self.selection_id = None
+        self._free_rects = []
+        self._free_images = []
+        self._viewport = None
         
         width = self.grid_cols * self.cell_size
         height = self.grid_rows * self.cell_size
         
         self.grid_canvas.config(scrollregion=(0, 0, width, height))
-        
-        for row in range(self.grid_rows):
-            for col in range(self.grid_cols):
-                x1 = col * self.cell_size
-                y1 = row * self.cell_size
-                x2 = x1 + self.cell_size
-                y2 = y1 + self.cell_size
-                
-                rect_id = self.grid_canvas.create_rectangle(x1, y1, x2, y2, 
-                                                           fill='white', outline='gray', 
-                                                           activefill='lightblue',
-                                                           tags=(f"cell_{row}_{col}",))
-                text_id = self.grid_canvas.create_text(x1 + self.cell_size/2, y1 + self.cell_size/2,
-                                                      text="", font=("Courier", 7),
-                                                      tags=(f"text_{row}_{col}",))
-                
-                self.cell_rects[(row, col)] = (rect_id, text_id)
+        self._update_viewport(paint=False)
                     
     def init_empty_grid(self):
-        self.grid_data = [['__' for _ in range(self.grid_cols)] for _ in range(self.grid_rows)]
+        self.grid_data = Grid(self.grid_rows, self.grid_cols)
+        self._reset_document()
         self.update_grid_display()
         
     def update_grid_display(self):
         """Redraw the entire grid display.
         
-        Clears all canvas items and redraws every cell.
-        Called after major changes like loading a new level or applying code.
+        Repaints every cell that has canvas items (the visible ones).
+        Called after major changes like loading a new level or resizing.
         """
-        # Clear old images from canvas
-        for cell, img_id in list(self.cell_images.items()):
-            self.grid_canvas.delete(img_id)
-            del self.cell_images[cell]
+        # Everything is repainted, nothing left for the dirty-cell flush
+        self._dirty_cells.clear()
         
         # Also clear selection highlight (will be redrawn if cell is selected)
         if self.selection_id:
             self.grid_canvas.delete(self.selection_id)
             self.selection_id = None
         
-        # Iterate through all grid cells and redraw them
-        for row in range(self.grid_rows):
-            for col in range(self.grid_cols):
-                # Get the grid code for this cell (or '__' if out of bounds)
-                if row < len(self.grid_data) and col < len(self.grid_data[row]):
-                    code = self.grid_data[row][col]
+        self._repaint_cells(list(self.cell_rects))
+        
+        # Redraw the highlight for the (possibly changed) cells holding its code
+        if self.highlight_code is not None:
+            self.highlight_code_cells(self.highlight_code)
+    
+    def _repaint_cells(self, cells):
+        """Repaint cells that have canvas items, resolving color and texture once per code"""
+        styles = {}  # code -> (color, texture_path)
+        for row, col in cells:
+            if (row, col) not in self.cell_rects or not self.grid_data.in_bounds(row, col):
+                continue
+            code = self.grid_data[row, col]
+            style = styles.get(code)
+            if style is None:
+                style = styles[code] = (self._cell_color(code), self._cell_texture_path(code))
+            self._draw_cell(row, col, code, *style)
+        
+        # Overlays stay above the cell images
+        self.grid_canvas.tag_raise("code_highlight")
+        self.grid_canvas.tag_raise("selection")
+    
+    # ============================================
+    # Virtualized Canvas
+    # ============================================
+    # Canvas items exist only for cells inside the visible scroll region
+    # plus VIEWPORT_MARGIN cells around it. When the view moves, cells that
+    # left it give their rectangle/image items back to a free pool and cells
+    # that entered take items from it, so the number of canvas items depends
+    # on the window size, not the level size. Hit-testing never used the
+    # items (clicks map coordinates to cells), so it is unaffected.
+    # ============================================
+    
+    VIEWPORT_MARGIN = 2  # Extra cells kept around the visible area, so panning doesn't show gaps
+    
+    def _on_canvas_xscroll(self, first, last):
+        self.h_scrollbar.set(first, last)
+        self._schedule_viewport_update()
+    
+    def _on_canvas_yscroll(self, first, last):
+        self.v_scrollbar.set(first, last)
+        self._schedule_viewport_update()
+    
+    def _schedule_viewport_update(self):
+        # Scroll callbacks fire for every motion event - update once per idle
+        if self._viewport_after_id is None:
+            self._viewport_after_id = self.root.after_idle(self._update_viewport)
+    
+    def _visible_range(self):
+        """(first_row, last_row, first_col, last_col) of the cells to keep items for (end exclusive)"""
+        canvas = self.grid_canvas
+        width = canvas.winfo_width()
+        height = canvas.winfo_height()
+        if width <= 1 or height <= 1:
+            # Not mapped yet - use the requested size
+            width = canvas.winfo_reqwidth()
+            height = canvas.winfo_reqheight()
+        left = canvas.canvasx(0)
+        top = canvas.canvasy(0)
+        size = self.cell_size
+        margin = self.VIEWPORT_MARGIN
+        return (max(0, int(top // size) - margin),
+                min(self.grid_rows, int((top + height) // size) + 1 + margin),
+                max(0, int(left // size) - margin),
+                min(self.grid_cols, int((left + width) // size) + 1 + margin))
+    
+    def _update_viewport(self, paint=True):
+        """Give canvas items to the cells that came into view, recycle the rest"""
+        self._viewport_after_id = None
+        viewport = self._visible_range()
+        if viewport == self._viewport:
+            return
+        self._viewport = viewport
+        first_row, last_row, first_col, last_col = viewport
+        
+        for cell in [cell for cell in self.cell_rects
+                     if not (first_row <= cell[0] < last_row and first_col <= cell[1] < last_col)]:
+            self._release_cell(cell)
+        
+        size = self.cell_size
+        entered = []
+        for row in range(first_row, last_row):
+            for col in range(first_col, last_col):
+                if (row, col) in self.cell_rects:
+                    continue
+                x1 = col * size
+                y1 = row * size
+                if self._free_rects:
+                    rect_id = self._free_rects.pop()
+                    self.grid_canvas.coords(rect_id, x1, y1, x1 + size, y1 + size)
+                    self.grid_canvas.itemconfig(rect_id, state='normal')
                 else:
-                    code = '__'
-                    
-                # Get the canvas item ids for this cell
-                rect_id, text_id = self.cell_rects.get((row, col), (None, None))
-                
-                if rect_id:
-                    # Color based on content (visual feedback for different cell types)
-                    if code == '__':
-                        color = '#f5f5f5'  # Light gray for empty
-                    elif code in self.object_definitions:
-                        color = '#c8e6c9'  # Green tint for defined objects
-                    elif code in self.grid_objects and self.grid_objects[code]:
-                        color = '#bbdefb'  # Blue tint for cells with objects
-                    else:
-                        color = '#fff9c4'  # Yellow tint for undefined
-                    
-                    # Update rectangle color on canvas
-                    self.grid_canvas.itemconfig(rect_id, fill=color)
-                    
-                    # Remove old text (we're using images now, text is obsolete)
-                    if text_id:
-                        self.grid_canvas.delete(text_id)
-                        # Update the rects dict to remove text_id
-                        if (row, col) in self.cell_rects:
-                            self.cell_rects[(row, col)] = (self.cell_rects[(row, col)][0], None)
-                    
-                    # Try to display texture (2D or extracted from GLB)
-                    if code != '__' and PIL_AVAILABLE:
-                        texture_path = self.get_cell_texture(row, col)
-                        if texture_path:
-                            # Check if it's already a full path (GLB-extracted temp file)
-                            if os.path.isabs(texture_path) and os.path.exists(texture_path):
-                                self.display_cell_image(row, col, texture_path, color)
-                            else:
-                                # It's a relative path, resolve it from Art/2D folder
-                                full_path = self.resolve_art_path(texture_path, '2D')
-                                if full_path and os.path.exists(full_path):
-                                    self.display_cell_image(row, col, full_path, color)
-                        # If no texture found, keep colored rectangle (Q2)
-                        # This implements "colored rectangle only" fallback
+                    rect_id = self.grid_canvas.create_rectangle(x1, y1, x1 + size, y1 + size,
+                                                               fill='white', outline='gray',
+                                                               activefill='lightblue', tags=("cell",))
+                    # Rectangles stay below images and overlays
+                    self.grid_canvas.tag_lower(rect_id)
+                self.cell_rects[(row, col)] = rect_id
+                entered.append((row, col))
+        
+        if paint and entered:
+            self._repaint_cells(entered)
+    
+    def _release_cell(self, cell):
+        """Hide a cell's canvas items and put them in the free pools"""
+        rect_id = self.cell_rects.pop(cell)
+        self.grid_canvas.itemconfig(rect_id, state='hidden')
+        self._free_rects.append(rect_id)
+        self._release_image(cell)
+        self._stop_waiting(cell)
+        highlight_id = self.highlight_ids.pop(cell, None)
+        if highlight_id:
+            self.grid_canvas.delete(highlight_id)
+    
+    def _release_image(self, cell):
+        self.cell_image_paths.pop(cell, None)
+        self.cell_photos.pop(cell, None)
+        img_id = self.cell_images.pop(cell, None)
+        if img_id:
+            self.grid_canvas.itemconfig(img_id, state='hidden', image='')
+            self._free_images.append(img_id)
+    
+    def _cell_color(self, code):
+        """Rectangle color for a grid code (visual feedback for different cell types)"""
+        if code == '__':
+            return '#f5f5f5'  # Light gray for empty
+        elif code in self.object_definitions:
+            return '#c8e6c9'  # Green tint for defined objects
+        elif code in self.grid_objects and self.grid_objects[code]:
+            return '#bbdefb'  # Blue tint for cells with objects
+        return '#fff9c4'  # Yellow tint for undefined
+    
+    def _cell_texture_path(self, code):
+        """Full path of the texture to draw for a grid code, or None.
+        
+        Resolved once per code and kept in code_textures until the code is
+        invalidated (see invalidate_code_textures).
+        """
+        if code == '__' or not PIL_AVAILABLE:
+            return None
+        if code not in self.code_textures:
+            self.code_textures[code] = self._resolve_cell_texture_path(code)
+        return self.code_textures[code]
+    
+    def _resolve_cell_texture_path(self, code):
+        texture_path = self.get_code_texture(code)
+        if not texture_path:
+            return None
+        # Already a full path (a GLB model, its albedo image is read from it)
+        if os.path.isabs(texture_path):
+            return texture_path
+        # A relative path, resolve it from the Art/2D folder
+        return self.resolve_art_path(texture_path, '2D')
                     
     def on_grid_click(self, event):
         """Handle mouse click on the grid - supports painting and erasing"""
@@ -890,7 +880,7 @@ class LevelEditor:
             self.selected_cell = (row, col)
             self.update_cell_info(row, col)
             self.edit_objects_btn.config(state=tk.NORMAL)
-            self.status_bar.config(text=f"Selected cell: Row {row}, Col {col} (Code: {self.grid_data[row][col]})")
+            self.status_bar.config(text=f"Selected cell: Row {row}, Col {col} (Code: {self.grid_data[row, col]})")
             self.draw_selection_highlight(row, col)
             
     def draw_selection_highlight(self, row, col):
@@ -910,6 +900,48 @@ class LevelEditor:
                                         dash=(5, 3), tags="selection")
         # Lift to top so it's visible over other objects
         self.grid_canvas.lift(self.selection_id)
+    
+    def highlight_code_cells(self, code=None):
+        """Outline every cell holding a code (default: the selected cell's code).
+        
+        The cells come from the grid's reverse index, so this doesn't scan
+        the grid. The highlight follows painting until cleared.
+        """
+        if code is None:
+            if not self.selected_cell:
+                messagebox.showinfo("No Selection", "Select a cell to highlight every cell with its code")
+                return
+            code = self.grid_data[self.selected_cell]
+        
+        self.grid_canvas.delete("code_highlight")
+        self.highlight_ids = {}
+        self.highlight_code = code
+        cells = self.grid_data.cells_with(code)
+        for row, col in cells:
+            # Cells out of view get their outline when they are scrolled in
+            if (row, col) in self.cell_rects:
+                self._update_cell_highlight(row, col, code)
+        if self.selection_id:
+            self.grid_canvas.lift(self.selection_id)
+        self.status_bar.config(text=f"Highlighted {len(cells)} cells with code '{code}'")
+    
+    def clear_code_highlight(self):
+        self.grid_canvas.delete("code_highlight")
+        self.highlight_ids = {}
+        self.highlight_code = None
+    
+    def _update_cell_highlight(self, row, col, code):
+        """Add or remove one cell's highlight outline after its code changed"""
+        item_id = self.highlight_ids.pop((row, col), None)
+        if item_id:
+            self.grid_canvas.delete(item_id)
+        if code != self.highlight_code:
+            return
+        x1 = col * self.cell_size
+        y1 = row * self.cell_size
+        self.highlight_ids[(row, col)] = self.grid_canvas.create_rectangle(
+            x1 + 2, y1 + 2, x1 + self.cell_size - 2, y1 + self.cell_size - 2,
+            outline="#e040fb", width=2, tags="code_highlight")
             
     def on_grid_hover(self, event):
         canvas_x = self.grid_canvas.canvasx(event.x)
@@ -919,14 +951,14 @@ class LevelEditor:
         row = int(canvas_y // self.cell_size)
         
         if 0 <= row < self.grid_rows and 0 <= col < self.grid_cols:
-            code = self.grid_data[row][col]
+            code = self.grid_data[row, col]
             obj_count = len(self.grid_objects.get(code, []))
             self.status_bar.config(text=f"Hover: Row {row}, Col {col} - Code: {code} ({obj_count} objects)")
             
     def on_grid_leave(self, event):
         if self.selected_cell:
             row, col = self.selected_cell
-            self.status_bar.config(text=f"Selected cell: Row {row}, Col {col} (Code: {self.grid_data[row][col]})")
+            self.status_bar.config(text=f"Selected cell: Row {row}, Col {col} (Code: {self.grid_data[row, col]})")
         else:
             self.status_bar.config(text="Ready")
             
@@ -968,6 +1000,8 @@ class LevelEditor:
         """
         # Check if Ctrl key is held - eraser mode works even without paint_code
         ctrl_held = event.state & 0x0004
+        # A new stroke doesn't join up with the end of the previous one
+        self._stroke_last = None
         
         if ctrl_held:
             # Eraser mode - no paint_code needed
@@ -1005,16 +1039,37 @@ class LevelEditor:
     def on_paint_release(self, event):
         """End right-click painting/erasing.
         Resets painting state and restores normal cursor."""
+        was_painting = self.painting
         self.painting = False
         self.erasing = False
+        self._stroke_last = None
         self.grid_canvas.config(cursor="")  # Restore default cursor
+        # Show the end of the stroke without waiting for the next frame
+        if self._stroke_after_id is not None:
+            self.root.after_cancel(self._stroke_after_id)
+            self._flush_stroke_frame()
+        if was_painting:
+            self.update_undo_redo_menu()  # The stroke's entry grew while painting
+        # A stroke can place a new code or erase the last cell of one; the
+        # palette reads the grid's reverse index, so refreshing is cheap
+        if was_painting:
+            self.update_palette_values()
             
+    # Motion events arrive faster than the screen refreshes; painted cells
+    # are repainted together once per frame
+    STROKE_FRAME_INTERVAL = 16  # ms
+    
     def _do_paint(self, event):
-        """Apply paint_code to cell at event position, or erase if Ctrl is held.
+        """Apply paint_code to the cells from the previous motion sample to
+        this one, or erase them if Ctrl is held.
         
         Called by:
         - on_paint_click(): Initial right-click
         - on_paint_drag(): Drag while holding right-click
+        
+        Fast drags are interpolated (line_cells), so no cell is skipped;
+        cells that already hold the code are left alone. The repaint and
+        the status bar update wait for the next stroke frame.
         """
         if not self.painting:
             return
@@ -1022,91 +1077,146 @@ class LevelEditor:
         # Check if Ctrl is held (for eraser mode) - bitwise AND with state mask
         ctrl_held = (event.state & 0x0004) or self.erasing
         
+        if ctrl_held:
+            # Ctrl+Right-click: Erase cells (set to '__' empty)
+            code = '__'
+            action_text = "Erased"
+        elif self.paint_code:
+            # Normal right-click: Paint the cells with paint_code
+            code = self.paint_code
+            action_text = f"Painted '{self.paint_code}'"
+        else:
+            return
+        
         # Convert screen coordinates to canvas coordinates
         canvas_x = self.grid_canvas.canvasx(event.x)
         canvas_y = self.grid_canvas.canvasy(event.y)
         
-        # Calculate which grid cell the mouse is over
-        col = int(canvas_x // self.cell_size)
-        row = int(canvas_y // self.cell_size)
-        
-        # Validate cell is within grid bounds
-        if 0 <= row < self.grid_rows and 0 <= col < self.grid_cols:
-            if ctrl_held:
-                # Ctrl+Right-click: Erase cell (set to '__' empty)
-                self.grid_data[row][col] = '__'
-                action_text = "Erased"
-            elif self.paint_code:
-                # Normal right-click: Paint the cell with paint_code
-                self.grid_data[row][col] = self.paint_code
-                action_text = f"Painted '{self.paint_code}'"
-            else:
-                return
-            
-            # Redraw just this cell (efficient - only updates one cell)
-            self.populate_cell(row, col)
-            
-            # Update selection info panel if this is the currently selected cell
-            if self.selected_cell == (row, col):
-                self.update_cell_info(row, col)
-            
-            self.status_bar.config(text=f"{action_text} at Row {row}, Col {col}")
+        # Calculate which grid cell the mouse is over (may be outside the grid)
+        cell = (int(canvas_y // self.cell_size), int(canvas_x // self.cell_size))
+        if cell == self._stroke_last:
+            return  # Still in the same cell
+        
+        changed = []
+        for row, col in line_cells(self._stroke_last or cell, cell):
+            if self.grid_data.in_bounds(row, col) and self._set_cell(row, col, code):
+                changed.append((row, col))
+        self._stroke_last = cell
+        
+        if changed:
+            row, col = changed[-1]
+            self._stroke_status = f"{action_text} at Row {row}, Col {col}"
+            # The frame flush repaints them (and the cell info if the selected cell is one)
+            self._dirty_cells.update(changed)
+            if self._stroke_after_id is None:
+                self._stroke_after_id = self.root.after(self.STROKE_FRAME_INTERVAL, self._flush_stroke_frame)
+    
+    def _flush_stroke_frame(self):
+        """Repaint the cells painted since the last frame"""
+        self._stroke_after_id = None
+        self._flush_redraw()
+        if self._stroke_status:
+            self.status_bar.config(text=self._stroke_status)
+            self._stroke_status = None
             
     def populate_cell(self, row, col):
-        """Redraw a single cell (for efficient painting).
+        """Redraw a single cell right away.
         
-        Called by _do_paint() when right-click painting/erasing cells.
-        Only redraws the specified cell instead of the entire grid.
+        Only redraws the specified cell instead of the entire grid (paint
+        strokes batch theirs, see _flush_stroke_frame).
         """
         # Validate cell coordinates
-        if row >= len(self.grid_data) or col >= len(self.grid_data[row]):
+        if not self.grid_data.in_bounds(row, col):
             return
         
         # Get the grid code for this cell
-        code = self.grid_data[row][col]
+        code = self.grid_data[row, col]
         
-        # Get the rectangle id for this cell from the cell_rects dict
-        rect_id, text_id = self.cell_rects.get((row, col), (None, None))
-        if not rect_id:
-            return  # Cell not found in canvas
+        # Cells out of view have no canvas items (they are drawn when scrolled in)
+        if (row, col) not in self.cell_rects:
+            return
         
-        # Color based on content (visual feedback for different cell types)
-        if code == '__':
-            color = '#f5f5f5'  # Light gray for empty
-        elif code in self.object_definitions:
-            color = '#c8e6c9'  # Green tint for defined objects
-        elif code in self.grid_objects and self.grid_objects[code]:
-            color = '#bbdefb'  # Blue tint for cells with objects
-        else:
-            color = '#fff9c4'  # Yellow tint for undefined
+        self._draw_cell(row, col, code, self._cell_color(code), self._cell_texture_path(code))
+    
+    def _draw_cell(self, row, col, code, color, texture_path):
+        """Repaint one cell's rectangle and image (color/texture resolved by the caller)"""
+        rect_id = self.cell_rects.get((row, col))
+        if not rect_id:
+            return
         
         # Update rectangle color on canvas
         self.grid_canvas.itemconfig(rect_id, fill=color)
         
-        # Remove old text (we're using images now, text is obsolete)
-        if text_id:
-            self.grid_canvas.delete(text_id)
-            # Update the rects dict to remove text_id
-            if (row, col) in self.cell_rects:
-                self.cell_rects[(row, col)] = (self.cell_rects[(row, col)][0], None)
-        
-        # Remove old image if exists (to prevent overlapping images)
-        if (row, col) in self.cell_images:
-            self.grid_canvas.delete(self.cell_images[(row, col)])
-            del self.cell_images[(row, col)]
-        
-        # Display texture if available (2D or extracted from GLB)
-        if code != '__' and PIL_AVAILABLE:
-            texture_path = self.get_cell_texture(row, col)
-            if texture_path:
-                # Check if it's already a full path (GLB-extracted temp file)
-                if os.path.isabs(texture_path) and os.path.exists(texture_path):
-                    self.display_cell_image(row, col, texture_path, color)
-                else:
-                    # It's a relative path, resolve it from Art/2D folder
-                    full_path = self.resolve_art_path(texture_path, '2D')
-                    if full_path and os.path.exists(full_path):
-                        self.display_cell_image(row, col, full_path, color)
+        # Display texture if available (2D or extracted from GLB), reusing the
+        # cell's image item; without one the colored rectangle is the fallback
+        if texture_path:
+            self.display_cell_image(row, col, texture_path, color)
+        else:
+            self._release_image((row, col))
+            self._stop_waiting((row, col))
+        
+        # Keep the code highlight in step with the painted cell
+        if self.highlight_code is not None:
+            self._update_cell_highlight(row, col, code)
+    
+    # ============================================
+    # Dirty-Cell Redraw
+    # ============================================
+    # Edits mark the cells they affect; one after_idle flush then repaints
+    # only those cells, so applying a code, editing a cell's objects or
+    # undoing a paint stroke doesn't redraw the whole grid.
+    # update_grid_display() stays for loads, resizes and zoom.
+    # ============================================
+    
+    def mark_cells_dirty(self, cells):
+        """Queue cells ((row, col) pairs) for the next redraw flush"""
+        self._dirty_cells.update(cells)
+        self._schedule_redraw()
+    
+    def mark_codes_dirty(self, codes):
+        """Queue every cell holding one of the codes (their gridObjects entry changed)"""
+        codes = list(codes)
+        self.invalidate_code_textures(codes)
+        for code in codes:
+            self._dirty_cells.update(self.grid_data.cells_with(code))
+        self._schedule_redraw()
+    
+    def invalidate_code_textures(self, codes=None):
+        """Forget the resolved textures of codes (all codes if None)"""
+        if codes is None:
+            self.code_textures.clear()
+            return
+        for code in codes:
+            self.code_textures.pop(code, None)
+    
+    def mark_definitions_dirty(self, names):
+        """Queue the cells affected by changed objectDefinitions entries: cells
+        whose code is one of the names (color) and cells whose gridObjects
+        reference them (texture)"""
+        names = set(names)
+        codes = set(names)
+        for code, objects in self.grid_objects.items():
+            if any(isinstance(obj, str) and obj in names for obj in objects or ()):
+                codes.add(code)
+        self.mark_codes_dirty(codes)
+    
+    def _changed_entries(self, old, new):
+        """Keys whose value differs between two dicts (added and removed keys included)"""
+        return [key for key in old.keys() | new.keys()
+                if key not in old or key not in new or old[key] != new[key]]
+    
+    def _schedule_redraw(self):
+        if self._dirty_cells and self._redraw_after_id is None:
+            self._redraw_after_id = self.root.after_idle(self._flush_redraw)
+    
+    def _flush_redraw(self):
+        """Repaint the queued cells, resolving color and texture once per code"""
+        self._redraw_after_id = None
+        dirty, self._dirty_cells = self._dirty_cells, set()
+        # Cells out of view are skipped, they get painted when scrolled in
+        self._repaint_cells(dirty)
+        if self.selected_cell in dirty:
+            self.update_cell_info(*self.selected_cell)
             
     def update_palette_values(self):
         """Update Quick Palette dropdown with codes used in the grid only.
@@ -1114,11 +1224,7 @@ class LevelEditor:
         values = ['__ (empty)']
         
         # Get all codes actually in grid_data (placed on the grid)
-        codes_in_grid = set()
-        for row in self.grid_data:
-            for cell in row:
-                if cell and cell != '__':
-                    codes_in_grid.add(cell)
+        codes_in_grid = self.grid_data.used_codes()
         
         # Get shared definitions to filter them out
         shared_defs = getattr(self, 'shared_data', {}).get('objectDefinitions', {})
@@ -1162,13 +1268,15 @@ class LevelEditor:
             self.status_bar.config(text=f"Paint code set: {code} (right-click to paint)")
             
     def update_cell_info(self, row, col):
-        code = self.grid_data[row][col]
+        code = self.grid_data[row, col]
         objects = self.grid_objects.get(code, [])
         
         self.cell_info_text.config(state=tk.NORMAL)
         self.cell_info_text.delete('1.0', tk.END)
         self.cell_info_text.insert('1.0', f"Cell: Row {row}, Col {col}\n")
         self.cell_info_text.insert(tk.END, f"Grid Code: {code}\n")
+        if code != '__':
+            self.cell_info_text.insert(tk.END, f"Used in {self.grid_data.count(code)} cells\n")
         
         if code in self.object_definitions:
             self.cell_info_text.insert(tk.END, f"✓ Code defined in objectDefinitions\n")
@@ -1212,8 +1320,8 @@ class LevelEditor:
             return
         
         # Apply the code to the grid data
-        self.grid_data[row][col] = new_code
-        self.update_grid_display()
+        self._set_cell(row, col, new_code)
+        self.mark_cells_dirty([(row, col)])
         self.update_cell_info(row, col)
         
         # Set as paint code for right-click painting (RPG Maker-style)
@@ -1233,8 +1341,8 @@ class LevelEditor:
         self._push_undo_state()
         
         row, col = self.selected_cell
-        self.grid_data[row][col] = '__'
-        self.update_grid_display()
+        self._set_cell(row, col, '__')
+        self.mark_cells_dirty([(row, col)])
         self.update_cell_info(row, col)
         
     def edit_cell_objects(self):
@@ -1242,14 +1350,16 @@ class LevelEditor:
             return
         
         row, col = self.selected_cell
-        code = self.grid_data[row][col]
+        code = self.grid_data[row, col]
         
         if code == '__':
             messagebox.showinfo("Empty Cell", "This cell is empty (__). Apply a grid code first.")
             return
         
-        # Push current state to undo stack before editing objects
+        # Push current state to undo stack before editing objects; the
+        # dialog edits the entry in place, so keep a copy of it as it was
         self._push_undo_state()
+        before = copy.deepcopy(self.grid_objects.get(code, MISSING))
         
         # Ensure grid_objects entry exists
         if code not in self.grid_objects:
@@ -1262,7 +1372,12 @@ class LevelEditor:
         if dialog.result:
             self.grid_objects = dialog.result
             self.update_cell_info(row, col)
-            self.update_grid_display()
+            # The dialog only edits this code's entry
+            self.mark_codes_dirty([code])
+        if before is MISSING and self.grid_objects.get(code) == []:
+            # Nothing was added: drop the placeholder so the dialog left no change behind
+            del self.grid_objects[code]
+        self._record_entry('gridObjects', code, before)
             
     def update_defs_display(self):
         self.defs_text.delete('1.0', tk.END)
@@ -1282,14 +1397,10 @@ class LevelEditor:
         self.update_palette_values()
             
     def zoom_in(self):
-        self.cell_size = min(80, self.cell_size + 5)
-        self.setup_grid()
-        self.update_grid_display()
+        self._zoom_to(min(80, self.cell_size + 5))
         
     def zoom_out(self):
-        self.cell_size = max(20, self.cell_size - 5)
-        self.setup_grid()
-        self.update_grid_display()
+        self._zoom_to(max(20, self.cell_size - 5))
         
     def set_shared_defs(self):
         """Open file dialog to select shared definitions file"""
@@ -1309,7 +1420,8 @@ class LevelEditor:
         Uses include directive when saving.
         """
         try:
-            data, error = load_yaml_file(filepath)
+            # Shared definitions rarely change - use the on-disk parse cache across launches
+            data, error = load_yaml_file(filepath, persistent=True)
             
             if error:
                 messagebox.showerror("Error Loading Shared Definitions", error)
@@ -1321,6 +1433,7 @@ class LevelEditor:
             
             self.shared_defs_path.set(filepath)
             self.shared_data = data
+            old_objects, old_definitions = self.grid_objects, self.object_definitions
             
             # Merge shared object definitions
             if 'objectDefinitions' in data:
@@ -1335,6 +1448,23 @@ class LevelEditor:
                 merged = data['gridObjects'].copy()
                 merged.update(self.grid_objects)
                 self.grid_objects = merged
+            
+            # Shared entries come from the include, so saving only writes them once edited.
+            # The entries the merge added are recorded as one undo step.
+            with self._undo_transaction(f"Load {os.path.basename(filepath)}"):
+                for key, old_entries in (('objectDefinitions', old_definitions), ('gridObjects', old_objects)):
+                    saved_entries = self.saved_level.get(key) or PersistentMap()
+                    for code, value in (data.get(key) or {}).items():
+                        if code in old_entries and code in saved_entries:
+                            continue
+                        value = copy.deepcopy(value)
+                        if code not in old_entries:
+                            # Added by the merge: the document, the undo log and saved_level share the copy
+                            self.document = self.document.set_entry(key, code, value)
+                            self.undo_log.record(key, code, MISSING, value)
+                        if code not in saved_entries:
+                            saved_entries = saved_entries.set(code, value)
+                    self.saved_level[key] = saved_entries
                 
             self.status_bar.config(text=f"Loaded shared definitions: {os.path.basename(filepath)}")
             messagebox.showinfo("Shared Definitions Loaded", 
@@ -1342,8 +1472,9 @@ class LevelEditor:
                 f"Object definitions: {len(data.get('objectDefinitions', {}))}\n"
                 f"Grid objects: {len(data.get('gridObjects', {}))}")
             
-            # Update display
-            self.update_grid_display()
+            # Repaint only the cells whose entries the shared definitions added
+            self.mark_codes_dirty(self._changed_entries(old_objects, self.grid_objects))
+            self.mark_definitions_dirty(self._changed_entries(old_definitions, self.object_definitions))
             return True
             
         except Exception as e:
@@ -1353,7 +1484,8 @@ class LevelEditor:
     def new_level(self):
         if messagebox.askyesno("New Level", "Create a new level? Unsaved changes will be lost."):
             # Create empty grid
-            self.grid_data = [['__' for _ in range(self.grid_cols)] for _ in range(self.grid_rows)]
+            self.grid_data = Grid(self.grid_rows, self.grid_cols)
+            self.grid_layout = GridLayout()
             
             # Check if shared definitions are set
             has_shared_defs = (self.shared_defs_path.get() and 
@@ -1361,7 +1493,7 @@ class LevelEditor:
             
             if has_shared_defs:
                 # Place 'gm' tile at top-left (row=0, col=0)
-                self.grid_data[0][0] = 'gm'
+                self.grid_data[0, 0] = 'gm'
                 
                 # Define gm grid objects (management tiles)
                 self.grid_objects['gm'] = [
@@ -1387,12 +1519,15 @@ class LevelEditor:
             self.object_definitions = {}
             self.full_yaml_data = {}
             self.current_file = None
+            self.level_view = None
+            self.saved_level = {}
+            self._reset_document()
             
             # Clear undo/redo history for new level
-            self.undo_stack.clear()
-            self.redo_stack.clear()
+            self.undo_log.clear()
             self.update_undo_redo_menu()
             
+            self.invalidate_code_textures()
             self.update_grid_display()
             self.update_defs_display()
             self.update_palette_values()  # Update palette to show 'gm' if placed
@@ -1413,13 +1548,23 @@ class LevelEditor:
     def load_yaml(self, filename):
         """Load a level from YAML file, resolving includes if present.
         
-        Uses resolve_includes() to handle files with include directives.
+        Uses an IncludeGraph to handle files with include directives.
         Merges shared definitions if a shared defs file is set.
         Updates grid display, definitions, and objects after loading.
         """
         try:
-            # Use the include-aware loader
-            merged_data, warnings, errors = resolve_includes(filename)
+            # Parse cache counters before this open (to report hits/misses for it)
+            cache_before = get_parse_cache_stats()
+            
+            # Load the level, its includes and the shared definitions as one include
+            # graph, so files referenced by both (LevelsShared.yaml) are parsed once
+            include_graph = IncludeGraph()
+            include_graph.add([filename])
+            shared_defs_file = self.shared_defs_path.get()
+            if shared_defs_file and os.path.exists(shared_defs_file):
+                include_graph.add([shared_defs_file], persistent=True)
+            
+            merged_data, warnings, errors = include_graph.resolve(filename)
             
             # Show warnings/errors
             if warnings:
@@ -1435,9 +1580,9 @@ class LevelEditor:
                 messagebox.showerror("Error", "Empty or invalid YAML file")
                 return
             
-            # Merge with shared definitions if set (use resolve_includes to get ALL shared data)
-            if self.shared_defs_path.get() and os.path.exists(self.shared_defs_path.get()):
-                shared_data, shared_warnings, shared_errors = resolve_includes(self.shared_defs_path.get())
+            # Merge with shared definitions if set (resolve through the include graph to get ALL shared data)
+            if shared_defs_file and os.path.exists(shared_defs_file):
+                shared_data, shared_warnings, shared_errors = include_graph.resolve(shared_defs_file)
                 warnings.extend(shared_warnings)
                 errors.extend(shared_errors)
                 if shared_data:
@@ -1453,7 +1598,7 @@ class LevelEditor:
                             merged_dict = value.copy()
                             merged_dict.update(merged_data[key])
                             merged_data[key] = merged_dict
-                    warnings.append(f"Merged with shared definitions: {os.path.basename(self.shared_defs_path.get())}")
+                    warnings.append(f"Merged with shared definitions: {os.path.basename(shared_defs_file)}")
             
             # Store full YAML data for preservation
             self.full_yaml_data = merged_data
@@ -1465,31 +1610,22 @@ class LevelEditor:
                 inc_msg = f"Loaded with includes: {', '.join(self.loaded_includes)}"
                 self.status_bar.config(text=inc_msg)
             
-            # Load grid - handle multiline string with sections
+            # Keep the file's text so saving only re-emits the sections that change
+            self.level_view = read_level_sections(filename, keys=('fileProperties',))
+            
+            # Load grid - the file's own grid block is parsed together with its layout
+            # (blank lines between sections, column gutters) so that saving an edited
+            # grid rewrites only the edited rows. Short rows are padded with '__'.
+            self.grid_layout = GridLayout()
             if 'grid' in merged_data:
-                grid_str = merged_data['grid']
-                lines = [line.strip() for line in str(grid_str).strip().split('\n') if line.strip()]
-                
-                self.grid_data = []
-                max_cols = 0
-                
-                for line in lines:
-                    # Parse comma-separated values
-                    cells = [c.strip() for c in line.split(',') if c.strip()]
-                    # Remove trailing empty strings from trailing commas
-                    while cells and cells[-1] == '':
-                        cells.pop()
-                    if cells:
-                        self.grid_data.append(cells)
-                        max_cols = max(max_cols, len(cells))
-                
-                self.grid_rows = len(self.grid_data)
-                self.grid_cols = max_cols
-                
-                # Pad all rows to grid_cols with '__' to prevent IndexError on hover
-                for i, row in enumerate(self.grid_data):
-                    if len(row) < self.grid_cols:
-                        self.grid_data[i] = row + ['__'] * (self.grid_cols - len(row))
+                grid_section = self.level_view.section('grid')
+                grid, layout = parse_grid_block(grid_section.body) if grid_section else (None, None)
+                if layout is not None and layout.header is not None:
+                    self.grid_data, self.grid_layout = grid, layout
+                else:
+                    # Grid inherited from an include, or not a block scalar
+                    self.grid_data = parse_grid_text(merged_data['grid'])
+                self.grid_rows, self.grid_cols = self.grid_data.shape
             
             # Load objectDefinitions (merge from includes)
             if 'objectDefinitions' in merged_data and merged_data['objectDefinitions']:
@@ -1512,105 +1648,189 @@ class LevelEditor:
                 self.camera_settings = merged_data['cameraSettings']
             else:
                 self.camera_settings = {}
-                    
+            
+            self._reset_document()
+            self.saved_level = self._level_section_values(self.document)
+            
+            # New gridObjects/objectDefinitions: resolve every code's texture again
+            self.invalidate_code_textures()
             self.setup_grid()
             self.update_grid_display()
             self.update_defs_display()
             self.update_palette_values()
             
-            # Clear undo/redo history and set initial state for loaded file
-            self.undo_stack.clear()
-            self.redo_stack.clear()
-            # Save initial state so "undo" after load reverts to empty (or previous)
-            self._push_undo_state()
+            # Clear undo/redo history for the loaded file
+            self.undo_log.clear()
             self.update_undo_redo_menu()
             
-            self.status_bar.config(text=f"Loaded: {os.path.basename(filename)}")
+            cache_after = get_parse_cache_stats()
+            self.status_bar.config(text=f"Loaded: {os.path.basename(filename)} "
+                                        f"(parse cache: {cache_after['hits'] - cache_before['hits']} hits, "
+                                        f"{cache_after['misses'] - cache_before['misses']} misses, "
+                                        f"{cache_after['disk_hits'] - cache_before['disk_hits']} from disk)")
             
         except Exception as e:
             messagebox.showerror("Error Loading YAML", str(e))
             import traceback
             traceback.print_exc()
             
+    # ============================================
+    # Level Document
+    # ============================================
+    # self.document is an immutable LevelDocument (level_state) mirroring the
+    # working state: grid rows, gridObjects, objectDefinitions, globalData and
+    # the scalar sections. Loading a level builds it once (_reset_document);
+    # after that every edit path that records undo changes (_set_cell,
+    # _record_entry, resize, undo/redo) also swaps in an updated document,
+    # which copies only the changed row or entry. Saving serializes a
+    # document and diffs it against the one saved last, so it never reads
+    # the mutable dicts and needs no deep copies.
+    # ============================================
+    
+    def _reset_document(self):
+        """Rebuild the document from the working state (after a whole level was replaced)"""
+        self.document = LevelDocument.from_state(
+            self.grid_data, self.grid_layout, self.grid_objects, self.object_definitions,
+            self.full_yaml_data.get('globalData') or {},
+            camera_settings=self.camera_settings,
+            scene_name=getattr(self, 'scene_name', 'OriginalWorld'),
+            creator_name=getattr(self, 'creator_name', 'Level Editor User'),
+            includes=self.loaded_includes)
+    
     # ============================================
     # Undo/Redo System
     # ============================================
-    # Implements state-snapshot undo/redo with keyboard shortcuts:
+    # Implements change-log undo/redo with keyboard shortcuts:
     # - Ctrl+Z: Undo last action
     # - Ctrl+Shift+Z: Redo last undone action
     # - Menu: Edit > Undo/Redo (enabled/disabled based on stack state)
     #
-    # State snapshots capture: grid_data, grid_objects, object_definitions
-    # Maximum history: 50 states (configurable via max_undo_history)
+    # Each action opens an entry in the undo log (_push_undo_state) and the
+    # edits record what they changed as they happen (_set_cell, _set_entry,
+    # _record_entry, resize): cells, single gridObjects/objectDefinitions
+    # entries, or the grid before and after a resize. Nothing is snapshotted,
+    # so an entry costs memory in proportion to what the action changed.
+    # Bulk operations (resize, loading shared definitions) group their edits
+    # with _undo_transaction so they undo as one step.
+    # History is capped by memory (UNDO_HISTORY_BUDGET), oldest actions are
+    # dropped first; the right end of the status bar shows its current use.
     # ============================================
     
-    def _get_current_state(self):
-        """Capture current editor state for undo/redo.
-        
-        Returns a deep copy of:
-        - grid_data: 2D list of cell codes
-        - grid_objects: dict mapping codes to object lists
-        - object_definitions: dict mapping codes to definitions
-        
-        Uses deepcopy to ensure complete isolation between states.
-        """
-        return {
-            'grid_data': copy.deepcopy(self.grid_data),
-            'grid_objects': copy.deepcopy(self.grid_objects),
-            'object_definitions': copy.deepcopy(self.object_definitions)
-        }
+    UNDO_HISTORY_BUDGET = 16 * 1024 * 1024  # Bytes of recorded changes the undo history may hold
     
-    def _push_undo_state(self):
-        """Save current state to undo stack before making changes.
-        
-        Called before any action that modifies level data.
-        Clears redo stack since new actions invalidate redo history.
-        Trims history to max_undo_history (removes oldest entry).
+    def _push_undo_state(self, label=None):
+        """Start an undoable action that is about to modify level data.
+        
+        Called before any action that modifies level data. O(1): the entry
+        is opened by the action's first recorded change (_record_undo), which
+        also clears the redo stack. An action that changes nothing leaves
+        undo/redo history as it was.
+        Inside an _undo_transaction the transaction's action continues.
         """
-        state = self._get_current_state()
-        self.undo_stack.append(state)
-        # Trim history if over limit (remove oldest entry)
-        if len(self.undo_stack) > self.max_undo_history:
-            self.undo_stack.pop(0)
-        # Clear redo stack - new actions invalidate redo
-        self.redo_stack.clear()
+        self.undo_log.push(label)
+    
+    def _record_undo(self, kind, key, before, after):
+        """Record a change of the current action; the first one updates the Undo/Redo menu"""
+        if self.undo_log.record(kind, key, before, after):
+            self.update_undo_redo_menu()
+    
+    @contextmanager
+    def _undo_transaction(self, label):
+        """Record the edits made inside the with block as one undo step"""
+        with self.undo_log.transaction(label):
+            yield
         self.update_undo_redo_menu()
     
-    def _restore_state(self, state):
-        """Restore editor to a previously saved state.
+    def _set_cell(self, row, col, code):
+        """Set one cell and record it for undo. Returns False if it already held code."""
+        old = self.grid_data[row, col]
+        if old == code:
+            return False
+        self.grid_data[row, col] = code
+        self.document = self.document.set_cell(row, col, code)
+        self._record_undo('cell', (row, col), old, code)
+        return True
+    
+    def _entries(self, kind):
+        return self.grid_objects if kind == 'gridObjects' else self.object_definitions
+    
+    def _set_entry(self, kind, key, value):
+        """Set a gridObjects/objectDefinitions entry (MISSING removes it) and record it for undo"""
+        entries = self._entries(kind)
+        before = copy.deepcopy(entries.get(key, MISSING))
+        if value is MISSING:
+            entries.pop(key, None)
+        else:
+            entries[key] = value
+        self._record_entry(kind, key, before)
+    
+    def _record_entry(self, kind, key, before):
+        """Record an entry that was changed in place; before is a copy of its old value"""
+        after = copy.deepcopy(self._entries(kind).get(key, MISSING))
+        if after != before:
+            # The document and the log share the copy; neither mutates it
+            self.document = self.document.set_entry(kind, key, after)
+            self._record_undo(kind, key, before, after)
+    
+    def _apply_undo_entry(self, entry, undo):
+        """Write back an entry's before values (undo) or after values (redo)
+        and repaint only what it touched"""
+        changes = reversed(entry.changes) if undo else entry.changes
+        cells, codes, names = set(), set(), set()
+        regrid = False
+        for kind, key, before, after in changes:
+            value = before if undo else after
+            if kind == 'cell':
+                self.grid_data[key] = value
+                self.document = self.document.set_cell(key[0], key[1], value)
+                cells.add(key)
+            elif kind == 'grid':
+                grid, layout = value
+                self.grid_data, self.grid_layout = grid.copy(), layout.copy()
+                self.document = self.document.set_grid(grid, layout)
+                regrid = True
+            else:
+                entries = self._entries(kind)
+                if value is MISSING:
+                    entries.pop(key, None)
+                else:
+                    # The log keeps its own copy, later in-place edits must not reach it
+                    entries[key] = copy.deepcopy(value)
+                self.document = self.document.set_entry(kind, key, value)
+                (codes if kind == 'gridObjects' else names).add(key)
         
-        Restores grid_data, grid_objects, and object_definitions
-        from the saved state dictionary, then refreshes all UI elements.
-        """
-        self.grid_data = state['grid_data']
-        self.grid_objects = state['grid_objects']
-        self.object_definitions = state['object_definitions']
         # Refresh all UI elements to reflect restored state
-        self.update_grid_display()
+        if regrid:
+            self.grid_rows, self.grid_cols = self.grid_data.shape
+            self.invalidate_code_textures()
+            self.setup_grid()
+            self.update_grid_display()
+        else:
+            # Repaint only what the undone/redone action touched
+            self.mark_cells_dirty(cells)
+            self.mark_codes_dirty(codes)
+            self.mark_definitions_dirty(names)
         if self.selected_cell:
             row, col = self.selected_cell
-            self.update_cell_info(row, col)
+            if self.grid_data.in_bounds(row, col):
+                self.update_cell_info(row, col)
         self.update_defs_display()
         self.update_palette_values()
     
     def undo(self, event=None):
         """Undo the last action (Ctrl+Z or Edit > Undo).
         
-        Pops the last state from undo_stack and restores it.
-        The current state is saved to redo_stack for possible redo.
-        Shows "Nothing to undo" if undo_stack is empty.
+        Pops the last entry from the undo log and writes back what it changed.
+        The entry moves to the redo stack for possible redo.
+        Shows "Nothing to undo" if there is nothing to undo.
         """
-        if not self.undo_stack:
+        entry = self.undo_log.undo()
+        if entry is None:
             self.status_bar.config(text="Nothing to undo")
+            self.update_undo_redo_menu()
             return
         
-        # Save current state to redo stack
-        current_state = self._get_current_state()
-        self.redo_stack.append(current_state)
-        
-        # Restore previous state
-        previous_state = self.undo_stack.pop()
-        self._restore_state(previous_state)
+        self._apply_undo_entry(entry, undo=True)
         
         self.status_bar.config(text="Undo successful")
         self.update_undo_redo_menu()
@@ -1618,21 +1838,16 @@ class LevelEditor:
     def redo(self, event=None):
         """Redo the last undone action (Ctrl+Shift+Z or Edit > Redo).
         
-        Pops the last state from redo_stack and restores it.
-        The current state is saved to undo_stack for possible undo.
-        Shows "Nothing to redo" if redo_stack is empty.
+        Pops the last entry from the redo stack and applies its changes again.
+        The entry moves back to the undo stack for possible undo.
+        Shows "Nothing to redo" if the redo stack is empty.
         """
-        if not self.redo_stack:
+        entry = self.undo_log.redo()
+        if entry is None:
             self.status_bar.config(text="Nothing to redo")
             return
         
-        # Save current state to undo stack
-        current_state = self._get_current_state()
-        self.undo_stack.append(current_state)
-        
-        # Restore redo state
-        redo_state = self.redo_stack.pop()
-        self._restore_state(redo_state)
+        self._apply_undo_entry(entry, undo=False)
         
         self.status_bar.config(text="Redo successful")
         self.update_undo_redo_menu()
@@ -1645,19 +1860,22 @@ class LevelEditor:
         - Disabled (grayed out): when the respective stack is empty
         
         Menu indices: 0=Undo, 1=Redo (set in setup_menu)
+        Also shows the history's memory use at the right end of the status bar.
         """
         if hasattr(self, 'edit_menu'):
             # Undo menu item (index 0)
-            if self.undo_stack:
+            if self.undo_log.can_undo():
                 self.edit_menu.entryconfig(0, state='normal')
             else:
                 self.edit_menu.entryconfig(0, state='disabled')
             
             # Redo menu item (index 1)
-            if self.redo_stack:
+            if self.undo_log.can_redo():
                 self.edit_menu.entryconfig(1, state='normal')
             else:
                 self.edit_menu.entryconfig(1, state='disabled')
+        if hasattr(self, 'history_status'):
+            self.history_status.config(text=self.undo_log.format_stats())
     
     def save_yaml(self):
         if not self.current_file:
@@ -1709,70 +1927,186 @@ class LevelEditor:
     def write_yaml(self, filename):
         """Save level data to YAML file in game-compatible format.
         
-        Outputs minimal YAML containing only essential keys:
-        - fileProperties, sceneName, cameraSettings (required by game parser)
+        Starts from the text of the loaded file and re-emits only what changed
+        since it was loaded or last saved (see _build_level_text). Untouched
+        sections - globalData, sounds, comments, flow-style lists - are written
+        back verbatim. The file is replaced atomically and not touched at all
+        when nothing changed. A new level gets the essential keys:
+        - fileProperties, sceneName (required by game parser)
         - grid (as literal block scalar)
         - gridObjects (only for codes actually used in grid)
         - objectDefinitions (always present, even if empty)
-        - include (when using shared definition files)
+        - include, cameraSettings (when set)
         """
         try:
-            # Build grid string - match original format with sections
-            grid_lines = []
-            for i, row in enumerate(self.grid_data):
-                padded_row = row + ['__'] * (self.grid_cols - len(row))
-                line = ','.join(padded_row) + ','
-                grid_lines.append('  ' + line)
-                if (i + 1) % 8 == 0 and (i + 1) < len(self.grid_data):
-                    grid_lines.append('')
-            grid_str = '\n'.join(grid_lines)
-            
-            # Build output - ONLY include necessary keys for a runnable level
-            output = {}
-            
-            # Required keys (game parser expects these)
-            creator = getattr(self, 'creator_name', 'Level Editor User')
-            output['fileProperties'] = {'creatorName': creator}
-            output['sceneName'] = getattr(self, 'scene_name', 'OriginalWorld')
-            output['grid'] = LiteralString(grid_str)
-            
-            # objectDefinitions - ALWAYS include (game parser requires it)
-            output['objectDefinitions'] = {}
-            
-            # gridObjects - only save non-empty AND used in grid
-            if self.grid_objects:
-                used_codes = set()
-                for row in self.grid_data:
-                    for cell in row:
-                        if cell and cell != '__':
-                            used_codes.add(cell)
-                
-                filtered = {}
-                for k, v in self.grid_objects.items():
-                    if v and k in used_codes:
-                        filtered[k] = v
-                if filtered:
-                    output['gridObjects'] = filtered
-            
-            # cameraSettings
-            if hasattr(self, 'camera_settings') and self.camera_settings:
-                output['cameraSettings'] = self.camera_settings
-            
-            # include directive (when using shared files)
-            if self.loaded_includes:
-                output['include'] = self.loaded_includes
+            # Serialize a snapshot: nothing below reads the working state
+            text, view, saved = self._build_level_text(self.document)
             
-            # Write to file
-            with open(filename, 'w') as f:
-                yaml.dump(output, f, default_flow_style=False, sort_keys=False, allow_unicode=True)
-                
-            self.status_bar.config(text=f"Saved: {os.path.basename(filename)}")
-            messagebox.showinfo("Saved", f"Level saved to:\n{filename}")
+            # Write to file atomically; an unchanged file is left untouched
+            written = write_text_atomic(filename, text)
+            
+            self.level_view = view
+            self.saved_level = saved
+            
+            if written:
+                self.status_bar.config(text=f"Saved: {os.path.basename(filename)}")
+                messagebox.showinfo("Saved", f"Level saved to:\n{filename}")
+            else:
+                self.status_bar.config(text=f"No changes to save: {os.path.basename(filename)}")
             
         except Exception as e:
             messagebox.showerror("Error Saving", str(e))
             import traceback
             traceback.print_exc()
+    
+    # ============================================
+    # Section-Preserving Save
+    # ============================================
+    # write_yaml splices changes into the loaded file's text (a LevelView from
+    # level_sections) instead of dumping the whole level again:
+    # - include, fileProperties, sceneName, cameraSettings, grid: the whole
+    #   section is re-emitted when its value changed
+    # - gridObjects, objectDefinitions: only changed entries are re-emitted,
+    #   in place; new ones are appended, deleted ones removed
+    # Changes are found by comparing against saved_level, the document's
+    # values at load/save time. Both share everything that wasn't edited, so
+    # the comparison (and the save) costs about as much as the edit.
+    # ============================================
+    
+    SAVED_SECTION_ORDER = ('include', 'fileProperties', 'sceneName', 'cameraSettings',
+                           'grid', 'gridObjects', 'objectDefinitions')
+    
+    def _level_section_values(self, document):
+        """A document's values of the sections write_yaml manages"""
+        return {
+            'include': list(document.includes),
+            'fileProperties': document.creator_name,
+            'sceneName': document.scene_name,
+            'cameraSettings': document.camera_settings,
+            'grid': document.grid,
+            'gridObjects': document.grid_objects,
+            'objectDefinitions': document.object_definitions,
+        }
+    
+    def _build_level_text(self, document):
+        """Build the text to save from a LevelDocument.
+        
+        Returns (text, view, saved): the file text, the LevelView of that text
+        and the saved_level values to compare the next save against.
+        """
+        missing = object()
+        view = self.level_view or LevelView('', [], {})
+        current = self._level_section_values(document)
+        saved = dict(self.saved_level)
+        replacements = {}
+        
+        def section_changed(key):
+            return saved.get(key, missing) != current[key]
+        
+        if section_changed('include') or ('include' not in view and current['include']):
+            includes = current['include']
+            replacements['include'] = (dump_yaml({'include': includes}, default_flow_style=None,
+                                                 sort_keys=False, allow_unicode=True)
+                                       if includes else None)
+        
+        properties = view.get('fileProperties')
+        if section_changed('fileProperties') or 'fileProperties' not in view:
+            # Keep any other file properties, the editor only edits the creator
+            properties = dict(properties or {})
+            properties['creatorName'] = current['fileProperties']
+            replacements['fileProperties'] = self._dump_section('fileProperties', properties)
+        
+        if section_changed('sceneName') or 'sceneName' not in view:
+            replacements['sceneName'] = self._dump_section('sceneName', current['sceneName'])
+        
+        if section_changed('cameraSettings'):
+            settings = current['cameraSettings']
+            replacements['cameraSettings'] = self._dump_section('cameraSettings', settings) if settings else None
+        
+        if section_changed('grid') or 'grid' not in view:
+            replacements['grid'] = self._format_grid_section(document)
+        
+        # gridObjects - only save non-empty AND used in grid
+        used_codes = None
+        def keep_grid_object(code, value):
+            nonlocal used_codes
+            if used_codes is None:
+                used_codes = document.grid.used_codes()
+            return bool(value) and code in used_codes
+        
+        for key, emit, keep in (('gridObjects', self._dump_flow_entry, keep_grid_object),
+                                ('objectDefinitions', self._dump_block_entry, lambda code, value: True)):
+            body, saved[key] = self._splice_entries(view, key, current[key], saved.get(key) or PersistentMap(),
+                                                    emit, keep)
+            if body is not None:
+                replacements[key] = body
+        
+        # objectDefinitions - ALWAYS include (game parser requires it)
+        if 'objectDefinitions' not in view and 'objectDefinitions' not in replacements:
+            replacements['objectDefinitions'] = 'objectDefinitions:\n'
+        
+        # Keys that aren't in the file yet are appended in the usual level order
+        ordered = {key: replacements[key] for key in self.SAVED_SECTION_ORDER if key in replacements}
+        view = view.splice(ordered)
+        view.data = {'fileProperties': properties}
+        
+        # Document values are never mutated, so they can be kept as they are
+        for key in ('include', 'fileProperties', 'sceneName', 'cameraSettings', 'grid'):
+            if key in replacements:
+                saved[key] = current[key]
+        return view.text, view, saved
+    
+    def _splice_entries(self, view, key, entries, saved_entries, emit, keep):
+        """Re-emit the changed entries of a mapping section (gridObjects, objectDefinitions).
+        
+        entries and saved_entries are PersistentMaps. Entries that differ from
+        saved_entries are rewritten in place if keep() accepts them and
+        removed otherwise; new entries are appended.
+        Returns (new section body or None if unchanged, updated saved entries).
+        """
+        changed = entries.changed_keys(saved_entries)
+        if not changed and key in view:
+            return None, saved_entries
+        
+        updates = {}
+        for code in changed:
+            if code in entries and keep(code, entries[code]):
+                updates[code] = emit(code, entries[code])
+                saved_entries = saved_entries.set(code, entries[code])
+            else:
+                updates[code] = None
+                # Not in the file now, so compare it as a new entry next time
+                saved_entries = saved_entries.remove(code)
+        
+        section = view.section(key)
+        entries_view = parse_section_entries(section, view.newline) if section else None
+        if entries_view is not None:
+            return entries_view.render(updates), saved_entries
+        
+        # Empty or flow-style section ('objectDefinitions:', 'gridObjects: {}') - write it out in block style
+        existing = safe_load_yaml(section.body).get(key) if section else None
+        lines = [f"{key}:\n"]
+        for code, value in (existing if isinstance(existing, dict) else {}).items():
+            if code not in updates:
+                lines.append(emit(code, value))
+        lines.extend(text for text in updates.values() if text is not None)
+        return lines[0] + ''.join('  ' + line for text in lines[1:] for line in text.splitlines(True)), saved_entries
+    
+    def _dump_section(self, key, value):
+        return dump_yaml({key: value}, default_flow_style=False, sort_keys=False, allow_unicode=True, width=1000)
+    
+    def _dump_flow_entry(self, code, value):
+        """One gridObjects entry in the flow style the shipped levels use: 'c1: [floor, p1]'"""
+        text = dump_yaml({code: value}, default_flow_style=True, sort_keys=False, allow_unicode=True, width=100000)
+        return text.strip()[1:-1] + '\n'  # Drop the braces around the one-entry mapping
+    
+    def _dump_block_entry(self, code, value):
+        return self._dump_section(code, value)
+    
+    def _format_grid_section(self, document):
+        """grid as a literal block scalar, laid out like the loaded file
+        (same section breaks, gutters and row endings; plain rows for a new level)"""
+        return format_grid_block(document.grid.to_grid(), document.layout)
             
     def set_game_folder(self):
         browser = GameFolderBrowser(self.root, self)
@@ -1781,7 +2115,7 @@ class LevelEditor:
     def change_grid_size(self):
         dialog = tk.Toplevel(self.root)
         dialog.title("Change Grid Size")
-        dialog.geometry("250x150")
+        dialog.geometry("250x180")
         dialog.transient(self.root)
         dialog.grab_set()
         
@@ -1793,21 +2127,25 @@ class LevelEditor:
         cols_var = tk.IntVar(value=self.grid_cols)
         ttk.Entry(dialog, textvariable=cols_var, width=10).grid(row=1, column=1, padx=5, pady=5)
         
+        # Which edge/corner the existing cells stay attached to ('nw' = add/remove at bottom-right)
+        ttk.Label(dialog, text="Anchor:").grid(row=2, column=0, padx=5, pady=5, sticky=tk.W)
+        anchor_var = tk.StringVar(value='nw')
+        ttk.Combobox(dialog, textvariable=anchor_var, values=ANCHORS, state='readonly',
+                     width=8).grid(row=2, column=1, padx=5, pady=5)
+        
         def apply():
             new_rows = rows_var.get()
             new_cols = cols_var.get()
             if new_rows > 0 and new_cols > 0:
-                # Expand grid data if needed
-                while len(self.grid_data) < new_rows:
-                    self.grid_data.append(['__' for _ in range(self.grid_cols)])
-                while len(self.grid_data) > new_rows:
-                    self.grid_data.pop()
-                    
-                for row in self.grid_data:
-                    while len(row) < new_cols:
-                        row.append('__')
-                    while len(row) > new_cols:
-                        row.pop()
+                # Expand or crop grid data around the anchor (section breaks and gutters follow)
+                with self._undo_transaction("Resize grid"):
+                    before = (self.grid_data.copy(), self.grid_layout.copy())
+                    old_shape = self.grid_data.shape
+                    self.grid_data.resize(new_rows, new_cols, anchor=anchor_var.get())
+                    self.grid_layout.resize(old_shape, self.grid_data.shape, anchor=anchor_var.get())
+                    self.undo_log.record('grid', None, before,
+                                         (self.grid_data.copy(), self.grid_layout.copy()))
+                    self.document = self.document.set_grid(self.grid_data, self.grid_layout)
                         
                 self.grid_rows = new_rows
                 self.grid_cols = new_cols
@@ -1815,7 +2153,7 @@ class LevelEditor:
                 self.update_grid_display()
                 dialog.destroy()
                 
-        ttk.Button(dialog, text="Apply", command=apply).grid(row=2, column=0, columnspan=2, pady=10)
+        ttk.Button(dialog, text="Apply", command=apply).grid(row=3, column=0, columnspan=2, pady=10)
         
     def edit_camera_settings(self):
         """Open dialog to edit cameraSettings (type, staticSettings, position, target)"""
@@ -1995,6 +2333,7 @@ class LevelEditor:
                 }
             
             self.camera_settings = new_settings
+            self.document = self.document.replace(camera_settings=copy.deepcopy(new_settings))
             dialog.destroy()
             self.status_bar.config(text="Camera settings updated")
         
@@ -2087,12 +2426,12 @@ class LevelEditor:
                 self._push_undo_state()
                 
                 if type_var.get() == "short":
-                    self.object_definitions[code] = map_obj_var.get() or code
+                    self._set_entry('objectDefinitions', code, map_obj_var.get() or code)
                 else:
-                    self.object_definitions[code] = {
+                    self._set_entry('objectDefinitions', code, {
                         'mapObject': map_obj_var.get() or 'Custom',
                         'dir': dir_var.get()
-                    }
+                    })
                 
                 # Refresh tree
                 tree.delete(*tree.get_children())
@@ -2105,7 +2444,7 @@ class LevelEditor:
                         tree.insert('', 'end', values=(c, 'Long Form', f"{map_o} | {tags}"))
                        
                 self.update_defs_display()
-                self.update_grid_display()
+                self.mark_definitions_dirty([code])
                 add_dialog.destroy()
                 
             ttk.Button(add_dialog, text="Save", command=save).pack(pady=10)
@@ -2121,48 +2460,36 @@ class LevelEditor:
                     # Push undo state before modifying definitions
                     self._push_undo_state()
                     
-                    del self.object_definitions[code]
+                    self._set_entry('objectDefinitions', code, MISSING)
                     tree.delete(selection[0])
                     self.update_defs_display()
-                    self.update_grid_display()
+                    self.mark_definitions_dirty([code])
                     
         ttk.Button(btn_frame, text="Remove Selected", command=remove_selected).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="Close", command=dialog.destroy).pack(side=tk.RIGHT, padx=5)
         
     def load_assets_from_folder(self, streaming_assets_path):
-        """Load available assets from the game's StreamingAssets folder"""
+        """Load available assets from the game's StreamingAssets folder.
+        
+        Walks the folder once into an AssetIndex; resolve_art_path and the
+        asset lists both come from it, so texture lookups don't touch the disk.
+        """
+        # Texture paths resolve against the new folder
+        self.invalidate_code_textures()
         try:
-            # Look for 3D models
-            art_3d = os.path.join(streaming_assets_path, "Art", "3D")
-            if os.path.exists(art_3d):
-                self.available_assets['3d'] = self.find_files_recursive(art_3d, ['.glb', '.gltf'])
-                
-            # Look for 2D textures
-            art_2d = os.path.join(streaming_assets_path, "Art", "2D")
-            if os.path.exists(art_2d):
-                self.available_assets['2d'] = self.find_files_recursive(art_2d, ['.png', '.jpg', '.jpeg'])
-                
-            # Look for sounds
-            sounds = os.path.join(streaming_assets_path, "Sounds")
-            if os.path.exists(sounds):
-                self.available_assets['sounds'] = self.find_files_recursive(sounds, ['.mp3', '.ogg', '.wav'])
+            self.asset_index = AssetIndex.scan(streaming_assets_path)
+            for kind, (folder, extensions) in ASSET_FOLDERS.items():
+                self.available_assets[kind] = self.asset_index.relative_files(folder, extensions)
                 
             self.status_bar.config(text=f"Loaded {len(self.available_assets['3d'])} 3D models, "
                                        f"{len(self.available_assets['2d'])} 2D textures, "
                                        f"{len(self.available_assets['sounds'])} sounds")
         except Exception as e:
             print(f"Error loading assets: {e}")
-            
-    def find_files_recursive(self, folder, extensions):
-        """Find all files with given extensions in folder and subfolders"""
-        found = []
-        for root, dirs, files in os.walk(folder):
-            for file in files:
-                if any(file.lower().endswith(ext) for ext in extensions):
-                    rel_path = os.path.relpath(os.path.join(root, file), folder)
-                    found.append(rel_path)
-        return sorted(found)
-
+        
+        if self.prepare_model_textures.get():
+            self.start_model_warmup()
+    
     def auto_detect_mod_folder(self):
         """Auto-detect Mod folder (contains Art/ and Levels/)"""
         # Try to auto-find from common game installation paths
@@ -2220,8 +2547,6 @@ class LevelEditor:
             if streaming:
                 self.streaming_assets_path = streaming
                 self.status_bar.config(text=f"Mod folder set: {streaming}")
-                if not PYGLTFLIB_AVAILABLE:
-                    self.status_bar.config(text="Note: pygltflib not installed. 3D textures won't show. Run: py -m pip install pygltflib")
                 self.load_assets_from_folder(streaming)
                 self.auto_load_shared_defs()
             else:
@@ -2259,19 +2584,24 @@ class LevelEditor:
         """
         Get texture filepath for a grid cell.
         Returns filepath or None if no texture found.
+        """
+        if not self.grid_data.in_bounds(row, col):
+            return None
+        return self.get_code_texture(self.grid_data[row, col])
+    
+    def get_code_texture(self, code):
+        """
+        Get texture filepath for a grid code (shared by every cell holding it).
+        Returns filepath or None if no texture found.
         
         Priority:
-        1. Check art2d textures (2D) for the cell's objects
-        2. Fallback: Extract albedo texture from art3d GLB models (requires pygltflib)
+        1. Check art2d textures (2D) for the code's objects
+        2. Fallback: The albedo texture embedded in art3d GLB models
         """
-        if row >= len(self.grid_data) or col >= len(self.grid_data[row]):
-            return None
-            
-        code = self.grid_data[row][col]
         if code == '__':
             return None
         
-        # Get objects for this cell
+        # Get objects for this code
         objects = self.grid_objects.get(code, [])
         
         # Check each object for displayable art
@@ -2294,211 +2624,393 @@ class LevelEditor:
                     elif 'textures' in art and art['textures']:
                         return art['textures'][0]  # Use first texture
                     
-            # Priority 2: GLB texture extraction fallback (requires pygltflib)
-            if 'art3d' in obj and obj['art3d'] and PYGLTFLIB_AVAILABLE:
+            # Priority 2: GLB texture extraction fallback
+            if 'art3d' in obj and obj['art3d']:
                 art = obj['art3d'][0]
                 if isinstance(art, dict) and 'model' in art:
                     glb_path = self.resolve_art_path(art['model'], '3D')
-                    if glb_path and os.path.exists(glb_path):
-                        texture = self.extract_glb_texture(glb_path)
+                    if glb_path:
+                        if glb_path not in self.extracted_textures:
+                            # Extracted in the background; the code's cells are
+                            # repainted when it is done (see _poll_textures)
+                            self._request_glb_texture(glb_path, code)
+                            return None
+                        texture = self.extracted_textures[glb_path]
                         if texture:
-                            return texture  # Returns temp PNG path
+                            return texture  # The GLB path, decoded by texture_loader
         
         return None
     
     def resolve_art_path(self, texture_path, art_type='2D'):
-        """Resolve relative art path to full path"""
+        """Resolve relative art path to full path.
+        
+        Looks in Art/<art_type>, then relative to StreamingAssets, ignoring
+        case and separators. Answered from the asset index (see
+        load_assets_from_folder), so no stat calls.
+        """
         if not self.streaming_assets_path:
             return None
-            
-        # Try multiple possible locations
-        possible_bases = [
-            os.path.join(self.streaming_assets_path, "Art", art_type.upper()),
-            os.path.join(self.streaming_assets_path, "Art", art_type.lower())
-        ]
-        
-        for base in possible_bases:
-            full_path = os.path.join(base, texture_path)
-            if os.path.exists(full_path):
-                return full_path
+        return self._asset_index().resolve(texture_path, art_type)
+    
+    def _asset_index(self):
+        # Normally built by load_assets_from_folder when the folder is set
+        if self.asset_index is None or self.asset_index.root != self.streaming_assets_path:
+            self.asset_index = AssetIndex.scan(self.streaming_assets_path)
+        return self.asset_index
+    
+    def show_missing_assets(self):
+        """List the textures and models referenced by the loaded definitions that don't exist"""
+        if not self.streaming_assets_path:
+            messagebox.showinfo("Missing Assets", "Set the Mod folder first (File → Set Mod Folder...)")
+            return
+        references = referenced_art(self.object_definitions, self.grid_objects)
+        missing = self._asset_index().missing(references)
+        self.status_bar.config(text=f"{len(missing)} of {len(references)} referenced assets missing")
+        if not missing:
+            messagebox.showinfo("Missing Assets", f"All {len(references)} referenced textures and models exist.")
+            return
         
-        # Try direct path relative to streaming_assets_path
-        full_path = os.path.join(self.streaming_assets_path, texture_path)
-        if os.path.exists(full_path):
-            return full_path
-            
-        return None
-            
-        # Try multiple possible locations
-        possible_bases = [
-            os.path.join(self.streaming_assets_path, "Art", art_type.upper()),
-            os.path.join(self.streaming_assets_path, "Art", art_type.lower())
-        ]
+        dialog = tk.Toplevel(self.root)
+        dialog.title(f"Missing Assets ({len(missing)})")
+        dialog.geometry("700x400")
+        dialog.transient(self.root)
         
-        for base in possible_bases:
-            full_path = os.path.join(base, texture_path)
-            if os.path.exists(full_path):
-                return full_path
+        text_frame = ttk.Frame(dialog, padding="10")
+        text_frame.pack(fill=tk.BOTH, expand=True)
+        text_widget = tk.Text(text_frame, wrap=tk.WORD)
+        scrollbar = ttk.Scrollbar(text_frame, orient=tk.VERTICAL, command=text_widget.yview)
+        text_widget.config(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        text_widget.pack(fill=tk.BOTH, expand=True, side=tk.LEFT)
+        for art_type, path in missing:
+            used_by = ', '.join(references[(art_type, path)])
+            text_widget.insert(tk.END, f"[{art_type}] {path}\n    used by: {used_by}\n")
+        text_widget.config(state='disabled')
         
-        # Try direct path relative to streaming_assets_path
-        full_path = os.path.join(self.streaming_assets_path, texture_path)
-        if os.path.exists(full_path):
-            return full_path
-            
-        return None
+        ttk.Button(dialog, text="Close", command=dialog.destroy).pack(pady=5)
     
     def extract_glb_texture(self, glb_path):
         """
-        Extract albedo (base color) texture from a GLB file.
+        Check that a GLB file has an albedo (base color) texture to show.
         
         Follows the glTF material chain to find the correct albedo texture:
         material[0] -> pbrMetallicRoughness.baseColorTexture -> texture -> image
+        (see glb_texture). Only the GLB header and JSON chunk are read here;
+        the image itself is sliced out of the BIN chunk and decoded by
+        texture_loader when a cell shows it, with no temp files.
         
         Args:
             glb_path: Path to the .glb file
             
         Returns:
-            Path to extracted PNG file in temp directory, or None if extraction fails.
-            Result is cached in self.extracted_textures to avoid re-extraction.
+            glb_path, usable as the texture path, or None if the model has no images.
+            Result is cached in self.extracted_textures to avoid re-reading.
         """
-        if not PYGLTFLIB_AVAILABLE:
-            return None
-        
         # Return cached result if available
         if glb_path in self.extracted_textures:
             return self.extracted_textures[glb_path]
         
         try:
-            from pygltflib import GLTF2
-            from pygltflib.utils import ImageFormat
-            import tempfile
-            import hashlib
-            import shutil
-            import warnings
-            import os
-            
-            # Suppress pygltflib warnings about bufferViews (cosmetic warnings, files still extract correctly)
-            warnings.filterwarnings('ignore', category=UserWarning, module='pygltflib')
-            
-            # Load GLB file
-            gltf = GLTF2().load(glb_path)
-            
-            # Find albedo (base color) texture via material chain
-            target_image = None
-            image_index = None  # Index in gltf.images array
-            texture_purpose = "unknown"
-            
-            # Step 1: Get first material's albedo texture
-            # glTF stores textures in material.pbrMetallicRoughness.baseColorTexture
-            if gltf.materials:
-                mat = gltf.materials[0]
-                if mat.pbrMetallicRoughness and mat.pbrMetallicRoughness.baseColorTexture:
-                    tex_info = mat.pbrMetallicRoughness.baseColorTexture
-                    tex_idx = tex_info.index  # TextureInfo.index points to gltf.textures array
-                    if tex_idx < len(gltf.textures):
-                        tex = gltf.textures[tex_idx]
-                        # Texture.source points to gltf.images array
-                        if hasattr(tex, 'source') and tex.source is not None:
-                            image_index = tex.source
-                            texture_purpose = "albedo"
-                            if image_index < len(gltf.images):
-                                target_image = gltf.images[image_index]
-            
-            # Fallback: Use first image if material chain fails
-            if not target_image and gltf.images:
-                target_image = gltf.images[0]
-                image_index = 0
-                texture_purpose = "fallback_first"
-            
-            if not target_image:
-                return None
-            
-            # Create unique output path using hash of glb_path to avoid conflicts
-            glb_hash = hashlib.md5(glb_path.encode()).hexdigest()[:8]
-            temp_dir = tempfile.gettempdir()
-            output_path = os.path.join(temp_dir, f"glb_tex_{glb_hash}_{texture_purpose}.png")
-            
-            # Return cached version if already extracted
-            if os.path.exists(output_path):
-                self.extracted_textures[glb_path] = output_path
-                return output_path
-            
-            # Clean up existing temp files (0.png, 1.png, etc.) to avoid pygltflib write conflicts
-            for i in range(10):
-                test_path = os.path.join(temp_dir, f"{i}.png")
-                if os.path.exists(test_path):
-                    os.remove(test_path)
-            
-            # Extract images to temp dir
-            # This converts embedded bufferView data to PNG files
-            gltf.convert_images(ImageFormat.FILE, path=temp_dir + '/')
-            
-            # Determine source path for target image
-            # After convert_images, pygltflib may set uri or use default naming
-            if target_image.uri:
-                # URI is set (file path or data URI)
-                src_path = os.path.join(temp_dir, os.path.basename(target_image.uri))
-            elif image_index is not None:
-                # Assume file named {image_index}.png (pygltflib convention)
-                src_path = os.path.join(temp_dir, f"{image_index}.png")
-            else:
-                # Fallback to first extracted file
-                src_path = None
-                for i in range(10):
-                    test_path = os.path.join(temp_dir, f"{i}.png")
-                    if os.path.exists(test_path):
-                        src_path = test_path
-                        break
-            
-            # Copy to unique filename to avoid conflicts
-            if src_path and os.path.exists(src_path):
-                shutil.copy2(src_path, output_path)
-                self.extracted_textures[glb_path] = output_path
-                return output_path
-            
+            # Tiles made from it last session mean it has one, without opening the model
+            if self.thumbnail_store.has_tiles(glb_path) or has_albedo_image(glb_path):
+                return glb_path
+            return None
         except Exception as e:
             print(f"Error extracting texture from {glb_path}: {e}")
-            import traceback
-            traceback.print_exc()
-        
         return None
     
+    # ============================================
+    # Model Texture Warm-up
+    # ============================================
+    # Decoding a model's albedo texture is the slowest step of showing a
+    # level. After the Mod folder is set, every model under Art/3D that has
+    # no tiles in the thumbnail store yet is decoded in a process pool (one
+    # worker per core); the workers write the tiles into the store folder
+    # and a root.after() poll records them and shows progress. Levels opened
+    # later find every model texture in the store.
+    # ============================================
+    
+    WARMUP_POLL_INTERVAL = 100  # ms between progress updates
+    
+    def start_model_warmup(self):
+        """Decode the textures of all models in the Mod folder in the background"""
+        self.stop_model_warmup()
+        if not PIL_AVAILABLE or not self.streaming_assets_path:
+            return
+        art_3d = os.path.join(self.streaming_assets_path, "Art", "3D")
+        models = [os.path.join(art_3d, rel_path) for rel_path in self.available_assets['3d']
+                  if rel_path.lower().endswith(MODEL_EXTENSIONS)]
+        todo = [path for path in models
+                if path not in self.extracted_textures and not self.thumbnail_store.has_tiles(path)]
+        if not todo:
+            return
+        
+        executor = ProcessPoolExecutor()
+        size = self._texture_size()
+        self._warmup_futures = {
+            executor.submit(prepare_model_tiles, path, self.MIP_SIZES, size, self.thumbnail_store.folder): path
+            for path in todo}
+        # Workers exit once the queued models are done
+        executor.shutdown(wait=False)
+        self._warmup_total = len(todo)
+        self.status_bar.config(text=f"Preparing model textures: 0/{self._warmup_total}")
+        self._warmup_after_id = self.root.after(self.WARMUP_POLL_INTERVAL, self._poll_model_warmup)
+    
+    def stop_model_warmup(self):
+        """Drop the models not started yet (running ones finish)"""
+        for future in self._warmup_futures:
+            future.cancel()
+        self._warmup_futures = {}
+        if self._warmup_after_id is not None:
+            self.root.after_cancel(self._warmup_after_id)
+            self._warmup_after_id = None
+    
+    def _poll_model_warmup(self):
+        self._warmup_after_id = None
+        for future in [future for future in self._warmup_futures if future.done()]:
+            glb_path = self._warmup_futures.pop(future)
+            try:
+                _, signature, key, tiles = future.result()
+            except Exception as e:
+                print(f"Error extracting texture from {glb_path}: {e}")
+                continue
+            self.thumbnail_store.adopt(glb_path, signature, key, tiles)
+            self.extracted_textures.setdefault(glb_path, glb_path if tiles else None)
+        
+        done = self._warmup_total - len(self._warmup_futures)
+        if self._warmup_futures:
+            self.status_bar.config(text=f"Preparing model textures: {done}/{self._warmup_total}")
+            self._warmup_after_id = self.root.after(self.WARMUP_POLL_INTERVAL, self._poll_model_warmup)
+        else:
+            self.status_bar.config(text=f"Prepared {done} model textures")
+            self.thumbnail_store.flush()
+    
+    # ============================================
+    # Zoom and Texture Pyramid
+    # ============================================
+    # Zooming scales the existing canvas items in place (canvas.scale)
+    # instead of rebuilding the canvas. Each texture is decoded once into a
+    # small mip pyramid: right after a zoom the visible cells show the
+    # nearest mip level, and once zooming stops they get a sharp LANCZOS
+    # resample made from the pyramid, never from the file again.
+    # ============================================
+    
+    IMAGE_CACHE_BUDGET = 64 * 1024 * 1024  # Bytes of decoded pixels the image cache may hold
+    MIP_SIZES = (16, 32, 64, 128)  # Pyramid levels in px (cell images are 18-72 px)
+    ZOOM_RESAMPLE_DELAY = 150  # ms without zooming before the visible cells are resampled
+    
+    def _zoom_to(self, cell_size):
+        if cell_size == self.cell_size:
+            return
+        factor = cell_size / self.cell_size
+        self.cell_size = cell_size
+        self.grid_canvas.scale("all", 0, 0, factor, factor)
+        self.grid_canvas.config(scrollregion=(0, 0, self.grid_cols * cell_size, self.grid_rows * cell_size))
+        
+        # Mouse-wheel zooms come in bursts - resample once the burst is over
+        if self._zoom_after_id is not None:
+            self.root.after_cancel(self._zoom_after_id)
+        self._zoom_after_id = self.root.after(self.ZOOM_RESAMPLE_DELAY, self._resample_visible)
+        
+        for cell, img_id in self.cell_images.items():
+            self._show_photo_or_wait(cell, img_id, self._mip_photo(self.cell_image_paths[cell]))
+        # Cells that came into view get items at the new size
+        self._update_viewport()
+    
+    def _resample_visible(self):
+        """Replace the stand-in mip images of the visible cells with sharp ones"""
+        self._zoom_after_id = None
+        for cell, img_id in self.cell_images.items():
+            self._show_photo_or_wait(cell, img_id, self._texture_photo(self.cell_image_paths[cell]))
+    
+    def show_image_cache_stats(self):
+        self.status_bar.config(text=f"{self.image_cache.format_stats()} | {self.thumbnail_store.format_stats()}")
+    
+    def _show_photo(self, cell, img_id, photo):
+        """Point a cell's image item at a photo. The cell holds the reference Tk
+        needs for as long as the item shows it, even after the cache evicts it."""
+        self.grid_canvas.itemconfig(img_id, image=photo)
+        self.cell_photos[cell] = photo
+    
+    def _show_photo_or_wait(self, cell, img_id, photo):
+        """Show photo, or - when the texture's pyramid was evicted - keep the
+        current image until the worker pool has decoded it again"""
+        if photo is None:
+            self._wait_for_texture(cell, self.cell_image_paths[cell])
+        else:
+            self._show_photo(cell, img_id, photo)
+    
+    def _texture_size(self):
+        """Side of a cell image in px (images fill 90% of the cell)"""
+        return int(self.cell_size * 0.9)
+    
+    def _texture_pyramid(self, filepath):
+        """Mip levels of a texture if they are decoded, else None (see _wait_for_texture)"""
+        return self.image_cache.get(('pyramid', filepath))
+    
+    def _texture_photo(self, filepath, pyramid=None):
+        """Texture resampled to exactly the current cell image size, or None if not decoded yet"""
+        size = self._texture_size()
+        cache_key = ('photo', filepath, size)
+        photo = self.image_cache.get(cache_key)
+        if photo is None:
+            pyramid = pyramid or self._texture_pyramid(filepath)
+            if pyramid is None:
+                return None
+            if size in pyramid:
+                # The loader made a tile of exactly this size
+                photo = ImageTk.PhotoImage(pyramid[size])
+            else:
+                # Resample from the smallest level that is still at least as big
+                source = next((pyramid[mip] for mip in self.MIP_SIZES if mip >= size), pyramid[self.MIP_SIZES[-1]])
+                photo = ImageTk.PhotoImage(source.resize((size, size), Image.Resampling.LANCZOS))
+            self.image_cache.put(cache_key, photo, size * size * 4)
+        return photo
+    
+    def _mip_photo(self, filepath):
+        """Largest pre-built mip level that fits the current cell image size, or None if not decoded yet"""
+        size = self._texture_size()
+        mip = max((mip for mip in self.MIP_SIZES if mip <= size), default=self.MIP_SIZES[0])
+        cache_key = ('mip', filepath, mip)
+        photo = self.image_cache.get(cache_key)
+        if photo is None:
+            pyramid = self._texture_pyramid(filepath)
+            if pyramid is None:
+                return None
+            photo = ImageTk.PhotoImage(pyramid[mip])
+            self.image_cache.put(cache_key, photo, mip * mip * 4)
+        return photo
+    
     def display_cell_image(self, row, col, filepath, bg_color):
         """Load and display an image on a grid cell.
         
         Handles both 2D images and GLB-extracted textures.
-        Images are resized to fit the cell and cached for performance.
+        Images are resized to fit the cell and kept in the LRU image cache.
+        A texture that hasn't been decoded yet is queued on the worker pool;
+        until it arrives the cell shows its colored rectangle.
         """
+        cell = (row, col)
         try:
-            if not os.path.exists(filepath):
+            # Sharp image at the current cell size; while zooming, the nearest
+            # mip level stands in until _resample_visible runs
+            photo = None
+            if self._zoom_after_id is not None and ('photo', filepath, self._texture_size()) not in self.image_cache:
+                photo = self._mip_photo(filepath)
+            if photo is None:
+                photo = self._texture_photo(filepath)
+            
+            if photo is None:
+                # A different texture doesn't stay on the cell while this one loads
+                if self.cell_image_paths.get(cell) != filepath:
+                    self._release_image(cell)
+                self._wait_for_texture(cell, filepath)
                 return
             
-            # Use cache key (filepath, cell_size) to avoid reloading
-            cache_key = (filepath, self.cell_size)
-            if cache_key in self.image_cache:
-                photo = self.image_cache[cache_key]
-            else:
-                # Load and resize image to fit cell
-                img = Image.open(filepath)
-                size = int(self.cell_size * 0.9)
-                img = img.resize((size, size), Image.Resampling.LANCZOS)
-                photo = ImageTk.PhotoImage(img)
-                self.image_cache[cache_key] = photo
-            
-            # Calculate center position
-            x = col * self.cell_size + self.cell_size / 2
-            y = row * self.cell_size + self.cell_size / 2
-            
-            # Create image on canvas
-            img_id = self.grid_canvas.create_image(x, y, image=photo)
-            self.cell_images[(row, col)] = img_id
-            
-            # Keep a reference to prevent garbage collection
-            self._image_refs.append(photo)
+            self._stop_waiting(cell)
+            self._place_cell_image(cell, filepath, photo)
             
         except Exception as e:
             print(f"Error loading image {filepath}: {e}")
             self.status_bar.config(text=f"Image error: {os.path.basename(filepath)}")
+            self._release_image(cell)
+            self._stop_waiting(cell)
+    
+    def _place_cell_image(self, cell, filepath, photo):
+        """Show photo centered on a cell that has canvas items"""
+        row, col = cell
+        x = col * self.cell_size + self.cell_size / 2
+        y = row * self.cell_size + self.cell_size / 2
+        
+        # Reuse the cell's image item (or a recycled one), create one otherwise
+        img_id = self.cell_images.get(cell)
+        if img_id is None and self._free_images:
+            img_id = self._free_images.pop()
+        if img_id is None:
+            img_id = self.grid_canvas.create_image(x, y, image=photo, tags=("cell_image",))
+        else:
+            self.grid_canvas.coords(img_id, x, y)
+            self.grid_canvas.itemconfig(img_id, image=photo, state='normal')
+        self.cell_images[cell] = img_id
+        self.cell_image_paths[cell] = filepath
+        # Reference held per live canvas item, dropped when the item is recycled
+        self.cell_photos[cell] = photo
+    
+    # ============================================
+    # Background Texture Loading
+    # ============================================
+    # Decoding a texture file into its mip pyramid and extracting textures
+    # from GLB models run on a worker pool (texture_loader.TextureLoader).
+    # Workers only build PIL images; a root.after() pump collects finished
+    # jobs and makes the PhotoImages on the Tk thread. Cells wait with their
+    # colored rectangle; a cell that scrolls out of view stops waiting, and
+    # a texture no visible cell waits for any more is dropped from the queue.
+    # ============================================
+    
+    TEXTURE_POLL_INTERVAL = 30  # ms between checks for finished texture jobs
+    
+    def _wait_for_texture(self, cell, filepath):
+        """Queue the texture's pyramid and show it on the cell when it is done"""
+        if self._cell_waits.get(cell) != filepath:
+            self._stop_waiting(cell)
+            self._cell_waits[cell] = filepath
+            self._texture_waiters.setdefault(filepath, set()).add(cell)
+        # Requested again by a cell that just came into view: move it to the front
+        size = self._texture_size()
+        self.texture_loader.request(('pyramid', filepath),
+                                    lambda: build_texture_pyramid(filepath, self.MIP_SIZES, size, self.thumbnail_store))
+        self._schedule_texture_poll()
+    
+    def _stop_waiting(self, cell):
+        filepath = self._cell_waits.pop(cell, None)
+        if filepath is None:
+            return
+        waiters = self._texture_waiters.get(filepath)
+        waiters.discard(cell)
+        if not waiters:
+            del self._texture_waiters[filepath]
+            self.texture_loader.cancel(('pyramid', filepath))
+    
+    def _request_glb_texture(self, glb_path, code):
+        """Extract a GLB model's texture in the background, then repaint the code's cells"""
+        self._glb_waiters.setdefault(glb_path, set()).add(code)
+        self.texture_loader.request(('glb', glb_path), lambda: self.extract_glb_texture(glb_path))
+        self._schedule_texture_poll()
+    
+    def _schedule_texture_poll(self):
+        if self._texture_poll_after_id is None:
+            self._texture_poll_after_id = self.root.after(self.TEXTURE_POLL_INTERVAL, self._poll_textures)
+    
+    def _poll_textures(self):
+        """Hand finished texture jobs to the cache and the cells waiting for them"""
+        self._texture_poll_after_id = None
+        for (kind, path), result, error in self.texture_loader.poll():
+            if kind == 'glb':
+                # None records a failed extraction so it isn't retried on every repaint
+                self.extracted_textures[path] = result
+                self.mark_codes_dirty(self._glb_waiters.pop(path, ()))
+                continue
+            
+            cells = self._texture_waiters.pop(path, ())
+            for cell in cells:
+                del self._cell_waits[cell]
+            if result is None:
+                print(f"Error loading image {path}: {error}")
+                self.status_bar.config(text=f"Image error: {os.path.basename(path)}")
+                for cell in cells:
+                    self._release_image(cell)
+                continue
+            self.image_cache.put(('pyramid', path), result, sum(image_bytes(level) for level in result.values()))
+            
+            # Build the photo from the result itself, it may not fit in the cache
+            photo = self._texture_photo(path, result) if cells else None
+            for cell in cells:
+                if cell in self.cell_rects:
+                    self._place_cell_image(cell, path, photo)
+        
+        if self.texture_loader.busy():
+            self._schedule_texture_poll()
+        else:
+            self.thumbnail_store.flush()
 
 
 def main():
@@ -2510,6 +3022,9 @@ def main():
     browser.find_game_path()
     
     root.mainloop()
+    app.stop_model_warmup()
+    app.texture_loader.shutdown()
+    app.thumbnail_store.flush(usage=True)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,619 @@
+"""
+Co OPERATION: MultiTurn - Grid model
+Shared by the level editor and the batch scripts in scripts/
+
+A level grid is a matrix of short cell codes ('gm', 'c1', '__', ...) where
+most cells repeat a handful of codes. Grid stores each cell as a 16-bit id in
+one flat array('H') and keeps an intern table mapping codes to ids, so a
+34x34 grid is ~2 KB instead of ~1000 list slots and copies are a single memcpy.
+A reverse index (code -> cells holding it) is built on the first query and
+then kept up to date by every set(), so the palette, the save filter and
+"cells with this code" never rescan the grid while painting.
+
+GridLayout keeps everything about how a grid block was written that the
+cells don't: blank lines between the header/playable/footer sections, the
+double-space gutters between column blocks, row endings and short rows.
+parse_grid_block() and format_grid_block() round-trip a block byte for byte.
+"""
+
+import re
+from array import array
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+EMPTY_CODE = '__'
+
+# resize() anchors: where the existing cells stay when rows/columns are added or removed
+ANCHORS = ('nw', 'n', 'ne', 'w', 'center', 'e', 'sw', 's', 'se')
+
+
+class Grid:
+    """Matrix of cell codes backed by array('H') plus a code <-> id intern table.
+
+    Id 0 is always EMPTY_CODE. Ids are never reused, so an id handed out
+    once keeps meaning the same code for the lifetime of the grid (and of
+    its copies, which share the same table contents at copy time).
+
+    The reverse index maps code id -> set of flat cell positions. It is
+    lazy: copies (undo snapshots) and resizes drop it, and the next query
+    rebuilds it with one pass over the cells.
+    """
+    __slots__ = ('_rows', '_cols', '_cells', '_codes', '_ids', '_positions')
+
+    def __init__(self, rows: int = 0, cols: int = 0, fill: str = EMPTY_CODE):
+        self._codes: List[str] = [EMPTY_CODE]  # id -> code
+        self._ids: Dict[str, int] = {EMPTY_CODE: 0}  # code -> id
+        self._positions: Optional[Dict[int, Set[int]]] = None  # id -> flat cell positions
+        self._rows = rows
+        self._cols = cols
+        self._cells = array('H', [self.intern(fill)]) * (rows * cols)
+
+    @classmethod
+    def from_rows(cls, rows: List[List[str]], fill: str = EMPTY_CODE) -> 'Grid':
+        """Build a grid from a list of rows; short rows are padded with fill"""
+        cols = max((len(row) for row in rows), default=0)
+        grid = cls(0, cols, fill)
+        grid._rows = len(rows)
+        intern = grid.intern
+        fill_id = intern(fill)
+        cells = array('H')
+        for row in rows:
+            cells.extend([intern(code) for code in row])
+            if len(row) < cols:
+                cells.extend(array('H', [fill_id]) * (cols - len(row)))
+        grid._cells = cells
+        grid._positions = None
+        return grid
+
+    # ------------------------------------------------------------------
+    # Intern table
+    # ------------------------------------------------------------------
+
+    def intern(self, code: str) -> int:
+        """Id for a code, adding it to the table if it is new"""
+        code_id = self._ids.get(code)
+        if code_id is None:
+            code_id = len(self._codes)
+            if code_id > 0xFFFF:
+                raise ValueError("Grid supports at most 65536 distinct cell codes")
+            self._codes.append(code)
+            self._ids[code] = code_id
+        return code_id
+
+    def code_id(self, code: str) -> Optional[int]:
+        """Id of a code, or None if the grid has never held it"""
+        return self._ids.get(code)
+
+    def code(self, code_id: int) -> str:
+        return self._codes[code_id]
+
+    # ------------------------------------------------------------------
+    # Size and cell access
+    # ------------------------------------------------------------------
+
+    @property
+    def rows(self) -> int:
+        return self._rows
+
+    @property
+    def cols(self) -> int:
+        return self._cols
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self._rows, self._cols
+
+    def __len__(self):
+        return self._rows
+
+    def in_bounds(self, row: int, col: int) -> bool:
+        return 0 <= row < self._rows and 0 <= col < self._cols
+
+    def _index(self, row: int, col: int) -> int:
+        if not (0 <= row < self._rows and 0 <= col < self._cols):
+            raise IndexError(f"Cell ({row}, {col}) is outside the {self._rows}x{self._cols} grid")
+        return row * self._cols + col
+
+    def get(self, row: int, col: int) -> str:
+        return self._codes[self._cells[self._index(row, col)]]
+
+    def set(self, row: int, col: int, code: str) -> str:
+        """Set a cell and return the code it held before"""
+        index = self._index(row, col)
+        old_id = self._cells[index]
+        new_id = self.intern(code)
+        if old_id != new_id:
+            self._cells[index] = new_id
+            positions = self._positions
+            if positions is not None:
+                cells = positions[old_id]
+                cells.discard(index)
+                if not cells:
+                    del positions[old_id]
+                positions.setdefault(new_id, set()).add(index)
+        return self._codes[old_id]
+
+    def __getitem__(self, position: Tuple[int, int]) -> str:
+        return self.get(*position)
+
+    def __setitem__(self, position: Tuple[int, int], code: str):
+        self.set(position[0], position[1], code)
+
+    def row(self, row: int, start: int = 0, stop: Optional[int] = None) -> List[str]:
+        """Codes of one row (optionally only columns start..stop-1)"""
+        if not 0 <= row < self._rows:
+            raise IndexError(f"Row {row} is outside the {self._rows}x{self._cols} grid")
+        base = row * self._cols
+        stop = self._cols if stop is None else min(stop, self._cols)
+        codes = self._codes
+        return [codes[code_id] for code_id in self._cells[base + start:base + stop]]
+
+    def column(self, col: int, start: int = 0, stop: Optional[int] = None) -> List[str]:
+        """Codes of one column (optionally only rows start..stop-1)"""
+        if not 0 <= col < self._cols:
+            raise IndexError(f"Column {col} is outside the {self._rows}x{self._cols} grid")
+        stop = self._rows if stop is None else min(stop, self._rows)
+        codes = self._codes
+        return [codes[code_id] for code_id in self._cells[start * self._cols + col:stop * self._cols:self._cols]]
+
+    def to_rows(self) -> List[List[str]]:
+        """The grid as a list of rows (list of lists of codes)"""
+        return [self.row(row) for row in range(self._rows)]
+
+    def __iter__(self) -> Iterator[List[str]]:
+        for row in range(self._rows):
+            yield self.row(row)
+
+    def cells(self) -> Iterator[Tuple[int, int, str]]:
+        """Every cell as (row, col, code), row by row"""
+        codes = self._codes
+        cols = self._cols
+        for index, code_id in enumerate(self._cells):
+            yield index // cols, index % cols, codes[code_id]
+
+    # ------------------------------------------------------------------
+    # Reverse index queries (no grid scan once the index is built)
+    # ------------------------------------------------------------------
+
+    def _index_positions(self) -> Dict[int, Set[int]]:
+        positions = self._positions
+        if positions is None:
+            positions = {}
+            for index, code_id in enumerate(self._cells):
+                cells = positions.get(code_id)
+                if cells is None:
+                    positions[code_id] = {index}
+                else:
+                    cells.add(index)
+            self._positions = positions
+        return positions
+
+    def used_codes(self, include_empty: bool = False) -> Set[str]:
+        """Set of codes placed anywhere in the grid"""
+        codes = {self._codes[code_id] for code_id in self._index_positions()}
+        if not include_empty:
+            codes.discard(EMPTY_CODE)
+        return codes
+
+    def count(self, code: str) -> int:
+        """Number of cells holding a code"""
+        cells = self._index_positions().get(self._ids.get(code))
+        return len(cells) if cells else 0
+
+    def code_counts(self, include_empty: bool = False) -> Dict[str, int]:
+        """{code: number of cells holding it} for every placed code"""
+        counts = {self._codes[code_id]: len(cells) for code_id, cells in self._index_positions().items()}
+        if not include_empty:
+            counts.pop(EMPTY_CODE, None)
+        return counts
+
+    def cells_with(self, code: str) -> List[Tuple[int, int]]:
+        """(row, col) of every cell holding a code, row by row"""
+        cells = self._index_positions().get(self._ids.get(code))
+        if not cells:
+            return []
+        cols = self._cols
+        return [divmod(index, cols) for index in sorted(cells)]
+
+    def cells_by_code(self, include_empty: bool = False) -> Dict[str, List[Tuple[int, int]]]:
+        """{code: [(row, col), ...]} for every placed code"""
+        cols = self._cols
+        grouped = {self._codes[code_id]: [divmod(index, cols) for index in sorted(cells)]
+                   for code_id, cells in self._index_positions().items()}
+        if not include_empty:
+            grouped.pop(EMPTY_CODE, None)
+        return grouped
+
+    def replace_codes(self, substitutions: Dict[str, str]) -> int:
+        """Replace codes everywhere in one pass over the grid ({old: new}).
+
+        Returns the number of cells changed.
+        """
+        mapping = {}
+        for old, new in substitutions.items():
+            old_id = self._ids.get(old)
+            if old_id is not None and old != new:
+                mapping[old_id] = self.intern(new)
+        if not mapping:
+            return 0
+        # Translate through a full id -> id table: one C-level pass, no per-cell Python branches
+        table = list(range(len(self._codes)))
+        for old_id, new_id in mapping.items():
+            table[old_id] = new_id
+        before = self._cells
+        self._cells = array('H', map(table.__getitem__, before))
+        positions = self._positions
+        if positions is not None:
+            # Move whole position sets instead of rebuilding the index
+            moved = {old_id: positions.pop(old_id) for old_id in mapping if old_id in positions}
+            for old_id, cells in moved.items():
+                positions.setdefault(mapping[old_id], set()).update(cells)
+            return sum(len(cells) for cells in moved.values())
+        return sum(before.count(old_id) for old_id in mapping)
+
+    # ------------------------------------------------------------------
+    # Copy, compare, resize
+    # ------------------------------------------------------------------
+
+    def copy(self) -> 'Grid':
+        clone = Grid.__new__(Grid)
+        clone._rows = self._rows
+        clone._cols = self._cols
+        clone._cells = array('H', self._cells)
+        clone._codes = list(self._codes)
+        clone._ids = dict(self._ids)
+        clone._positions = None  # Rebuilt on the clone's first query
+        return clone
+
+    __copy__ = copy
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def __eq__(self, other):
+        if not isinstance(other, Grid):
+            return NotImplemented
+        if self.shape != other.shape:
+            return False
+        if self._codes[:len(other._codes)] == other._codes[:len(self._codes)]:
+            # Shared intern history (a copy or the same table) - compare ids directly
+            return self._cells == other._cells
+        return self.to_rows() == other.to_rows()
+
+    def changed_cells(self, other: 'Grid') -> List[Tuple[int, int]]:
+        """(row, col) of the cells that differ from another grid of the same shape"""
+        if self.shape != other.shape:
+            raise ValueError(f"Can't compare a {self._rows}x{self._cols} grid with a {other._rows}x{other._cols} one")
+        cols = self._cols
+        if self._codes[:len(other._codes)] == other._codes[:len(self._codes)]:
+            pairs = zip(self._cells, other._cells)
+        else:
+            pairs = zip(map(self._codes.__getitem__, self._cells), map(other._codes.__getitem__, other._cells))
+        return [divmod(index, cols) for index, (mine, theirs) in enumerate(pairs) if mine != theirs]
+
+    def __repr__(self):
+        return f"Grid({self._rows}x{self._cols}, {len(self.used_codes())} codes)"
+
+    def resize(self, rows: int, cols: int, anchor: str = 'nw', fill: str = EMPTY_CODE):
+        """Change the size, keeping existing cells pinned to an anchor.
+
+        anchor is one of ANCHORS: 'nw' (default) keeps the top-left corner in
+        place and adds/removes rows at the bottom and columns on the right,
+        'se' does the opposite, 'center' splits the change between both sides.
+        """
+        if rows < 0 or cols < 0:
+            raise ValueError("Grid size can't be negative")
+        row_offset, col_offset = resize_offsets(self.shape, (rows, cols), anchor)
+
+        cells = array('H', [self.intern(fill)]) * (rows * cols)
+        # Copy the overlapping block one row slice at a time
+        first_col = max(0, -col_offset)
+        last_col = min(self._cols, cols - col_offset)
+        if first_col < last_col:
+            for old_row in range(max(0, -row_offset), min(self._rows, rows - row_offset)):
+                new_row = old_row + row_offset
+                source = old_row * self._cols
+                target = new_row * cols + first_col + col_offset
+                cells[target:target + last_col - first_col] = self._cells[source + first_col:source + last_col]
+
+        self._cells = cells
+        self._rows = rows
+        self._cols = cols
+        self._positions = None
+
+
+def resize_offsets(old_shape: Tuple[int, int], new_shape: Tuple[int, int], anchor: str = 'nw') -> Tuple[int, int]:
+    """(row, col) offset of the old cells inside the resized grid (negative = cropped)"""
+    if anchor not in ANCHORS:
+        raise ValueError(f"Unknown anchor {anchor!r}, expected one of {', '.join(ANCHORS)}")
+
+    def offset(old, new, position):
+        if position == 'start':
+            return 0
+        if position == 'end':
+            return new - old
+        return (new - old) // 2
+
+    vertical = 'start' if anchor.startswith('n') else 'end' if anchor.startswith('s') else 'middle'
+    horizontal = 'start' if anchor.endswith('w') else 'end' if anchor.endswith('e') else 'middle'
+    return (offset(old_shape[0], new_shape[0], vertical),
+            offset(old_shape[1], new_shape[1], horizontal))
+
+
+def line_cells(start: Tuple[int, int], end: Tuple[int, int]) -> Iterator[Tuple[int, int]]:
+    """Cells on the line from start to end (both included), Bresenham-style.
+
+    Consecutive cells are 8-connected, so a paint stroke sampled from fast
+    mouse motion still covers every cell it passed over. Cells may lie
+    outside the grid; callers check bounds.
+    """
+    row, col = start
+    end_row, end_col = end
+    d_row = abs(end_row - row)
+    d_col = -abs(end_col - col)
+    step_row = 1 if row < end_row else -1
+    step_col = 1 if col < end_col else -1
+    error = d_row + d_col
+    while True:
+        yield row, col
+        if row == end_row and col == end_col:
+            return
+        doubled = 2 * error
+        if doubled >= d_col:
+            error += d_col
+            row += step_row
+        if doubled <= d_row:
+            error += d_row
+            col += step_col
+
+# ----------------------------------------------------------------------
+# Grid block codec
+# ----------------------------------------------------------------------
+
+# One split over the whole block: cell separators (with the spaces around
+# them, so ',  ' gutters survive) and line breaks are the delimiters
+_GRID_DELIMITERS = re.compile(r'([ \t]*,[ \t]*|\r?\n)')
+# Key line of a literal block scalar, e.g. 'grid: |' or 'grid: |-'
+_BLOCK_HEADER = re.compile(r'^[ \t]*[\w.-]+:[ \t]*\|[-+0-9]*[ \t]*$')
+
+
+class GridLayout:
+    """How a grid block was written, apart from the cell codes.
+
+    header     - key line ('grid: |'), None when the text had none
+    newline    - line ending ('\n' or '\r\n')
+    indent     - text before the first cell of a row
+    separators - separator after each column (',' or a ',  ' gutter), for the usual row
+    ending     - text after the last cell of the usual row (normally ',')
+    fillers    - {row: [raw lines]} blank lines written before a row
+                 (row == number of rows: after the last one)
+    overrides  - {row: (separators, ending, indent)} rows written differently from the usual one
+    widths     - {row: cells} rows written shorter than the grid (padded with EMPTY_CODE)
+    final_newline - whether the text ended with a line break
+    """
+    __slots__ = ('header', 'newline', 'indent', 'separators', 'ending',
+                 'fillers', 'overrides', 'widths', 'final_newline')
+
+    def __init__(self, header: Optional[str] = 'grid: |', newline: str = '\n', indent: str = '  '):
+        self.header = header
+        self.newline = newline
+        self.indent = indent
+        self.separators: List[str] = []
+        self.ending = ','
+        self.fillers: Dict[int, List[str]] = {}
+        self.overrides: Dict[int, Tuple[List[str], str, str]] = {}
+        self.widths: Dict[int, int] = {}
+        self.final_newline = True
+
+    def copy(self) -> 'GridLayout':
+        clone = GridLayout(self.header, self.newline, self.indent)
+        clone.separators = list(self.separators)
+        clone.ending = self.ending
+        clone.fillers = {row: list(lines) for row, lines in self.fillers.items()}
+        clone.overrides = dict(self.overrides)
+        clone.widths = dict(self.widths)
+        clone.final_newline = self.final_newline
+        return clone
+
+    __copy__ = copy
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def __repr__(self):
+        gutters = [col for col, sep in enumerate(self.separators) if sep != ',']
+        return f"GridLayout(sections before rows {sorted(self.fillers)}, gutters after columns {gutters})"
+
+    def resize(self, old_shape: Tuple[int, int], new_shape: Tuple[int, int], anchor: str = 'nw'):
+        """Follow a Grid.resize(): section breaks and gutters move with the cells they belong to"""
+        row_offset, col_offset = resize_offsets(old_shape, new_shape, anchor)
+        rows, cols = new_shape
+
+        def shift_rows(mapping, last):
+            return {row + row_offset: value for row, value in mapping.items()
+                    if 0 <= row + row_offset <= last}
+
+        def shift_columns(separators):
+            shifted = []
+            for col in range(max(0, cols - 1)):
+                old_col = col - col_offset
+                shifted.append(separators[old_col] if 0 <= old_col < len(separators) else ',')
+            return shifted
+
+        # Breaks after the last row stay after the last row
+        trailing = self.fillers.pop(old_shape[0], None)
+        self.fillers = shift_rows(self.fillers, rows - 1)
+        if trailing:
+            self.fillers[rows] = trailing
+        self.separators = shift_columns(self.separators)
+        self.overrides = {row: (shift_columns(separators), ending, indent)
+                          for row, (separators, ending, indent) in shift_rows(self.overrides, rows - 1).items()}
+        if col_offset or new_shape[1] < old_shape[1]:
+            self.widths = {}  # Short rows no longer line up with the columns
+        else:
+            self.widths = shift_rows(self.widths, rows - 1)
+
+
+def parse_grid_block(text: str) -> Tuple[Grid, GridLayout]:
+    """Parse a grid block into cells plus the layout needed to write it back unchanged.
+
+    text is either the value of the grid key ('gm,__,  __,\n...') or the
+    whole section as it appears in the file ('grid: |\n  gm,__,...'). The
+    block is split once; empty cells and blank lines are not cells, short
+    rows are padded with EMPTY_CODE (the same rules as parse_grid_text).
+    """
+    layout = GridLayout(header=None, indent='')
+    parts = _GRID_DELIMITERS.split(text)
+    if len(parts) > 1 and '\n' in parts[1] and _BLOCK_HEADER.match(parts[0]):
+        layout.header = parts[0]
+        parts = parts[2:]
+    newlines = [delimiter for delimiter in parts[1::2] if delimiter.endswith('\n')]
+    if newlines:
+        layout.newline = max(set(newlines), key=newlines.count)
+    layout.final_newline = parts[-1] == ''
+
+    rows: List[List[str]] = []
+    row_seps: List[Tuple[List[str], str]] = []
+    indents: Dict[str, int] = {}
+    pending_fillers: List[str] = []
+    line_tokens: List[str] = []
+    line_seps: List[str] = []
+
+    def finish_line():
+        if not any(token.strip() for token in line_tokens):
+            # Blank line (or a line of bare commas - still not cells)
+            pending_fillers.append(''.join(token + sep for token, sep in zip(line_tokens, line_seps + [''])))
+            return
+        # Empty cells between separators are folded into the separator (',,')
+        cells, seps = [], []
+        lead = ''
+        for token, sep in zip(line_tokens, line_seps + ['']):
+            if not cells:
+                stripped = token.lstrip()
+                if not stripped:
+                    lead += token + sep
+                    continue
+                lead += token[:len(token) - len(stripped)]
+                token = stripped
+            elif not token:
+                seps[-1] += sep
+                continue
+            cells.append(token)
+            seps.append(sep)
+        last = cells[-1]
+        ending = seps.pop()
+        if not ending and last != last.rstrip():
+            ending = last[len(last.rstrip()):]
+            cells[-1] = last.rstrip()
+        if pending_fillers:
+            layout.fillers[len(rows)] = list(pending_fillers)
+            pending_fillers.clear()
+        indents[lead] = indents.get(lead, 0) + 1
+        rows.append(cells)
+        row_seps.append((seps, ending, lead))
+
+    for index, part in enumerate(parts):
+        if index % 2 == 0:
+            line_tokens.append(part)
+        elif part.endswith('\n'):
+            finish_line()
+            line_tokens, line_seps = [], []
+        else:
+            line_seps.append(part)
+    if line_tokens != ['']:
+        finish_line()
+    if pending_fillers:
+        layout.fillers[len(rows)] = list(pending_fillers)
+
+    grid = Grid.from_rows(rows)
+    if indents:
+        layout.indent = max(indents, key=indents.get)
+    elif layout.header is not None:
+        layout.indent = '  '
+
+    # The usual row is the most common (separators, ending); other rows are overrides
+    cols = grid.cols
+    patterns: Dict[Tuple, int] = {}
+    for cells, (seps, ending, lead) in zip(rows, row_seps):
+        if len(cells) == cols:
+            key = (tuple(seps), ending)
+            patterns[key] = patterns.get(key, 0) + 1
+    if patterns:
+        separators, layout.ending = max(patterns, key=patterns.get)
+        layout.separators = list(separators)
+    else:
+        layout.separators = [','] * max(0, cols - 1)
+    for row, (cells, (seps, ending, lead)) in enumerate(zip(rows, row_seps)):
+        if len(cells) < cols:
+            layout.widths[row] = len(cells)
+        if lead != layout.indent or ending != layout.ending or seps != layout.separators[:len(seps)]:
+            layout.overrides[row] = (seps, ending, lead)
+    return grid, layout
+
+
+def format_grid_block(grid: Grid, layout: Optional[GridLayout] = None) -> str:
+    """Write a grid as a block, following a layout from parse_grid_block().
+
+    An unmodified grid comes out byte-identical to the text it was parsed
+    from; edited cells only change their own row. Without a layout the rows
+    are written plainly ('grid: |' and one '  gm,__,...,' line per row).
+    """
+    if layout is None:
+        layout = GridLayout()
+    newline = layout.newline
+    lines = [] if layout.header is None else [layout.header]
+    fillers = layout.fillers
+    overrides = layout.overrides
+    widths = layout.widths
+    default_seps = layout.separators
+    cols = grid.cols
+
+    for row in range(grid.rows):
+        if row in fillers:
+            lines.extend(fillers[row])
+        cells = grid.row(row)
+        seps, ending, indent = overrides.get(row) or (default_seps, layout.ending, layout.indent)
+        width = widths.get(row)
+        if width is not None:
+            # A short row stays short unless something was painted past its end
+            while width < cols and any(code != EMPTY_CODE for code in cells[width:]):
+                width += 1
+            cells = cells[:width]
+        last = len(cells) - 1
+        pieces = [indent]
+        for col, code in enumerate(cells):
+            pieces.append(code)
+            if col < last:
+                pieces.append(seps[col] if col < len(seps) else ',')
+        pieces.append(ending)
+        lines.append(''.join(pieces))
+    if grid.rows in fillers:
+        lines.extend(fillers[grid.rows])
+
+    text = newline.join(lines)
+    if layout.final_newline:
+        text += newline
+    return text
+
+
+def parse_grid_text(text: str) -> Grid:
+    """Build a Grid from a level's grid block ('gm,__,c1,\n__,...').
+
+    Blank lines and the extra spaces between column blocks are ignored;
+    short rows are padded with EMPTY_CODE. Use parse_grid_block() to keep them.
+    """
+    return parse_grid_block(str(text))[0]
+
+
+def substitute_grid_codes(text: str, substitutions: Dict[str, str]) -> Tuple[str, int]:
+    """Apply many code substitutions to a grid block in one pass ({old: new}).
+
+    Deleting is {code: EMPTY_CODE}, renaming {old: new}, merging several
+    codes into one {a: c, b: c}. Whole cells are matched, never substrings,
+    and the block keeps its layout. Returns (text, number of cells changed);
+    text is returned as given when nothing changed.
+    """
+    grid, layout = parse_grid_block(text)
+    changed = grid.replace_codes(substitutions)
+    if not changed:
+        return text, 0
+    return format_grid_block(grid, layout), changed
@@ -0,0 +1,313 @@
+"""
+Co OPERATION: MultiTurn - Selective level section reader
+Used by batch tools that only need a few top-level keys of a level file
+
+Walks the file with PyYAML's event API (yaml.parse) instead of building the
+whole document. Every top-level key gets a LevelSection holding its raw text,
+but Python objects are only constructed for the keys that were asked for, so
+large objectDefinitions/cameraSettings/animation blocks are skipped cheaply.
+Sections that are not replaced are written back byte-for-byte by render().
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import yaml
+
+from yaml_loader import SafeLoader, safe_load_yaml
+
+
+class LevelSection:
+    """Raw text of one top-level key, split into three parts:
+
+    leading  - comment lines directly above the key (e.g. '# Properties about the file')
+    body     - the key line and its value (the part that gets replaced)
+    trailing - blank/comment lines after the value, up to the next section
+    """
+    __slots__ = ('key', 'leading', 'body', 'trailing')
+
+    def __init__(self, key: str, leading: str, body: str, trailing: str):
+        self.key = key
+        self.leading = leading
+        self.body = body
+        self.trailing = trailing
+
+    @property
+    def text(self) -> str:
+        return self.leading + self.body + self.trailing
+
+    def __repr__(self):
+        return f"LevelSection({self.key!r}, {len(self.text)} chars)"
+
+
+class LevelView:
+    """Lightweight view of a level file: raw sections plus data for selected keys"""
+
+    def __init__(self, prefix: str, sections: List[LevelSection], data: Dict, newline: str = '\n'):
+        self.prefix = prefix  # Text before the first section (comments, '---', ...)
+        self.sections = sections
+        self.data = data  # key -> constructed value, only for the requested keys
+        self.newline = newline  # Line ending used by the file, applied to replacement bodies
+        self.entry_indent = 0  # Column of the keys (non-zero for views of nested entries)
+
+    def __contains__(self, key):
+        return any(section.key == key for section in self.sections)
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def keys(self) -> List[str]:
+        return [section.key for section in self.sections]
+
+    def section(self, key: str) -> Optional[LevelSection]:
+        for section in self.sections:
+            if section.key == key:
+                return section
+        return None
+
+    def raw(self, key: str) -> str:
+        """Original text of a section (leading comments + body + trailing lines)"""
+        return self.section(key).text
+
+    @property
+    def text(self) -> str:
+        return self.prefix + ''.join(section.text for section in self.sections)
+
+    def render(self, replacements: Dict[str, Optional[str]] = None) -> str:
+        """Rebuild the file text, swapping in new bodies for the given keys.
+
+        replacements maps key -> new body text (e.g. 'grid: |\\n  gm,__,\\n'),
+        or None to drop that section. Every other section, and the
+        comments/blank lines around replaced bodies, are copied verbatim.
+        Keys not in the file are appended (indented to entry_indent), with a
+        blank line in front if the existing sections are blank-line separated.
+        """
+        return self.splice(replacements).text
+
+    def splice(self, replacements: Dict[str, Optional[str]] = None) -> 'LevelView':
+        """Like render(), but returns the new text as a LevelView (no re-parse needed)"""
+        replacements = {key: body if body is None else self._indent(self._normalize(body))
+                        for key, body in (replacements or {}).items()}
+        # A duplicated key is replaced at its last occurrence (the one YAML
+        # loaders keep) and its earlier occurrences are dropped
+        last_index = {section.key: index for index, section in enumerate(self.sections)}
+
+        sections = []
+        for index, section in enumerate(self.sections):
+            if section.key not in replacements:
+                sections.append(section)
+                continue
+            if index != last_index[section.key]:
+                continue
+            body = replacements.pop(section.key)
+            if body is not None:
+                sections.append(LevelSection(section.key, section.leading, body, section.trailing))
+
+        prefix = self.prefix
+        separator = self.newline if self._blank_line_separated() else ''
+        for key, body in replacements.items():
+            if body is None:
+                continue
+            if sections:
+                last = sections[-1]
+                trailing = last.trailing
+                if not last.text.endswith(('\n', '\r')):
+                    trailing += self.newline
+                if separator and not (last.text + trailing).endswith(self.newline * 2):
+                    trailing += separator
+                sections[-1] = LevelSection(last.key, last.leading, last.body, trailing)
+            elif prefix and not prefix.endswith(('\n', '\r')):
+                prefix += self.newline
+            sections.append(LevelSection(key, '', body, ''))
+
+        view = LevelView(prefix, sections, self.data, self.newline)
+        view.entry_indent = self.entry_indent
+        return view
+
+    def _blank_line_separated(self) -> bool:
+        """Whether most sections are followed by a blank line (top-level keys usually are)"""
+        if len(self.sections) < 2:
+            return not self.entry_indent
+        separated = [section for section in self.sections[:-1]
+                     if section.trailing and _is_blank(section.trailing.split(self.newline)[0])]
+        return len(separated) * 2 >= len(self.sections) - 1
+
+    def _indent(self, body: str) -> str:
+        if not self.entry_indent:
+            return body
+        pad = ' ' * self.entry_indent
+        return ''.join(pad + line if line.strip() else line for line in LINE_PATTERN.findall(body))
+
+    def _normalize(self, body: str) -> str:
+        """Give a replacement body the file's line endings and a final line break"""
+        if not body.endswith('\n'):
+            body += '\n'
+        if self.newline != '\n':
+            body = body.replace('\r\n', '\n').replace('\n', self.newline)
+        return body
+
+
+# YAML line breaks (str.splitlines also splits on form feeds etc., which YAML doesn't)
+LINE_PATTERN = re.compile(r'.*?(?:\r\n|\r|\n)|.+', re.S)
+
+
+def _is_blank(line: str) -> bool:
+    return not line.strip()
+
+
+def _is_comment(line: str) -> bool:
+    return line.lstrip().startswith('#')
+
+
+def _skip_value(events, first_event):
+    """Consume the events of one value without constructing it. Returns its last event."""
+    event = first_event
+    if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+        depth = 1
+        while depth:
+            event = next(events)
+            if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+                depth += 1
+            elif isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+                depth -= 1
+    return event
+
+
+def _collect_spans(events) -> List[tuple]:
+    """Walk the events of one block mapping (after its MappingStartEvent).
+
+    Returns (key, key_line, value_end_line, value_is_scalar) for every entry.
+    """
+    spans = []
+    for key_event in events:
+        if isinstance(key_event, yaml.MappingEndEvent):
+            break
+        value_event = next(events)
+        last_event = _skip_value(events, value_event)
+
+        end_mark = last_event.end_mark
+        value_end_line = end_mark.line + 1 if end_mark.column > 0 else end_mark.line
+        spans.append((str(key_event.value), key_event.start_mark.line, value_end_line,
+                      isinstance(value_event, yaml.ScalarEvent)))
+    return spans
+
+
+def _cut_sections(lines: List[str], spans: List[tuple], prefix_end: int,
+                  indent: int = 0) -> Tuple[int, List[LevelSection]]:
+    """Cut lines into sections, assigning the comment/blank lines between
+    values to the surrounding sections. indent is the column of the keys.
+
+    Returns (end of the prefix, sections).
+    """
+    cuts = []
+    for index, (key, key_line, value_end_line, value_is_scalar) in enumerate(spans):
+        next_key_line = spans[index + 1][1] if index + 1 < len(spans) else len(lines)
+        value_end_line = min(max(value_end_line, key_line + 1), next_key_line)
+
+        # Block scalars and block collections can swallow the blank lines
+        # (and, for collections, comments at key level) that follow them - give those back
+        while value_end_line - 1 > key_line:
+            line = lines[value_end_line - 1]
+            if _is_blank(line) or (not value_is_scalar and _is_comment(line)
+                                   and len(line) - len(line.lstrip()) <= indent):
+                value_end_line -= 1
+            else:
+                break
+
+        # Comment lines directly above the next key belong to that key
+        next_start = next_key_line
+        if index + 1 < len(spans):
+            while next_start - 1 >= value_end_line and _is_comment(lines[next_start - 1]):
+                next_start -= 1
+
+        cuts.append((key, key_line, value_end_line, next_start))
+
+    # Leading comments of the first key are moved out of the prefix as well
+    if cuts:
+        while prefix_end - 1 >= 0 and _is_comment(lines[prefix_end - 1]):
+            prefix_end -= 1
+    leading_starts = [prefix_end] + [cut[3] for cut in cuts[:-1]]
+
+    sections = [
+        LevelSection(key,
+                     ''.join(lines[leading_start:key_line]),
+                     ''.join(lines[key_line:value_end_line]),
+                     ''.join(lines[value_end_line:section_end]))
+        for (key, key_line, value_end_line, section_end), leading_start in zip(cuts, leading_starts)
+    ]
+    return prefix_end, sections
+
+
+def _detect_newline(lines: List[str]) -> str:
+    return '\r\n' if lines and lines[0].endswith('\r\n') else '\n'
+
+
+def parse_level_sections(text: str, keys: Iterable[str] = None) -> LevelView:
+    """Split level YAML text into top-level sections.
+
+    keys: top-level keys to construct Python data for (None = none).
+    Raises yaml.YAMLError if the text is not valid YAML.
+    """
+    wanted = set(keys or ())
+    lines = LINE_PATTERN.findall(text)
+
+    # Pass 1: find each top-level key's first line and the line after its value
+    events = yaml.parse(text, Loader=SafeLoader)
+    for event in events:
+        if isinstance(event, yaml.MappingStartEvent):
+            break
+        if isinstance(event, (yaml.ScalarEvent, yaml.SequenceStartEvent, yaml.StreamEndEvent)):
+            # Not a mapping document - nothing to split
+            return LevelView(text, [], {}, '\r\n' if '\r\n' in text else '\n')
+    spans = _collect_spans(events)
+
+    # Pass 2: cut the text into sections
+    prefix_end, sections = _cut_sections(lines, spans, spans[0][1] if spans else len(lines))
+
+    data = {}
+    for section in sections:
+        if section.key in wanted:
+            parsed = safe_load_yaml(section.body)
+            data[section.key] = parsed.get(section.key) if isinstance(parsed, dict) else None
+
+    return LevelView(''.join(lines[:prefix_end]), sections, data, _detect_newline(lines))
+
+
+def parse_section_entries(section: LevelSection, newline: str = '\n') -> Optional[LevelView]:
+    """Split the body of a block-mapping section into one section per entry.
+
+    The returned view's prefix is the key line (plus any blank lines or
+    comments before the first entry), and render() gives back a complete
+    body for the parent view. Entries are rendered at the indentation of the
+    existing ones, see LevelView.entry_indent. Returns None when the value is
+    not a non-empty block mapping (e.g. 'gridObjects:' or 'gridObjects: {}').
+    """
+    lines = LINE_PATTERN.findall(section.body)
+    events = yaml.parse(section.body, Loader=SafeLoader)
+    for event in events:
+        if isinstance(event, yaml.MappingStartEvent):
+            break
+    next(events)  # The section's own key
+    value_event = next(events)
+    if not isinstance(value_event, yaml.MappingStartEvent) or value_event.flow_style:
+        return None
+
+    spans = _collect_spans(events)
+    if not spans:
+        return None
+    indent = len(lines[spans[0][1]]) - len(lines[spans[0][1]].lstrip())
+    prefix_end, sections = _cut_sections(lines, spans, spans[0][1], indent)
+    view = LevelView(''.join(lines[:prefix_end]), sections, {}, newline)
+    view.entry_indent = indent
+    return view
+
+
+def read_level_sections(filepath: str, keys: Iterable[str] = None) -> LevelView:
+    """Read a level file and split it into sections (see parse_level_sections)"""
+    # newline='' keeps the original line endings so untouched sections round-trip exactly
+    with open(filepath, 'r', encoding='utf-8', newline='') as f:
+        text = f.read()
+    return parse_level_sections(text, keys)
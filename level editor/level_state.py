@@ -0,0 +1,379 @@
+"""
+Co OPERATION: MultiTurn - Persistent level state
+Used by the level editor to keep an immutable snapshot of the level next to its working state
+
+The editor edits mutable dicts and a Grid because the canvas code reads
+them on every redraw. Saving (and anything else that wants a consistent
+view of the level while the user keeps painting) needs a snapshot, and a
+deep copy of a level that merged in a shared definitions file is large.
+
+LevelDocument is that snapshot, built from path-copying structures so the
+editor can keep it current at the cost of each edit: taking a snapshot is
+just holding on to the current document, and an edit makes a new document
+that shares everything except the changed row or entry:
+
+    PersistentGrid   the grid as a tuple of row tuples; setting a cell
+                     copies that row and the (short) tuple of rows
+    PersistentMap    gridObjects / objectDefinitions / globalData; a 32-way
+                     hash trie two levels deep whose leaves are small dicts,
+                     so setting an entry copies two 32-slot tuples and one
+                     leaf. Iteration keeps insertion order like a dict.
+
+Values stored in a document (object lists, definitions, camera settings)
+are never mutated after they are stored; the editor stores copies. Readers
+on other threads may therefore use a document without locks. Comparing two
+documents only walks the parts they don't share (see changed_keys).
+"""
+
+import copy
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Set, Tuple
+
+from level_grid import EMPTY_CODE, Grid, GridLayout
+from undo_log import MISSING
+
+_BITS = 5
+_WIDTH = 1 << _BITS
+_MASK = _WIDTH - 1
+_DEPTH = 2  # 1024 leaves: a few entries per leaf for the largest shared definition files
+
+
+def _slot(key_hash: int, level: int) -> int:
+    return (key_hash >> (_BITS * level)) & _MASK
+
+
+class PersistentMap:
+    """Immutable insertion-ordered mapping; set()/remove() return a new map sharing the rest.
+
+    Leaves map key -> (insertion sequence, value).
+    """
+    __slots__ = ('_root', '_len', '_next_seq')
+
+    def __init__(self, items: Optional[Iterable[Tuple[Hashable, Any]]] = None):
+        self._root = None
+        self._len = 0
+        self._next_seq = 0
+        if items is not None:
+            self._build(items.items() if isinstance(items, dict) else items)
+
+    def _build(self, items):
+        # One pass into mutable nodes, frozen into tuples at the end
+        root = None
+        seq = 0
+        for key, value in items:
+            key_hash = hash(key)
+            if root is None:
+                root = [None] * _WIDTH
+            node = root
+            for level in range(_DEPTH - 1):
+                index = _slot(key_hash, level)
+                if node[index] is None:
+                    node[index] = [None] * _WIDTH
+                node = node[index]
+            index = _slot(key_hash, _DEPTH - 1)
+            if node[index] is None:
+                node[index] = {}
+            leaf = node[index]
+            if key in leaf:
+                leaf[key] = (leaf[key][0], value)
+            else:
+                leaf[key] = (seq, value)
+                seq += 1
+
+        def freeze(node, level):
+            if node is None or level == _DEPTH:
+                return node
+            return tuple(freeze(child, level + 1) for child in node)
+
+        self._root = freeze(root, 0)
+        self._len = seq
+        self._next_seq = seq
+
+    @classmethod
+    def _make(cls, root, length: int, next_seq: int) -> 'PersistentMap':
+        result = cls.__new__(cls)
+        result._root = root
+        result._len = length
+        result._next_seq = next_seq
+        return result
+
+    def _leaf(self, key_hash: int) -> Optional[dict]:
+        node = self._root
+        for level in range(_DEPTH):
+            if node is None:
+                return None
+            node = node[_slot(key_hash, level)]
+        return node
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def __len__(self):
+        return self._len
+
+    def __contains__(self, key):
+        leaf = self._leaf(hash(key))
+        return leaf is not None and key in leaf
+
+    def get(self, key, default=None):
+        leaf = self._leaf(hash(key))
+        entry = leaf.get(key) if leaf is not None else None
+        return default if entry is None else entry[1]
+
+    def __getitem__(self, key):
+        leaf = self._leaf(hash(key))
+        entry = leaf.get(key) if leaf is not None else None
+        if entry is None:
+            raise KeyError(key)
+        return entry[1]
+
+    def _entries(self) -> List[Tuple[int, Hashable, Any]]:
+        """(sequence, key, value) of every entry, in insertion order"""
+        found = []
+        stack = [(self._root, 0)] if self._root is not None else []
+        while stack:
+            node, level = stack.pop()
+            if level == _DEPTH:
+                found.extend((seq, key, value) for key, (seq, value) in node.items())
+            else:
+                stack.extend((child, level + 1) for child in node if child is not None)
+        found.sort(key=lambda entry: entry[0])
+        return found
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        return [(key, value) for _, key, value in self._entries()]
+
+    def keys(self) -> List[Hashable]:
+        return [key for _, key, _ in self._entries()]
+
+    def values(self) -> List[Any]:
+        return [value for _, _, value in self._entries()]
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self.keys())
+
+    def to_dict(self) -> Dict:
+        return dict(self.items())
+
+    def __eq__(self, other):
+        if not isinstance(other, PersistentMap):
+            return NotImplemented
+        return self._len == other._len and not self.changed_keys(other)
+
+    def __repr__(self):
+        return f"PersistentMap({len(self)} entries)"
+
+    # ------------------------------------------------------------------
+    # Path-copying updates
+    # ------------------------------------------------------------------
+
+    def _with_leaf(self, key_hash: int, leaf: Optional[dict]):
+        """Root of a copy of the trie with the leaf for key_hash replaced (None removes it)"""
+        path = []
+        node = self._root
+        for level in range(_DEPTH):
+            path.append(node)
+            node = node[_slot(key_hash, level)] if node is not None else None
+        child = leaf
+        for level in reversed(range(_DEPTH)):
+            slots = list(path[level]) if path[level] is not None else [None] * _WIDTH
+            slots[_slot(key_hash, level)] = child
+            # Drop nodes that became empty so equal maps have equal shapes
+            child = tuple(slots) if any(slot is not None for slot in slots) else None
+        return child
+
+    def set(self, key, value) -> 'PersistentMap':
+        """Copy with key set to value (an existing key keeps its position)"""
+        key_hash = hash(key)
+        leaf = self._leaf(key_hash)
+        old = leaf.get(key) if leaf is not None else None
+        if old is not None and old[1] is value:
+            return self
+        leaf = dict(leaf) if leaf is not None else {}
+        if old is not None:
+            leaf[key] = (old[0], value)
+            return self._make(self._with_leaf(key_hash, leaf), self._len, self._next_seq)
+        leaf[key] = (self._next_seq, value)
+        return self._make(self._with_leaf(key_hash, leaf), self._len + 1, self._next_seq + 1)
+
+    def remove(self, key) -> 'PersistentMap':
+        """Copy without key (the same map if it isn't there)"""
+        key_hash = hash(key)
+        leaf = self._leaf(key_hash)
+        if leaf is None or key not in leaf:
+            return self
+        leaf = dict(leaf)
+        del leaf[key]
+        return self._make(self._with_leaf(key_hash, leaf or None), self._len - 1, self._next_seq)
+
+    # ------------------------------------------------------------------
+    # Comparing
+    # ------------------------------------------------------------------
+
+    def changed_keys(self, other: 'PersistentMap') -> List[Hashable]:
+        """Keys whose value differs from other's (or that only one map has).
+
+        Subtrees the two maps share are skipped without looking at them, so
+        comparing a map with an earlier version of itself costs about as
+        much as the edits made since. Keys of this map come first, in its
+        order, then keys only other has, in other's order.
+        """
+        changed = []
+        removed = []
+
+        def walk(mine, theirs, level):
+            if mine is theirs:
+                return
+            if level == _DEPTH:
+                mine = mine or {}
+                theirs = theirs or {}
+                for key, (seq, value) in mine.items():
+                    old = theirs.get(key)
+                    if old is None or (old[1] is not value and old[1] != value):
+                        changed.append((seq, key))
+                removed.extend((seq, key) for key, (seq, _) in theirs.items() if key not in mine)
+                return
+            for index in range(_WIDTH):
+                walk(mine[index] if mine is not None else None,
+                     theirs[index] if theirs is not None else None, level + 1)
+
+        walk(self._root, other._root, 0)
+        changed.sort(key=lambda entry: entry[0])
+        removed.sort(key=lambda entry: entry[0])
+        return [key for _, key in changed] + [key for _, key in removed]
+
+
+class PersistentGrid:
+    """Immutable grid of cell codes as a tuple of row tuples"""
+    __slots__ = ('_rows', '_cols')
+
+    def __init__(self, rows: Tuple[Tuple[str, ...], ...] = (), cols: int = 0):
+        self._rows = rows
+        self._cols = cols
+
+    @classmethod
+    def from_grid(cls, grid: Grid) -> 'PersistentGrid':
+        return cls(tuple(tuple(row) for row in grid), grid.cols)
+
+    def to_grid(self) -> Grid:
+        grid = Grid.from_rows([list(row) for row in self._rows])
+        if not self._rows:
+            grid.resize(0, self._cols)
+        return grid
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self._rows), self._cols
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __getitem__(self, position: Tuple[int, int]) -> str:
+        row, col = position
+        return self._rows[row][col]
+
+    def row(self, row: int) -> Tuple[str, ...]:
+        return self._rows[row]
+
+    def set(self, row: int, col: int, code: str) -> 'PersistentGrid':
+        """Copy with one cell changed; only that row is copied, the others are shared"""
+        cells = self._rows[row]
+        if cells[col] == code:
+            return self
+        cells = cells[:col] + (code,) + cells[col + 1:]
+        return PersistentGrid(self._rows[:row] + (cells,) + self._rows[row + 1:], self._cols)
+
+    def used_codes(self, include_empty: bool = False) -> Set[str]:
+        codes = set().union(*self._rows)
+        if not include_empty:
+            codes.discard(EMPTY_CODE)
+        return codes
+
+    def changed_rows(self, other: 'PersistentGrid') -> List[int]:
+        """Rows that differ from another grid of the same shape (shared rows are skipped)"""
+        if self.shape != other.shape:
+            raise ValueError(f"Can't compare a {self.shape[0]}x{self.shape[1]} grid "
+                             f"with a {other.shape[0]}x{other.shape[1]} one")
+        return [index for index, (mine, theirs) in enumerate(zip(self._rows, other._rows))
+                if mine is not theirs and mine != theirs]
+
+    def __eq__(self, other):
+        if not isinstance(other, PersistentGrid):
+            return NotImplemented
+        return self.shape == other.shape and not self.changed_rows(other)
+
+    def __repr__(self):
+        return f"PersistentGrid({self.shape[0]}x{self.shape[1]})"
+
+
+# LevelDocument section -> attribute holding its PersistentMap
+ENTRY_SECTIONS = {
+    'gridObjects': 'grid_objects',
+    'objectDefinitions': 'object_definitions',
+    'globalData': 'global_data',
+}
+
+
+class LevelDocument:
+    """Immutable snapshot of a level. Every update returns a new document.
+
+    The grid layout and the other values are stored as given and must not
+    be mutated afterwards (from_state copies them).
+    """
+    __slots__ = ('grid', 'layout', 'grid_objects', 'object_definitions', 'global_data',
+                 'camera_settings', 'scene_name', 'creator_name', 'includes')
+
+    def __init__(self, grid: Optional[PersistentGrid] = None, layout: Optional[GridLayout] = None,
+                 grid_objects: Optional[PersistentMap] = None, object_definitions: Optional[PersistentMap] = None,
+                 global_data: Optional[PersistentMap] = None, camera_settings: Optional[dict] = None,
+                 scene_name: str = 'OriginalWorld', creator_name: str = 'Level Editor User',
+                 includes: Tuple[str, ...] = ()):
+        self.grid = grid if grid is not None else PersistentGrid()
+        self.layout = layout if layout is not None else GridLayout()
+        self.grid_objects = grid_objects if grid_objects is not None else PersistentMap()
+        self.object_definitions = object_definitions if object_definitions is not None else PersistentMap()
+        self.global_data = global_data if global_data is not None else PersistentMap()
+        self.camera_settings = camera_settings or {}
+        self.scene_name = scene_name
+        self.creator_name = creator_name
+        self.includes = tuple(includes)
+
+    @classmethod
+    def from_state(cls, grid: Grid, layout: GridLayout, grid_objects: Dict, object_definitions: Dict,
+                   global_data: Optional[Dict] = None, **values) -> 'LevelDocument':
+        """Snapshot of mutable editor state (copies everything, once)"""
+        return cls(PersistentGrid.from_grid(grid), layout.copy(),
+                   PersistentMap(copy.deepcopy(grid_objects)),
+                   PersistentMap(copy.deepcopy(object_definitions)),
+                   PersistentMap(copy.deepcopy(global_data or {})),
+                   **{key: copy.deepcopy(value) for key, value in values.items()})
+
+    def replace(self, **changes) -> 'LevelDocument':
+        document = LevelDocument.__new__(LevelDocument)
+        for name in self.__slots__:
+            setattr(document, name, changes.pop(name, getattr(self, name)))
+        if changes:
+            raise TypeError(f"LevelDocument has no field {next(iter(changes))!r}")
+        return document
+
+    def set_cell(self, row: int, col: int, code: str) -> 'LevelDocument':
+        grid = self.grid.set(row, col, code)
+        return self if grid is self.grid else self.replace(grid=grid)
+
+    def set_grid(self, grid: Grid, layout: GridLayout) -> 'LevelDocument':
+        """Copy with a whole new grid (after a resize); grid and layout are copied"""
+        return self.replace(grid=PersistentGrid.from_grid(grid), layout=layout.copy())
+
+    def set_entry(self, section: str, key: Hashable, value: Any) -> 'LevelDocument':
+        """Copy with one entry of an ENTRY_SECTIONS section set (MISSING removes it)"""
+        name = ENTRY_SECTIONS[section]
+        entries = getattr(self, name)
+        entries = entries.remove(key) if value is MISSING else entries.set(key, value)
+        return self if entries is getattr(self, name) else self.replace(**{name: entries})
+
+    def entries(self, section: str) -> PersistentMap:
+        return getattr(self, ENTRY_SECTIONS[section])
+
+    def __repr__(self):
+        return (f"LevelDocument({self.grid!r}, {len(self.grid_objects)} gridObjects, "
+                f"{len(self.object_definitions)} objectDefinitions)")
@@ -0,0 +1,169 @@
+"""
+Co OPERATION: MultiTurn - Background texture loader
+Used by the level editor to decode textures and extract GLB textures off the Tk thread
+
+Tk objects may only be touched from the main thread, so workers only produce
+plain PIL images (or file paths); the editor collects finished jobs with
+poll() from a root.after() pump and turns them into PhotoImages there.
+
+Jobs are keyed (one job per texture, however many cells wait for it) and
+run newest-request-first: every request() queues a "run the most recent
+pending job" task rather than the job itself, so re-requesting a texture
+moves it to the front and cancel() can still drop a job that hasn't
+started - e.g. when the cells waiting for it scroll out of view.
+"""
+
+import os
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from glb_texture import GLBError, has_albedo_image, open_albedo_image
+from thumbnail_store import hash_file, write_tile
+
+# PIL releases the GIL while decoding and resampling, so threads run in parallel
+MAX_TEXTURE_WORKERS = min(4, os.cpu_count() or 2)
+
+MODEL_EXTENSIONS = ('.glb', '.gltf')
+
+
+def open_texture(filepath: str) -> 'Image.Image':
+    """Open an image file, or the albedo texture embedded in a GLB/glTF model"""
+    from PIL import Image
+
+    if filepath.lower().endswith(MODEL_EXTENSIONS):
+        image = open_albedo_image(filepath)
+        if image is None:
+            raise GLBError(f"{os.path.basename(filepath)} has no texture")
+        return image
+    return Image.open(filepath)
+
+
+def build_texture_pyramid(filepath: str, sizes: Sequence[int], size: Optional[int] = None,
+                          store: Optional['ThumbnailStore'] = None) -> Dict[int, 'Image.Image']:
+    """Decode a texture once into square RGBA mip levels ({size: image}).
+
+    The largest level is a LANCZOS resample of the file (see open_texture),
+    each smaller one a BOX downscale of the level above it. With size, the
+    result also holds a LANCZOS tile of exactly that size (the current cell
+    image size), made from the smallest level at least as big.
+
+    With a ThumbnailStore, tiles it already has are loaded instead, and
+    only a source with missing tiles is decoded; new tiles are stored.
+    Safe to call from any thread.
+    """
+    from PIL import Image
+
+    sizes = sorted(sizes)
+    key = store.source_key(filepath) if store is not None else None
+    stored = {}
+    if store is not None:
+        for level_size in sizes + ([size] if size is not None and size not in sizes else []):
+            tile = store.get(key, level_size)
+            if tile is not None:
+                stored[level_size] = tile
+
+    pyramid = dict(stored)
+    if any(level_size not in stored for level_size in sizes):
+        # Decode the source; the levels (and an exact tile) are all made from it again
+        with open_texture(filepath) as img:
+            level = img.convert('RGBA').resize((sizes[-1], sizes[-1]), Image.Resampling.LANCZOS)
+        pyramid = {sizes[-1]: level}
+        for level_size in reversed(sizes[:-1]):
+            level = level.resize((level_size, level_size), Image.Resampling.BOX)
+            pyramid[level_size] = level
+    if size is not None and size not in pyramid:
+        source = next((pyramid[mip] for mip in sizes if mip >= size), pyramid[sizes[-1]])
+        pyramid[size] = source.resize((size, size), Image.Resampling.LANCZOS)
+
+    if store is not None:
+        for level_size, level in pyramid.items():
+            if level_size not in stored:
+                store.put(key, level_size, level)
+    return pyramid
+
+
+def prepare_model_tiles(filepath: str, sizes: Sequence[int], size: int, store_folder: str) -> Tuple:
+    """Process-pool job of the Mod folder warm-up: decode a model's albedo
+    texture and write its tiles into the thumbnail store folder.
+
+    Returns (filepath, (mtime_ns, size) signature, content hash, {tile size:
+    bytes}) for ThumbnailStore.adopt(); the tiles are empty for a model
+    without images.
+    """
+    st = os.stat(filepath)
+    key = hash_file(filepath)
+    tiles = {}
+    if has_albedo_image(filepath):
+        for level_size, level in build_texture_pyramid(filepath, sizes, size).items():
+            tiles[level_size] = write_tile(store_folder, key, level_size, level)
+    return filepath, (st.st_mtime_ns, st.st_size), key, tiles
+
+
+class TextureLoader:
+    """Keyed background jobs with newest-first scheduling and cancellation"""
+
+    def __init__(self, max_workers: int = MAX_TEXTURE_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='texture')
+        self._lock = threading.Lock()
+        self._pending: 'OrderedDict[Hashable, Callable]' = OrderedDict()  # Not started yet, newest last
+        self._running = set()
+        self._results = queue.SimpleQueue()  # (key, result, error) of finished jobs
+
+    def request(self, key: Hashable, job: Callable[[], object]):
+        """Queue job() under key, or move an already queued job to the front.
+
+        A key that is already running is not queued again.
+        """
+        with self._lock:
+            if key in self._running:
+                return
+            if key in self._pending:
+                self._pending.move_to_end(key)
+                return
+            self._pending[key] = job
+        self._executor.submit(self._run_next)
+
+    def cancel(self, key: Hashable) -> bool:
+        """Drop a job that hasn't started. Returns False if it is running or unknown."""
+        with self._lock:
+            return self._pending.pop(key, None) is not None
+
+    def busy(self) -> bool:
+        """Whether jobs are queued, running or waiting to be polled"""
+        with self._lock:
+            return bool(self._pending or self._running) or not self._results.empty()
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending) + len(self._running)
+
+    def poll(self) -> List[Tuple[Hashable, object, str]]:
+        """Finished jobs as (key, result, error message or None). Call from the Tk thread."""
+        finished = []
+        while True:
+            try:
+                finished.append(self._results.get_nowait())
+            except queue.Empty:
+                return finished
+
+    def shutdown(self):
+        with self._lock:
+            self._pending.clear()
+        self._executor.shutdown(wait=False)
+
+    def _run_next(self):
+        with self._lock:
+            if not self._pending:
+                return  # Cancelled, or already run by an earlier task
+            key, job = self._pending.popitem(last=True)
+            self._running.add(key)
+        try:
+            self._results.put((key, job(), None))
+        except Exception as e:
+            self._results.put((key, None, str(e)))
+        finally:
+            with self._lock:
+                self._running.discard(key)
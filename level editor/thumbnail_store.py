@@ -0,0 +1,243 @@
+"""
+Co OPERATION: MultiTurn - Persistent thumbnail store
+Used by the level editor's texture loader so textures survive restarts ready to draw
+
+Decoding a texture file (or a GLB model's albedo image) and resampling it
+to the cell sizes is the expensive part of showing a level. The results are
+small square RGBA tiles, so they are kept on disk in the user cache folder
+(next to the parse cache, see yaml_loader.get_user_cache_dir) as PNGs:
+
+    <sha256 of the source file>-<size>.png
+
+Keys are content hashes, so an edited texture or model gets new tiles and
+moving the Mod folder doesn't invalidate anything. A manifest records the
+stat signature each source was hashed at (so unchanged files aren't read
+again to hash them) and when each tile was last used; tiles beyond the
+size cap are evicted least recently used first.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from atomic_write import write_text_atomic
+from yaml_loader import get_user_cache_dir
+
+THUMBNAIL_STORE_MAX_BYTES = 32 * 1024 * 1024  # PNG bytes on disk
+MANIFEST_VERSION = 1
+
+
+def default_store_folder() -> str:
+    return os.path.join(get_user_cache_dir(), "thumbnails")
+
+
+def hash_file(path: str) -> str:
+    """sha256 of a file's contents, the key of its tiles"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def tile_name(key: str, size: int) -> str:
+    return f"{key}-{size}.png"
+
+
+def write_tile(folder: str, key: str, size: int, image: 'Image.Image') -> int:
+    """Write one tile into a store folder (temp file + rename, so readers and
+    other processes never see half a tile). Returns its size in bytes."""
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=folder, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            image.save(f, 'PNG', compress_level=1)
+        nbytes = os.path.getsize(tmp_path)
+        os.replace(tmp_path, os.path.join(folder, tile_name(key, size)))
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return nbytes
+
+
+class ThumbnailStore:
+    """Content-addressed tiles on disk with an LRU size cap. Safe to use from worker threads."""
+
+    def __init__(self, folder: Optional[str] = None, max_bytes: int = THUMBNAIL_STORE_MAX_BYTES):
+        self.folder = folder or default_store_folder()
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._sources: Dict[str, list] = {}  # abs source path -> [mtime_ns, size, content hash]
+        self._tiles: Dict[str, list] = {}  # tile file name -> [bytes, last used (time.time())]
+        self._total_bytes = 0
+        self._dirty = False  # Tiles or sources changed since the manifest was written
+        self._touched = False  # Only last-used times changed (written by flush(usage=True))
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._load_manifest()
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.folder, "manifest.json")
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('version') != MANIFEST_VERSION:
+                raise ValueError("old manifest")
+            self._sources = manifest['sources']
+            self._tiles = manifest['tiles']
+        except (OSError, ValueError, KeyError):
+            # No (usable) manifest: adopt the tiles already in the folder
+            self._sources = {}
+            self._tiles = {}
+            try:
+                for name in os.listdir(self.folder):
+                    if name.endswith('.png'):
+                        st = os.stat(os.path.join(self.folder, name))
+                        self._tiles[name] = [st.st_size, st.st_mtime]
+            except OSError:
+                pass
+            self._dirty = bool(self._tiles)
+        self._total_bytes = sum(size for size, _ in self._tiles.values())
+
+    def source_key(self, filepath: str) -> str:
+        """Content hash of a source file (hashed again only when its stat signature changes)"""
+        path = os.path.abspath(filepath)
+        st = os.stat(path)
+        with self._lock:
+            known = self._sources.get(path)
+        if known and known[0] == st.st_mtime_ns and known[1] == st.st_size:
+            return known[2]
+        key = hash_file(path)
+        with self._lock:
+            self._sources[path] = [st.st_mtime_ns, st.st_size, key]
+            self._dirty = True
+        return key
+
+    def has_tiles(self, filepath: str) -> bool:
+        """Whether any tile of the source is stored (without hashing a changed file)"""
+        path = os.path.abspath(filepath)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        with self._lock:
+            known = self._sources.get(path)
+            if not known or known[0] != st.st_mtime_ns or known[1] != st.st_size:
+                return False
+            prefix = known[2] + '-'
+            return any(name.startswith(prefix) for name in self._tiles)
+
+    def get(self, key: str, size: int) -> Optional['Image.Image']:
+        """The stored size x size tile of a source, or None"""
+        from PIL import Image
+
+        name = tile_name(key, size)
+        with self._lock:
+            entry = self._tiles.get(name)
+            if entry is None:
+                self.misses += 1
+                return None
+        try:
+            with Image.open(os.path.join(self.folder, name)) as tile:
+                tile.load()
+                image = tile.convert('RGBA') if tile.mode != 'RGBA' else tile.copy()
+        except OSError:
+            # Deleted behind our back (or unreadable): forget it
+            with self._lock:
+                self._forget(name)
+                self.misses += 1
+            return None
+        with self._lock:
+            # Kept in memory; a hit alone isn't worth rewriting the manifest
+            entry[1] = time.time()
+            self._touched = True
+            self.hits += 1
+        return image
+
+    def put(self, key: str, size: int, image: 'Image.Image'):
+        """Store a tile, evicting least recently used tiles beyond the cap"""
+        name = tile_name(key, size)
+        try:
+            nbytes = write_tile(self.folder, key, size, image)
+        except OSError as e:
+            # The store is only an optimisation - never fail a texture because of it
+            print(f"Could not write thumbnail {name}: {e}")
+            return
+        with self._lock:
+            self._add_tile(name, nbytes)
+            self._evict()
+
+    def adopt(self, filepath: str, signature: Tuple[int, int], key: str, tiles: Dict[int, int]):
+        """Record tiles another process wrote into the folder with write_tile.
+
+        signature is the source's (mtime_ns, size) when it was hashed to
+        key, tiles maps tile size -> bytes.
+        """
+        with self._lock:
+            self._sources[os.path.abspath(filepath)] = [signature[0], signature[1], key]
+            for size, nbytes in tiles.items():
+                self._add_tile(tile_name(key, size), nbytes)
+            self._dirty = True
+            self._evict()
+
+    def _add_tile(self, name: str, nbytes: int):
+        self._forget(name)
+        self._tiles[name] = [nbytes, time.time()]
+        self._total_bytes += nbytes
+        self._dirty = True
+
+    def _forget(self, name: str):
+        entry = self._tiles.pop(name, None)
+        if entry is not None:
+            self._total_bytes -= entry[0]
+            self._dirty = True
+
+    def _evict(self):
+        if self._total_bytes <= self.max_bytes:
+            return
+        for name in sorted(self._tiles, key=lambda name: self._tiles[name][1]):
+            if self._total_bytes <= self.max_bytes:
+                break
+            self._forget(name)
+            self.evictions += 1
+            try:
+                os.remove(os.path.join(self.folder, name))
+            except OSError:
+                pass
+
+    def flush(self, usage: bool = False):
+        """Write the manifest if tiles or sources changed since the last flush.
+
+        With usage, last-used times updated by get() are written too (at
+        shutdown); without it they stay in memory, so showing stored tiles
+        never rewrites the manifest.
+        """
+        with self._lock:
+            if not (self._dirty or (usage and self._touched)):
+                return
+            # Sources whose tiles were all evicted only cost manifest space
+            live = {name.split('-', 1)[0] for name in self._tiles}
+            self._sources = {path: info for path, info in self._sources.items() if info[2] in live}
+            text = json.dumps({'version': MANIFEST_VERSION, 'sources': self._sources, 'tiles': self._tiles})
+            self._dirty = False
+            self._touched = False
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+            write_text_atomic(self.manifest_path, text)
+        except OSError as e:
+            print(f"Could not write thumbnail manifest: {e}")
+
+    def format_stats(self) -> str:
+        """One-line summary for the status bar"""
+        return (f"Thumbnail store: {len(self._tiles)} tiles, "
+                f"{self._total_bytes / 1048576:.1f}/{self.max_bytes / 1048576:.0f} MB, "
+                f"{self.hits} hits / {self.misses} misses, {self.evictions} evictions")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-file YAML parse time, pure Python loader vs the yaml_loader layer
+
+Parses every .yaml file under levels/ with yaml.SafeLoader (pure Python) and
+with yaml_loader.SafeLoader (libyaml's CSafeLoader when available) and prints
+the best-of-N time for each file plus the totals.
+
+Usage:
+    py bench_yaml_load.py [levels_dir] [--repeat N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import yaml_loader
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+
+def find_yaml_files(folder):
+    """Find all .yaml files in folder and subfolders"""
+    found = []
+    for root, dirs, files in os.walk(folder):
+        for file in files:
+            if file.lower().endswith('.yaml'):
+                found.append(os.path.join(root, file))
+    return sorted(found)
+
+
+def time_parse(text, loader, repeat):
+    """Return the best time (seconds) out of `repeat` parses of text"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        yaml.load(text, Loader=loader)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('levels_dir', nargs='?', default=os.path.join(REPO_ROOT, 'levels'))
+    parser.add_argument('--repeat', type=int, default=5, help='parses per file and loader (best time is kept)')
+    args = parser.parse_args()
+
+    files = find_yaml_files(args.levels_dir)
+    print(f"libyaml available: {yaml_loader.LIBYAML_AVAILABLE} "
+          f"(fast loader: {yaml_loader.SafeLoader.__name__})")
+    print(f"{len(files)} files, best of {args.repeat}\n")
+    print(f"{'file':<70} {'python ms':>10} {'layer ms':>10} {'speedup':>8}")
+
+    total_before = total_after = 0.0
+    for path in files:
+        with open(path, 'rb') as f:
+            text = f.read()
+        try:
+            before = time_parse(text, yaml.SafeLoader, args.repeat)
+            after = time_parse(text, yaml_loader.SafeLoader, args.repeat)
+        except yaml.YAMLError as e:
+            print(f"{os.path.relpath(path, args.levels_dir):<70} parse error: {e}")
+            continue
+        total_before += before
+        total_after += after
+        print(f"{os.path.relpath(path, args.levels_dir)[:70]:<70} {before * 1000:>10.2f} "
+              f"{after * 1000:>10.2f} {before / after:>7.1f}x")
+
+    print(f"\n{'TOTAL':<70} {total_before * 1000:>10.2f} {total_after * 1000:>10.2f} "
+          f"{total_before / total_after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Grid block round-trip check
+
+Parses the grid block of every level under levels/ (or the given files) with
+level_grid.parse_grid_block and writes it back with format_grid_block. The
+output must be byte-identical to the file's text, and the cells must match
+what the YAML loader reads for the grid. Prints each file that fails plus a
+summary; with -v also each grid's size and layout (section breaks, gutters).
+
+Usage:
+    py check_grid_roundtrip.py [-v] [level.yaml ...]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from level_grid import format_grid_block, parse_grid_block, parse_grid_text
+from level_sections import read_level_sections
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+
+def find_levels(folder):
+    """Find all .yaml files in folder and subfolders"""
+    found = []
+    for root, dirs, files in os.walk(folder):
+        for name in files:
+            if name.endswith('.yaml'):
+                found.append(os.path.join(root, name))
+    return sorted(found)
+
+
+def check_file(filepath, verbose=False):
+    """Round-trip one file's grid block.
+
+    Returns 'ok', 'failed' or 'skipped' (no grid, or not a block scalar).
+    """
+    view = read_level_sections(filepath, keys=('grid',))
+    section = view.section('grid')
+    if section is None or not isinstance(view.get('grid'), str):
+        return 'skipped'
+
+    start = time.perf_counter()
+    grid, layout = parse_grid_block(section.body)
+    if layout.header is None:
+        return 'skipped'
+    text = format_grid_block(grid, layout)
+    elapsed = time.perf_counter() - start
+
+    name = os.path.relpath(filepath, REPO_ROOT)
+    problems = []
+    if text != section.body:
+        # Show the first line that differs
+        for line_number, (before, after) in enumerate(zip(section.body.splitlines(), text.splitlines()), 1):
+            if before != after:
+                problems.append(f"line {line_number} of the block: {before!r} -> {after!r}")
+                break
+        else:
+            problems.append(f"length {len(section.body)} -> {len(text)}")
+    if grid != parse_grid_text(view['grid']):
+        problems.append("cells differ from the YAML loader's grid")
+
+    if problems:
+        print(f"FAIL {name}")
+        for problem in problems:
+            print(f"  {problem}")
+        return 'failed'
+    if verbose:
+        print(f"ok   {name}: {grid.rows}x{grid.cols}, {layout!r}, {elapsed * 1000:.2f} ms")
+    return 'ok'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that grid blocks survive a parse/format round trip unchanged")
+    parser.add_argument('files', nargs='*', help="Level files (default: every .yaml under levels/)")
+    parser.add_argument('-v', '--verbose', action='store_true', help="Also list the files that pass")
+    args = parser.parse_args()
+
+    files = args.files or find_levels(os.path.join(REPO_ROOT, 'levels'))
+    results = {'ok': 0, 'failed': 0, 'skipped': 0}
+    for filepath in files:
+        results[check_file(os.path.abspath(filepath), args.verbose)] += 1
+
+    print(f"{results['ok']} grids round-trip unchanged, {results['failed']} failed, "
+          f"{results['skipped']} files without a grid block")
+    return 1 if results['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Include graph check for level packages
+
+Loads every package.yaml under levels/ (or the given package files) with
+include_graph.IncludeGraph, then prints the number of files in each package's
+graph, how many parses it took, missing level/include files and any include
+cycles (with the full path of the cycle).
+
+Usage:
+    py check_includes.py [package.yaml ...]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import yaml_loader
+from include_graph import IncludeGraph
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+
+def find_packages(folder):
+    """Find all package.yaml files in folder and subfolders"""
+    found = []
+    for root, dirs, files in os.walk(folder):
+        if 'package.yaml' in files:
+            found.append(os.path.join(root, 'package.yaml'))
+    return sorted(found)
+
+
+def check_package(package_path):
+    """Build and resolve one package's include graph. Returns the number of problems found."""
+    yaml_loader.clear_parse_cache()
+    start = time.perf_counter()
+    graph = IncludeGraph()
+    level_paths = graph.add_package(package_path)
+    warnings = list(graph.package_warnings)
+    errors = []
+    for level_path in level_paths:
+        _, level_warnings, level_errors = graph.resolve(level_path, copy=False)
+        warnings.extend(level_warnings)
+        errors.extend(level_errors)
+    elapsed = time.perf_counter() - start
+
+    print(f"{os.path.relpath(package_path, REPO_ROOT)}")
+    print(f"  {len(level_paths)} level files, {len(graph.nodes)} files in graph, "
+          f"{graph.parse_count} parses, {elapsed * 1000:.0f} ms")
+
+    cycles = graph.find_cycles()
+    for cycle in cycles:
+        print("  Cycle: " + " -> ".join(os.path.basename(path) for path in cycle))
+    # Every level reports the same missing shared include, so list each message once
+    for message in sorted(set(warnings)):
+        if not message.startswith("Circular include detected"):
+            print(f"  Warning: {message}")
+    for message in sorted(set(errors)):
+        print(f"  Error: {message}")
+    return len(cycles) + len(set(errors))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the include graphs of level packages")
+    parser.add_argument('packages', nargs='*',
+                        help="package.yaml files (default: every package under levels/)")
+    args = parser.parse_args()
+
+    packages = args.packages or find_packages(os.path.join(REPO_ROOT, 'levels'))
+    if not packages:
+        print("No package.yaml files found")
+        return 1
+
+    problems = sum(check_package(os.path.abspath(path)) for path in packages)
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""
+Co OPERATION: MultiTurn - Undo log
+Used by the level editor's undo/redo system
+
+History is a log of the changes each action made, not snapshots of the
+level: a paint stroke records the cells it set, an objects edit the one
+gridObjects entry it replaced, a resize the grids before and after. An
+entry holds (kind, key, before, after) tuples; undo writes the befores
+back in reverse order, redo the afters in order. Opening an entry is O(1)
+and an entry's memory is proportional to what the action touched, no
+matter how many shared definitions the level merged in.
+
+History is capped by memory, not by a number of actions: every entry keeps
+an estimate of its size (value_size) and the oldest entries are dropped
+from the deque, one popleft() each, while the total is over the budget. A
+stroke of three cells and a resize of a 100x100 grid cost what they hold.
+
+Bulk operations that make several recorded edits (resize, loading shared
+definitions, ...) wrap them in transaction(), which makes them one undo
+step however many _push_undo_state-style push() calls happen inside.
+
+Kinds used by the editor:
+    'cell'              key (row, col), before/after cell codes
+    'gridObjects'       key code, before/after object lists (or MISSING)
+    'objectDefinitions' key name, before/after definitions (or MISSING)
+    'grid'              key None, before/after (Grid, GridLayout) pairs
+"""
+
+import sys
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Hashable, List, Optional, Tuple
+
+DEFAULT_BUDGET_BYTES = 16 * 1024 * 1024  # Bytes of recorded values the history may hold
+
+
+class _Missing:
+    """Marks a dict key that doesn't exist on one side of a change"""
+    __slots__ = ()
+
+    def __repr__(self):
+        return 'MISSING'
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+MISSING = _Missing()
+
+Change = Tuple[str, Hashable, Any, Any]
+
+
+def value_size(value: Any) -> int:
+    """Approximate memory of a recorded value.
+
+    Containers and __slots__ objects (Grid, GridLayout) are counted with
+    their contents; strings shared by many cells are counted each time,
+    which errs on the side of dropping history early.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, (str, bytes, int, float, bool)) or value is None or value is MISSING:
+        return size
+    if isinstance(value, dict):
+        return size + sum(value_size(key) + value_size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(value_size(item) for item in value)
+    for name in getattr(type(value), '__slots__', ()):
+        size += value_size(getattr(value, name, None))
+    return size
+
+
+class UndoEntry:
+    """The changes of one undoable action and their approximate size in bytes"""
+    __slots__ = ('label', 'changes', 'nbytes')
+
+    def __init__(self, label: Optional[str] = None):
+        self.label = label
+        self.changes: List[Change] = []
+        self.nbytes = sys.getsizeof(self) + sys.getsizeof(self.changes)
+
+    def __len__(self):
+        return len(self.changes)
+
+    def __repr__(self):
+        return f"UndoEntry({self.label!r}, {len(self.changes)} changes)"
+
+
+class UndoLog:
+    """Undo and redo stacks of UndoEntry under a byte budget.
+
+    push() starts an action; its entry is only opened by the action's first
+    record(), which is also when the redo history is cleared. An action that
+    changes nothing (painting a cell with the code it already holds, a
+    dialog closed without edits) leaves the history untouched. record()
+    adds changes to the entry until the next push() outside a transaction,
+    undo() or redo(). The newest entry is always kept, even if it alone is
+    over the budget.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_BUDGET_BYTES):
+        self.max_bytes = max_bytes
+        self.undo_stack: Deque[UndoEntry] = deque()
+        self.redo_stack: Deque[UndoEntry] = deque()
+        self.total_bytes = 0  # Both stacks
+        self._open: Optional[UndoEntry] = None
+        self._action: Optional[List[Optional[str]]] = None  # [label] of the started action, until it records
+        self._transaction_depth = 0
+
+    def push(self, label: Optional[str] = None):
+        """Start the action about to happen. O(1), nothing is stored yet.
+
+        Inside a transaction the transaction's action continues instead.
+        """
+        if self._transaction_depth:
+            return
+        self._open = None
+        self._action = [label]
+
+    @contextmanager
+    def transaction(self, label: Optional[str] = None):
+        """Record everything done inside the with block as one undo step.
+
+        Transactions nest; the outermost one owns the entry.
+        """
+        if not self._transaction_depth:
+            self.push(label)
+        self._transaction_depth += 1
+        try:
+            yield
+        finally:
+            self._transaction_depth -= 1
+
+    def record(self, kind: str, key: Hashable, before: Any, after: Any) -> bool:
+        """Add a change to the current action's entry (not undoable if no action was started).
+
+        Returns True if this change opened the entry, i.e. the undo/redo
+        stacks just changed.
+        """
+        entry = self._open
+        opened = False
+        if entry is None:
+            if self._action is None:
+                return False
+            entry = self._open = UndoEntry(self._action[0])
+            self._action = None
+            self._clear_redo()
+            self.undo_stack.append(entry)
+            self.total_bytes += entry.nbytes
+            opened = True
+        change = (kind, key, before, after)
+        entry.changes.append(change)
+        nbytes = sys.getsizeof(change) + value_size(before) + value_size(after)
+        entry.nbytes += nbytes
+        self.total_bytes += nbytes
+        self._trim()
+        return opened
+
+    def _trim(self):
+        """Drop the oldest entries (then redo entries) while over the budget"""
+        while self.total_bytes > self.max_bytes and len(self.undo_stack) > 1:
+            self.total_bytes -= self.undo_stack.popleft().nbytes
+        while self.total_bytes > self.max_bytes and self.redo_stack:
+            self.total_bytes -= self.redo_stack.popleft().nbytes
+
+    def _clear_redo(self):
+        self.total_bytes -= sum(entry.nbytes for entry in self.redo_stack)
+        self.redo_stack.clear()
+
+    def can_undo(self) -> bool:
+        return bool(self.undo_stack)
+
+    def can_redo(self) -> bool:
+        return bool(self.redo_stack)
+
+    def _end_action(self):
+        self._open = None
+        self._action = None
+
+    def undo(self) -> Optional[UndoEntry]:
+        """Move the newest entry to the redo stack and return it"""
+        self._end_action()
+        if not self.undo_stack:
+            return None
+        entry = self.undo_stack.pop()
+        self.redo_stack.append(entry)
+        return entry
+
+    def redo(self) -> Optional[UndoEntry]:
+        self._end_action()
+        if not self.redo_stack:
+            return None
+        entry = self.redo_stack.pop()
+        self.undo_stack.append(entry)
+        return entry
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.total_bytes = 0
+        self._end_action()
+
+    def format_stats(self) -> str:
+        """One-line summary for the status bar"""
+        return (f"History: {len(self.undo_stack)} undo / {len(self.redo_stack)} redo, "
+                f"{self.total_bytes / 1024:.0f} KB / {self.max_bytes / 1048576:.0f} MB")
@@ -0,0 +1,314 @@
+"""
+Co OPERATION: MultiTurn - YAML loader layer
+Shared by the level editor and the batch scripts in scripts/
+
+Uses libyaml's C loader/dumper (yaml.CSafeLoader / yaml.CDumper) when PyYAML
+was built with it and transparently falls back to the pure Python classes
+otherwise. All game-specific tags (!Animation, !GLBAnimation, ...) are
+registered on every loader type so either path parses the same documents.
+"""
+
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+import threading
+from typing import Dict, List, Tuple
+
+import yaml
+
+# libyaml bindings (optional - PyYAML wheels usually ship them)
+# Parsing LevelsShared.yaml with the C loader is several times faster
+try:
+    from yaml import CSafeLoader as SafeLoader
+    from yaml import CLoader as Loader
+    from yaml import CDumper as Dumper
+    LIBYAML_AVAILABLE = True
+except ImportError:
+    from yaml import SafeLoader, Loader, Dumper
+    LIBYAML_AVAILABLE = False
+
+# Every loader/dumper class the custom tags need to be registered on
+ALL_LOADERS = {yaml.SafeLoader, yaml.Loader, SafeLoader, Loader}
+ALL_DUMPERS = {yaml.Dumper, Dumper}
+
+
+# ============================================
+# Custom YAML Handling for Game Format
+# ============================================
+
+# Force YAML to output strings as literal block scalars (| style)
+# This matches the game's expected YAML format for grid data
+class LiteralString(str):
+    """Helper class to force YAML to output a string as literal block scalar"""
+    pass
+
+
+def literal_string_representer(dumper, data):
+    """Custom representer to output strings as literal block scalars"""
+    # CDumper only accepts exact str values, not subclasses
+    return dumper.represent_scalar('tag:yaml.org,2002:str', str(data), style='|')
+
+
+class TaggedObject(dict):
+    """Dict subclass that remembers its YAML tag"""
+    def __init__(self, *args, **kwargs):
+        tag = kwargs.pop('_tag', None)
+        super().__init__(*args, **kwargs)
+        self._tag = tag
+
+
+def tagged_object_representer(dumper, data):
+    """Represent TaggedObject with its original tag"""
+    tag = getattr(data, '_tag', None)
+    if tag:
+        return dumper.represent_mapping(f'!{tag}', dict(data))
+    return dumper.represent_mapping('tag:yaml.org,2002:map', dict(data))
+
+
+for _dumper in ALL_DUMPERS:
+    yaml.add_representer(LiteralString, literal_string_representer, Dumper=_dumper)
+    yaml.add_representer(TaggedObject, tagged_object_representer, Dumper=_dumper)
+
+
+# Custom YAML tag constructors (matching game documentation)
+def animation_constructor(loader, node):
+    """Constructor for !Animation tag"""
+    if isinstance(node, yaml.MappingNode):
+        data = loader.construct_mapping(node)
+        return TaggedObject(data, _tag='Animation')
+    return loader.construct_scalar(node)
+
+
+def glb_animation_constructor(loader, node):
+    """Constructor for !GLBAnimation tag"""
+    data = loader.construct_mapping(node)
+    return TaggedObject(data, _tag='GLBAnimation')
+
+
+def spine_animation_constructor(loader, node):
+    """Constructor for !SpineAnimation tag"""
+    data = loader.construct_mapping(node)
+    return TaggedObject(data, _tag='SpineAnimation')
+
+
+def mesh_deform_animation_constructor(loader, node):
+    """Constructor for !MeshDeformAnimation tag (correct spelling)"""
+    data = loader.construct_mapping(node)
+    return TaggedObject(data, _tag='MeshDeformAnimation')
+
+
+def tween_animation_constructor(loader, node):
+    """Constructor for !TweenAnimation tag"""
+    data = loader.construct_mapping(node)
+    return TaggedObject(data, _tag='TweenAnimation')
+
+
+def unity_animator_constructor(loader, node):
+    """Constructor for !UnityAnimator tag"""
+    data = loader.construct_mapping(node)
+    return TaggedObject(data, _tag='UnityAnimator')
+
+
+# Generic multi-constructor to handle ANY other custom tags
+def generic_tag_handler(loader, suffix, node):
+    """Handle any custom tag with '!' prefix"""
+    if isinstance(node, yaml.MappingNode):
+        data = loader.construct_mapping(node)
+        return TaggedObject(data, _tag=suffix)
+    elif isinstance(node, yaml.SequenceNode):
+        data = loader.construct_sequence(node)
+        return TaggedObject({'_data': data, '_tag': suffix})
+    else:
+        data = loader.construct_scalar(node)
+        return TaggedObject({'_value': data, '_tag': suffix})
+
+
+# Bump whenever a constructor above changes what it builds, so pickled trees
+# in the persistent parse cache (built by older constructors) are not reused
+TAG_CONSTRUCTOR_VERSION = 1
+
+# Register all custom tag constructors with the pure Python and C loaders
+for _loader in ALL_LOADERS:
+    yaml.add_constructor('!Animation', animation_constructor, Loader=_loader)
+    yaml.add_constructor('!GLBAnimation', glb_animation_constructor, Loader=_loader)
+    yaml.add_constructor('!SpineAnimation', spine_animation_constructor, Loader=_loader)
+    yaml.add_constructor('!MeshDeformAnimation', mesh_deform_animation_constructor, Loader=_loader)
+    yaml.add_constructor('!TweenAnimation', tween_animation_constructor, Loader=_loader)
+    yaml.add_constructor('!UnityAnimator', unity_animator_constructor, Loader=_loader)
+    yaml.add_multi_constructor('!', generic_tag_handler, Loader=_loader)
+
+
+def safe_load_yaml(stream):
+    """Parse a YAML string or stream with the fastest available safe loader"""
+    return yaml.load(stream, Loader=SafeLoader)
+
+
+def dump_yaml(data, stream=None, **kwargs):
+    """Serialize data with the fastest available dumper.
+
+    Accepts the same keyword arguments as yaml.dump().
+    """
+    kwargs.setdefault('Dumper', Dumper)
+    return yaml.dump(data, stream, **kwargs)
+
+
+# ============================================
+# Parsed-File Cache
+# ============================================
+# Process-wide cache of parsed YAML files, keyed by absolute path and checked
+# against the file's stat signature (mtime, size) so edited files are re-parsed.
+# Entries are stored pickled and every hit unpickles a fresh copy: callers
+# (resolve_includes, the editor's merge and edit code) mutate what they get
+# back, and that must never leak into the cached tree or into later merges.
+# Unpickling LevelsShared.yaml is ~50x faster than re-parsing it.
+
+_parse_cache = {}  # abs_path -> (signature, pickled data)
+_parse_cache_stats = {'hits': 0, 'misses': 0, 'disk_hits': 0}
+_parse_cache_lock = threading.Lock()  # include_graph loads files from worker threads
+
+
+def _count(counter: str):
+    with _parse_cache_lock:
+        _parse_cache_stats[counter] += 1
+
+# Persistent (on-disk) parse cache for shared definition files
+# (LevelsShared.yaml and its includes), so editor startup skips parsing them.
+# Entries are keyed by a hash of the file contents plus TAG_CONSTRUCTOR_VERSION:
+# changed files get a new key and are re-parsed and re-cached automatically.
+PERSISTENT_CACHE_MAX_ENTRIES = 64
+
+
+def get_user_cache_dir() -> str:
+    """Per-user cache folder for the level editor (created on demand)"""
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser(r"~\AppData\Local")
+        return os.path.join(base, "CoOperationLevelEditor", "Cache")
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser("~/.cache")
+    return os.path.join(base, "coop-level-editor")
+
+
+def _persistent_cache_path(content_hash: str) -> str:
+    return os.path.join(get_user_cache_dir(), "parsed",
+                        f"v{TAG_CONSTRUCTOR_VERSION}-{content_hash}.pickle")
+
+
+def _read_persistent_entry(content_hash: str):
+    """Return the pickled tree for content_hash, or None if not cached"""
+    try:
+        with open(_persistent_cache_path(content_hash), 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _write_persistent_entry(content_hash: str, blob: bytes):
+    """Store a pickled tree (written to a temp file first, then renamed into place)"""
+    try:
+        path = _persistent_cache_path(content_hash)
+        folder = os.path.dirname(path)
+        os.makedirs(folder, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=folder, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(blob)
+        os.replace(tmp_path, path)
+
+        # Trim old entries (oldest first) so the folder stays bounded
+        entries = [os.path.join(folder, name) for name in os.listdir(folder) if name.endswith('.pickle')]
+        if len(entries) > PERSISTENT_CACHE_MAX_ENTRIES:
+            entries.sort(key=os.path.getmtime)
+            for old in entries[:len(entries) - PERSISTENT_CACHE_MAX_ENTRIES]:
+                os.remove(old)
+    except OSError as e:
+        # The cache is only an optimisation - never fail a load because of it
+        print(f"Could not write parse cache entry: {e}")
+
+
+def _file_signature(filepath: str) -> Tuple[int, int]:
+    """Stat signature used to detect changed files"""
+    st = os.stat(filepath)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def get_parse_cache_stats() -> Dict[str, int]:
+    """Return hit/miss counters and the number of cached files"""
+    stats = dict(_parse_cache_stats)
+    stats['entries'] = len(_parse_cache)
+    return stats
+
+
+def clear_parse_cache():
+    """Drop all cached files and reset the counters (the on-disk cache is kept)"""
+    _parse_cache.clear()
+    for counter in _parse_cache_stats:
+        _parse_cache_stats[counter] = 0
+
+
+# ============================================
+# YAML Include Resolution
+# ============================================
+
+def load_yaml_file(filepath: str, use_cache: bool = True, persistent: bool = False) -> Tuple[Dict, str]:
+    """Load a single YAML file and return parsed data plus any errors
+
+    Unchanged files are served from the parsed-file cache (as a private copy).
+    With persistent=True, a miss is looked up in (and saved to) the on-disk
+    cache by content hash before falling back to parsing the file.
+    """
+    try:
+        key = os.path.abspath(filepath)
+        signature = _file_signature(key)
+
+        if use_cache:
+            cached = _parse_cache.get(key)
+            if cached and cached[0] == signature:
+                _count('hits')
+                return pickle.loads(cached[1]), None
+            _count('misses')
+
+        # Binary mode lets libyaml detect the encoding itself (UTF-8/BOM)
+        with open(filepath, 'rb') as f:
+            raw = f.read()
+
+        if use_cache and persistent:
+            content_hash = hashlib.sha256(raw).hexdigest()
+            blob = _read_persistent_entry(content_hash)
+            if blob is not None:
+                try:
+                    data = pickle.loads(blob)
+                    _count('disk_hits')
+                    _parse_cache[key] = (signature, blob)
+                    return data, None
+                except Exception:
+                    pass  # Corrupt or incompatible entry - re-parse and overwrite it
+
+        data = safe_load_yaml(raw)
+        data = data if data else {}
+
+        if use_cache:
+            blob = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+            _parse_cache[key] = (signature, blob)
+            if persistent:
+                _write_persistent_entry(content_hash, blob)
+            # Hand back a copy too, so the caller never shares objects with the cache
+            data = pickle.loads(blob)
+        return data, None
+    except Exception as e:
+        return None, str(e)
+
+
+def resolve_includes(main_filepath: str, persistent: bool = False) -> Tuple[Dict, List[str], List[str]]:
+    """
+    Resolve the YAML include directives of one file (see include_graph.IncludeGraph).
+    Included files are shared definitions, so they always use the persistent
+    parse cache; pass persistent=True to use it for the main file too.
+    Returns: (merged_data, warnings, errors)
+    """
+    # Imported here because include_graph builds on this module
+    from include_graph import IncludeGraph
+
+    graph = IncludeGraph()
+    graph.add([main_filepath], persistent=persistent)
+    # The graph is thrown away, so its merged tree can be handed out without copying
+    return graph.resolve(main_filepath, copy=False)
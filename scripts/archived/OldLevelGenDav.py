@@ -17,8 +17,13 @@ This file's structure was generated with the help of an AI assistant to ensure m
 """
 
 import os
+import sys
 from typing import List, Dict, Tuple
 
+# Grid model shared with the level editor (array-backed matrix of cell codes)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'level editor'))
+from level_grid import EMPTY_CODE, Grid
+
 
 # ============================================================
 # CONFIGURATION SECTION
@@ -27,6 +32,9 @@ from typing import List, Dict, Tuple
 CHUNK_WIDTH = 5
 CHUNK_HEIGHT = 5
 
+LEVEL_ROWS = 24
+LEVEL_COLS = 22
+
 OUTPUT_DIRECTORY = "generated_levels/"
 CHUNK_LIBRARY_PATH = "chunks/"
 
@@ -40,11 +48,11 @@ class Chunk:
     Represents a reusable level segment (grid subsection).
     
     Attributes:
-        grid (List[List[str]]): 2D character grid representing tiles
+        grid (Grid): 2D grid of tile codes (CHUNK_HEIGHT x CHUNK_WIDTH)
         objects (List[Dict]): Object references used in this chunk
         metadata (Dict): Additional information (difficulty, theme, tags)
     """
-    def __init__(self, grid: List[List[str]], objects: List[Dict], metadata: Dict):
+    def __init__(self, grid: Grid, objects: List[Dict], metadata: Dict):
         self.grid = grid
         self.objects = objects
         self.metadata = metadata
@@ -55,11 +63,11 @@ class Level:
     Represents a full assembled level before export.
     
     Attributes:
-        grid (List[str]): Complete level grid
+        grid (Grid): Complete level grid, empty cells hold EMPTY_CODE ('__')
         objects (List[Dict]): All placed objects
         metadata (Dict): include, fileProperties, sceneName, cameraSettings
     """
-    def __init__(self, metadata: Dict, grid: List[str], objects: List[Dict]):
+    def __init__(self, metadata: Dict, grid: Grid, objects: List[Dict]):
         self.metadata = metadata
         self.grid = grid
         self.objects = objects
@@ -81,23 +89,24 @@ class Level:
         Inserts an object reference into the level's grid and updates the objects list.
 
         Parameters:
-            ref (int): Location index in the grid (e.g. 32)
+            ref (int): Location index in the grid, row by row (e.g. 32)
             obj_ref (str): Object reference 2-character string (e.g. "c3")
         
         """
         # Ensure coordinates are within bounds
         try:
-            if 0 <= ref < len(self.grid):
+            if 0 <= ref < self.grid.rows * self.grid.cols:
+                cell = divmod(ref, self.grid.cols) # (row, col) of the location index
                 if len(obj_ref) == 2: # Validate object reference format (2-character string)
                     # Insertion case for when cell is empty
-                    if self.grid[ref] == "":
-                        self.grid[ref] = obj_ref
+                    if self.grid[cell] == EMPTY_CODE:
+                        self.grid[cell] = obj_ref
                         self.objects.append({"ref": ref, "object": obj_ref})
                     # Insertion case for when cell is occupied by a different object reference
-                    elif self.grid[ref] != obj_ref:
-                        current_obj_ref = self.grid[ref] # Store the current object reference before overwriting
+                    elif self.grid[cell] != obj_ref:
+                        current_obj_ref = self.grid[cell] # Store the current object reference before overwriting
                         self.objects.remove({"ref": ref, "object": current_obj_ref}) # Remove the old object reference from the objects list
-                        self.grid[ref] = obj_ref # Update the grid cell with the new object reference
+                        self.grid[cell] = obj_ref # Update the grid cell with the new object reference
                         self.objects.append({"ref": ref, "object": obj_ref}) # Add the new object reference to the objects list
                 else:
                     raise ValueError(f"Invalid object reference format: {obj_ref}. Expected 2-character string.")
@@ -113,13 +122,14 @@ class Level:
         Removes an object reference from the level's grid and objects list.
 
         Parameters:
-            ref (int): Location index in the grid (e.g. 32)
+            ref (int): Location index in the grid, row by row (e.g. 32)
         """
         try:
-            if 0 <= ref < len(self.grid):
-                if self.grid[ref] != "": # Check if there is an object reference to remove
-                    current_obj_ref = self.grid[ref] # Store the current object reference before removing
-                    self.grid[ref] = "" # Clear the grid cell
+            if 0 <= ref < self.grid.rows * self.grid.cols:
+                cell = divmod(ref, self.grid.cols) # (row, col) of the location index
+                if self.grid[cell] != EMPTY_CODE: # Check if there is an object reference to remove
+                    current_obj_ref = self.grid[cell] # Store the current object reference before removing
+                    self.grid[cell] = EMPTY_CODE # Clear the grid cell
                     self.objects.remove({"ref": ref, "object": current_obj_ref}) # Remove the object reference from the objects list
                 else:
                     raise ValueError(f"No object reference found at location {ref} to remove.")
@@ -139,20 +149,11 @@ class Level:
         cameraSettings: {self.metadata.get('cameraSettings', {})}
 
         grid:
-        {self.grid}
         """
-        # The above grid representation is just a placeholder. A more visual format would be ideal for debugging,
-        # but it may require additional formatting logic to convert the flat list into a 2D representation that reflects the actual layout of the level.
-        # For now, it simply prints the raw grid list.
-
-        # TODO
-        # for i in range(0, len(self.grid), 7):
-        #     row = self.grid[i:i+8]
-        #     row += self.grid[i+8:i+17]
-        #     row += self.grid[i+17:i+22]
-        #     string += "\n " + " ".join([cell+"," if cell != "" else "__," for cell in row]) # Use "__" to represent empty cells for better visualization
-
-        # string == string - string[-1] # Remove the last comma character
+        # One line per grid row, in the same comma-separated layout as the level files
+        string = string.rstrip(" ")
+        for row in self.grid:
+            string += "  " + ",".join(row) + ",\n"
 
         if self.objects:
             string += "gridObjects:\n"
@@ -230,32 +231,11 @@ def initialize_empty_level() -> Level:
         Level object
     """
     # c1, c2, c3, c4, c5, c6 are just example object references for testing purposes.
-    empty_grid = ["","","","","","","","c1", "","","","","","","","","c2", "","","","","c3",
-        "","","","","","","","c4", "","","","","","","","","c5", "","","","","c6",
-        "","","","","","","","", "","","","","","","","","", "","","","","",
-        "","","","","","","","", "","","","","","","","","", "","","","","",
-        "","","","","","","","", "","","","","","","","","", "","","","","",
-        "","","","","","","","", "","","","","","","","","", "","","","","",
-        "","","","","","","","", "","","","","","","","","", "","","","","",
-        "","","","","","","","", "","","","","","","","","", "","","","","",
-
-        "","","","","","","","", "","","","","","","","","", "","","","","",
-        "","","","","","","","", "","","","","","","","","", "","","","","",
-        "","","","","","","","", "","","","","","","","","", "","","","","",
-        "","","","","","","","", "","","","","","","","","", "","","","","",
-        "","","","","","","","", "","","","","","","","","", "","","","","",
-        "","","","","","","","", "","","","","","","","","", "","","","","",
-        "","","","","","","","", "","","","","","","","","", "","","","","",
-        "","","","","","","","", "","","","","","","","","", "","","","","",
-        "","","","","","","","", "","","","","","","","","", "","","","","",
-        "","","","","","","","", "","","","","","","","","", "","","","","",
-
-        "","","","","","","","", "","","","","","","","","", "","","","","",
-        "","","","","","","","", "","","","","","","","","", "","","","","",
-        "","","","","","","","", "","","","","","","","","", "","","","","",
-        "","","","","","","","", "","","","","","","","","", "","","","","",
-        "","","","","","","","", "","","","","","","","","", "","","","","",
-        "","","","","","","","", "","","","","","","","","", "","","","",""]
+    # They sit at the end of the three column blocks (8, 9 and 5 wide) of the first two rows.
+    empty_grid = Grid(LEVEL_ROWS, LEVEL_COLS)
+    for (row, col), obj_ref in zip([(0, 7), (0, 16), (0, 21), (1, 7), (1, 16), (1, 21)],
+                                   ["c1", "c2", "c3", "c4", "c5", "c6"]):
+        empty_grid[row, col] = obj_ref
     metadata = {
         "include": ["LevelsShared.yaml"],
         "fileProperties": {"creatorName": "Algorithm"},
@@ -1,5 +1,14 @@
+import os
+import sys
 import yaml
 
+# Share the level editor's YAML loader layer (libyaml C loader/dumper when available, custom game tags)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'level editor'))
+from yaml_loader import Dumper, LIBYAML_AVAILABLE, safe_load_yaml
+from level_sections import read_level_sections
+from atomic_write import get_write_stats, write_text_atomic
+from level_grid import EMPTY_CODE, substitute_grid_codes
+
 """
 DO NOT EDIT THIS CONFIG SECTION UNLESS YOU KNOW WHAT YOU ARE DOING.
 This section contains custom YAML representers and a custom Dumper to ensure that the output YAML file is formatted in a specific way,
@@ -16,6 +25,10 @@ class SpacedDumper(yaml.Dumper):
         if len(self.indents) == 1:
             super().write_line_break()
 
+# The C dumper can't hook write_line_break; sections are dumped one key at a time, so they need no top-level spacing (see save_level_sections)
+class CSpacedDumper(Dumper):
+    pass
+
 class FlowList(list):
     pass
 
@@ -30,7 +43,7 @@ class LiteralStr(str):
     pass
 
 def literal_str_representer(dumper, data):
-    return dumper.represent_scalar('tag:yaml.org,2002:str', data, style='|')
+    return dumper.represent_scalar('tag:yaml.org,2002:str', str(data), style='|') # str() because the C dumper rejects str subclasses
 
 def none_representer(dumper, data):
     return dumper.represent_scalar('tag:yaml.org,2002:null', '')
@@ -45,49 +58,48 @@ def flow_dict_representer(dumper, data):
         flow_style=True
     )
 
-yaml.add_representer(FlowList, flow_list_representer) # Use the custom representer for FlowList to ensure it dumps in flow style (e.g., [p1, p2] and not as a block list - p1\n- p2)
-yaml.add_representer(LiteralStr, literal_str_representer) # Use the custom representer for LiteralStr to ensure it dumps as a literal block scalar (using |) for grid
-yaml.add_representer(type(None), none_representer) # Use the custom representer for None to represent it as an empty string in YAML instead of 'null' appearing in the output yaml file
-yaml.add_representer(FlowDict, flow_dict_representer) # Use the custom representer for FlowDict to ensure it dumps in flow style (e.g., {key1: value1, key2: value2} and not as a block mapping - key1: value1\nkey2: value2)
+for dumper in (SpacedDumper, CSpacedDumper):
+    yaml.add_representer(FlowList, flow_list_representer, Dumper=dumper) # Use the custom representer for FlowList to ensure it dumps in flow style (e.g., [p1, p2] and not as a block list - p1\n- p2)
+    yaml.add_representer(LiteralStr, literal_str_representer, Dumper=dumper) # Use the custom representer for LiteralStr to ensure it dumps as a literal block scalar (using |) for grid
+    yaml.add_representer(type(None), none_representer, Dumper=dumper) # Use the custom representer for None to represent it as an empty string in YAML instead of 'null' appearing in the output yaml file
+    yaml.add_representer(FlowDict, flow_dict_representer, Dumper=dumper) # Use the custom representer for FlowDict to ensure it dumps in flow style (e.g., {key1: value1, key2: value2} and not as a block mapping - key1: value1\nkey2: value2)
 
 """
 END OF CONFIG SECTION
 """
 
-def get_yaml_data(file_path: str):
+def get_level_sections(file_path: str, keys=('grid', 'gridObjects')):
     """
-    Reads a YAML file from the specified file path and returns its contents as a dictionary.
+    Reads only the given top-level keys of a YAML level file.
+    The other sections (objectDefinitions, cameraSettings, ...) are kept as raw text and never parsed into Python objects.
     Parameters:
         file_path (str): The path to the YAML file to be read.
+        keys (tuple): The top-level keys to load.
     Returns:
-        dict: The contents of the YAML file as a dictionary.
+        LevelView: Section view of the file, the loaded keys are available as view['grid'] etc.
     """
-    with open(file_path, 'r') as file:
-        data = dict(yaml.safe_load(file))
-
-    return data
+    return read_level_sections(file_path, keys)
 
-def save_yaml_data(data: dict, file_path: str):
+def save_level_sections(view, data: dict, file_path: str):
     """
-    Saves the provided data to a YAML file at the specified file path.
+    Saves a level file by re-dumping only the sections in data and copying every other section of the view byte-for-byte.
     Parameters:
-        data (dict): The data to be saved to the YAML file.
+        view (LevelView): The section view the file was read with (see get_level_sections).
+        data (dict): The top-level keys to write, e.g. the output of format_yaml_data.
         file_path (str): The path where the YAML file will be saved.
     """
-    yaml_text = yaml.dump(
-            data,
-            Dumper=SpacedDumper, # Use the custom SpacedDumper to add blank lines between top-level keys
+    replacements = {}
+    for key, value in data.items():
+        replacements[key] = yaml.dump(
+            {key: value},
+            Dumper=CSpacedDumper if LIBYAML_AVAILABLE else SpacedDumper,
             sort_keys=False,
             default_flow_style=False,
             allow_unicode=True,
             width=1000
-        )
+        ).rstrip('\n') + '\n' # A single key needs no spacing, the blank lines around each section are kept from the original file
 
-    # Ensure blank line between grid block and gridObjects
-    yaml_text = yaml_text.replace("\ngridObjects:", "\n\ngridObjects:")
-
-    with open(file_path, "w") as file:
-        file.write(yaml_text)
+    write_text_atomic(file_path, view.render(replacements)) # Keeps the original line endings of untouched sections, skipped if nothing changed
 
 def format_yaml_data(yaml_data: dict, grid: str, grid_objects: dict):
     """
@@ -134,9 +146,9 @@ def delete_blank_grid(grid: str, deleted_keys: list):
         str: The modified grid string with the deleted keys removed.
     """
 
-    for key in deleted_keys:
-        if key in grid:
-            grid = grid.replace(key, '__')  # Replace the key with an 'empty' string in the grid
+    # One tokenized pass for all keys: whole cells only (deleting '1' leaves '1a' alone),
+    # and the grid's section breaks and column gutters are kept
+    grid, _ = substitute_grid_codes(grid, dict.fromkeys(deleted_keys, EMPTY_CODE))
 
     return grid
 
@@ -173,22 +185,58 @@ def delete_blank(input_path: str, output_path='formatted_level.yaml'):
     """
 
     try:
-        yaml_data = get_yaml_data(input_path)
-        level_grid = yaml_data['grid']
-        level_objects = yaml_data['gridObjects']
+        # Only grid and gridObjects are parsed, every other section is copied to the output unchanged
+        level_view = get_level_sections(input_path)
+        level_grid = level_view['grid']
+        level_objects = level_view['gridObjects']
 
         level_objects, deleted_keys = delete_blank_grid_objects(level_objects)
         level_grid = delete_blank_grid(level_grid, deleted_keys)
 
-        formatted_yaml_data = format_yaml_data(yaml_data, level_grid, level_objects)
-        save_yaml_data(formatted_yaml_data, output_path)
+        # Nothing deleted - keep grid and gridObjects as they are, so a clean level is not rewritten
+        formatted_yaml_data = format_yaml_data({}, level_grid, level_objects) if deleted_keys else {}
+        save_level_sections(level_view, formatted_yaml_data, output_path)
         return
 
     except Exception as e:
         return f"[ERROR] An error occurred while deleting blank data: {e}"
 
+def delete_blank_folder(folder: str):
+    """
+    Runs delete_blank in place on every level file (a YAML file with grid and gridObjects) in a folder and its subfolders.
+    Files that come out unchanged are not rewritten.
+    Parameters:
+        folder (str): The folder to process, e.g. levels/
+    Returns:
+        dict: Counts of 'written', 'skipped' (already clean) and 'ignored' (not a level file or not valid YAML) files.
+    """
+
+    counts = {'written': 0, 'skipped': 0, 'ignored': 0}
+    for root, dirs, files in os.walk(folder):
+        for file in sorted(files):
+            if not file.endswith('.yaml'):
+                continue
+            file_path = os.path.join(root, file)
+            before = get_write_stats()
+            error_message = delete_blank(file_path, file_path)
+            after = get_write_stats()
+            if error_message:
+                counts['ignored'] += 1
+            elif after['written'] > before['written']:
+                counts['written'] += 1
+            else:
+                counts['skipped'] += 1
+
+    return counts
+
 def main():
 
+    # Batch mode: python delete_blank.py <folder> cleans every level in the folder in place
+    if len(sys.argv) > 1 and os.path.isdir(sys.argv[1]):
+        counts = delete_blank_folder(sys.argv[1])
+        print(f"{counts['written']} written, {counts['skipped']} skipped (unchanged), {counts['ignored']} ignored (not level files)")
+        return
+
     input_valid = False
     while not input_valid:
         input_path = input("Enter the path to the YAML file you want to delete blank data from (e.g., levels/level1.yaml): ")
@@ -196,8 +244,8 @@ def main():
             print("Invalid file type. Please enter a path to a .yaml file.")
             continue
         try:
-            with open(input_path, 'r') as file:
-                yaml.safe_load(file)  # Try loading the YAML to check if it's valid
+            with open(input_path, 'rb') as file:
+                safe_load_yaml(file)  # Try loading the YAML to check if it's valid
             input_valid = True
         except Exception as e:
             print(f"Error loading YAML file: {e}. Please try again.")